@@ -0,0 +1,1131 @@
+"""Long-running checks that drive the real Tk app headless.
+
+    xvfb-run python harness.py soak --cycles 5000
+    xvfb-run python harness.py idle --tickets 5000
+    python harness.py conformance
+    xvfb-run python harness.py geometry --ticks 120
+    xvfb-run python harness.py timeline --tickets 100000
+    python harness.py attachments --megabytes 50
+    python harness.py sync --tickets 10000
+    python harness.py dependencies --tickets 100000
+
+Starts its own Xvfb when DISPLAY is unset. Exits non-zero when a tracked
+resource keeps growing instead of levelling off, or when an idle window
+keeps the CPU busy.
+"""
+import argparse
+import gc
+import io
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import tkinter as tk
+
+import ticket
+
+
+def start_display():
+    """Make sure Tk has an X server to talk to; returns the Xvfb process if one was started"""
+    if os.environ.get('DISPLAY'):
+        return None
+    if not shutil.which('Xvfb'):
+        sys.exit("No DISPLAY and Xvfb is not installed")
+    display = f":{os.getpid() % 500 + 100}"
+    proc = subprocess.Popen(['Xvfb', display, '-screen', '0', '1280x1024x24'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = display
+    time.sleep(1)
+    return proc
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def pending_afters(root):
+    return len(root.tk.splitlist(root.tk.call('after', 'info')))
+
+
+def slope(samples):
+    """Least-squares growth per sample"""
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = (n - 1) / 2, statistics.fmean(samples)
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(samples))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den
+
+
+class Soak:
+    """Churns tickets and fridge items through the app and samples resource use"""
+
+    def __init__(self, root, app, population, clock_step):
+        self.root = root
+        self.app = app
+        self.clock_step = clock_step
+        self.population = population
+        self.errors = []
+        self.samples = {'widgets': [], 'afters': [], 'memory_kb': [], 'tick_ms': []}
+        self.tick_times = []
+
+    def cycle(self, n):
+        app = self.app
+        app.clock.advance(seconds=self.clock_step)
+        app.desc_var.set(f"soak {n % 17}")
+        app.sec_var.set(str(n % 50))
+        app.add_ticket()
+        # Rows follow the chosen sort, so find tickets by age rather than place
+        newest = max(app.tickets, key=lambda t: t.id)
+        app.toggle_ticket_pause(app.tickets.index(newest))
+        if n % 3 == 0:
+            app.toggle_ticket_pause(app.tickets.index(newest))
+        if n % 5 == 0:
+            app.complete_ticket(app.tickets.index(newest))
+        if n % 7 == 0:
+            app.sort_var.set(list(ticket.TicketOrder.KEYS)[n % len(ticket.TicketOrder.KEYS)])
+            app.switch_sort()
+        while len(app.tickets) > self.population:
+            app.delete_ticket(app.tickets.index(min(app.tickets, key=lambda t: t.id)))
+
+        app.fridge_var.set(f"item {n % 11}")
+        app.add_fridge_item()
+        app.toggle_fridge_pause(len(app.fridge_items) - 1)
+        while len(app.fridge_items) > self.population // 4:
+            app.delete_fridge_item(0)
+
+        started = time.perf_counter()
+        app.refresh_labels()
+        self.root.update()
+        self.tick_times.append((time.perf_counter() - started) * 1000)
+
+    def switch_database(self, name):
+        self.app.db_var.set(name)
+        self.app.switch_database()
+
+    def sample(self):
+        gc.collect()
+        self.samples['widgets'].append(count_widgets(self.root))
+        self.samples['afters'].append(pending_afters(self.root))
+        self.samples['memory_kb'].append(tracemalloc.get_traced_memory()[0] / 1024)
+        self.samples['tick_ms'].append(statistics.median(self.tick_times))
+        self.tick_times = []
+
+    def report(self, limits):
+        """Print the trend of every metric; returns the names of those growing past their limit"""
+        failed = []
+        warm = len(self.samples['widgets']) // 4  # Ignore start-up allocation
+        for name, values in self.samples.items():
+            steady = values[warm:]
+            growth = slope(steady) * len(steady)
+            print(f"{name:>10}: first {steady[0]:10.1f}  last {steady[-1]:10.1f}  trend {growth:+10.1f}")
+            if growth > limits[name]:
+                failed.append(name)
+        return failed
+
+
+def soak(args):
+    xvfb = start_display()
+    workdir = tempfile.mkdtemp(prefix='ticket-soak-')
+    os.chdir(workdir)  # The app lists and creates .db files in the working directory
+    try:
+        root = tk.Tk()
+        # Simulated time lets every cycle cross deadlines and day boundaries
+        app = ticket.TicketApp(root, clock=ticket.SimulatedClock())
+        for name in ('soak_a.db', 'soak_b.db'):
+            conn = sqlite3.connect(name)
+            app.setup_database_schema(conn.cursor())
+            conn.commit()
+            conn.close()
+        app.update_database_list()
+        runner = Soak(root, app, args.population, args.clock_step)
+        # A modal error box would stall the run; record it instead
+        ticket.messagebox.showerror = lambda title, message: runner.errors.append(message)
+
+        # Fill both databases to the steady population before measuring
+        for name in ('soak_a.db', 'soak_b.db'):
+            runner.switch_database(name)
+            for n in range(args.population):
+                runner.cycle(n)
+
+        tracemalloc.start()
+        for n in range(1, args.cycles + 1):
+            runner.cycle(n)
+            if n % args.switch_every == 0:
+                runner.switch_database('soak_b.db' if app.current_db == 'soak_a.db' else 'soak_a.db')
+            if n % args.sample_every == 0:
+                runner.sample()
+        tracemalloc.stop()
+
+        failed = runner.report({
+            'widgets': args.max_widget_growth,
+            'afters': args.max_after_growth,
+            'memory_kb': args.max_memory_growth_kb,
+            'tick_ms': statistics.median(runner.samples['tick_ms']) * args.max_tick_growth,
+        })
+        for message in runner.errors:
+            print(f"error: {message}")
+        root.destroy()
+        if failed or runner.errors:
+            print(f"FAIL: {', '.join(failed) or 'errors reported'}")
+            return 1
+        print("PASS")
+        return 0
+    finally:
+        os.chdir('/')
+        shutil.rmtree(workdir, ignore_errors=True)
+        if xvfb:
+            xvfb.terminate()
+
+
+def cpu_while_running(root, seconds):
+    """Run the Tk event loop for `seconds`; returns the CPU time used as a fraction"""
+    started, cpu = time.monotonic(), time.process_time()
+    while time.monotonic() - started < seconds:
+        root.update()
+        time.sleep(0.01)  # Stand-in for mainloop blocking on the X socket
+    return (time.process_time() - cpu) / (time.monotonic() - started)
+
+
+def idle(args):
+    xvfb = start_display()
+    workdir = tempfile.mkdtemp(prefix='ticket-idle-')
+    os.chdir(workdir)
+    try:
+        conn = sqlite3.connect('idle.db')
+        cursor = conn.cursor()
+        ticket.upgrade_schema(cursor)
+        descriptions = ticket.Descriptions(cursor)
+        now = datetime.now()
+        # A typical long list: multi-day countdowns, paused and done tickets,
+        # and a handful of running ones that tick every second
+        rows = []
+        for n in range(args.tickets):
+            kind = n % 3 if n >= args.running else 3
+            due = now + (timedelta(days=3, minutes=n) if kind == 0 else timedelta(minutes=30 + n))
+            rows.append((f"Ticket #{n + 1}", descriptions.intern(f"idle {n % 13}"), now.isoformat(),
+                         due.isoformat(), int(kind == 1), int(kind == 2),
+                         now.isoformat() if kind == 2 else None))
+        cursor.executemany("""INSERT INTO tickets
+            (title, description_id, created_at, due, paused, completed, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+        conn.commit()
+        conn.close()
+
+        root = tk.Tk()
+        app = ticket.TicketApp(root)
+        app.db_var.set('idle.db')
+        app.switch_database()
+        cpu_while_running(root, 2)  # Let the first layout and redraw settle
+
+        shown = cpu_while_running(root, args.seconds)
+        print(f"    shown: {shown:6.1%} CPU")
+        root.withdraw()  # Unmaps like minimizing, even without a window manager
+        hidden = cpu_while_running(root, args.seconds)
+        print(f"   hidden: {hidden:6.1%} CPU")
+        root.destroy()
+        if shown > args.max_cpu or hidden > args.max_cpu:
+            print("FAIL: idle window keeps the CPU busy")
+            return 1
+        print("PASS")
+        return 0
+    finally:
+        os.chdir('/')
+        shutil.rmtree(workdir, ignore_errors=True)
+        if xvfb:
+            xvfb.terminate()
+
+
+class Conformance:
+    """Expectations every ticket.Storage engine must meet.
+
+    Each check gets a fresh engine from `make`. The random script at the end
+    is run against every engine and the results compared, so the in-memory
+    engine can stand in for SQLite wherever it is used.
+    """
+    START = datetime(2026, 3, 4, 9, 30)
+
+    def __init__(self, make):
+        self.make = make
+
+    def checks(self):
+        return [getattr(self, name) for name in sorted(dir(self)) if name.startswith('check_')]
+
+    @classmethod
+    def add(cls, store, title, minutes, description="chore", created=None):
+        created = created or cls.START
+        fields = {'title': title, 'description': description, 'created_at': created.isoformat(),
+                  'due': (created + timedelta(minutes=minutes)).isoformat()}
+        return store.insert('ticket', fields, created)
+
+    def check_insert_fills_defaults(self):
+        store = self.make()
+        first = self.add(store, "a", 5)
+        second = self.add(store, "b", 10)
+        assert first != second
+        rows = {row['id']: row for row in store.tickets(ticket.TicketView.BUILTIN[0], self.START)}
+        assert set(rows) == {first, second}
+        assert set(rows[first]) == set(ticket.Storage.COLUMNS['ticket'])
+        assert rows[first]['title'] == "a" and rows[first]['description'] == "chore"
+        assert rows[first]['paused'] == 0 and rows[first]['completed'] == 0
+        assert rows[first]['completed_at'] is None
+        item = store.insert('fridge', {'name': "milk", 'added_at': self.START.isoformat()}, self.START)
+        assert store.fridge_items() == [{'id': item, 'name': "milk", 'added_at': self.START.isoformat(),
+                                         'paused': 0, 'paused_at': None, 'frozen_age': None}]
+
+    def check_update_by_id(self):
+        store = self.make()
+        kept, changed = self.add(store, "a", 5), self.add(store, "b", 5)
+        store.update('ticket', changed, {'paused': 1, 'paused_at': self.START.isoformat(),
+                                         'frozen_remaining': '300.0'},
+                     ('ticket', changed, 'paused', self.START, {'paused_at': self.START.isoformat()}))
+        store.update('ticket', 999, {'paused': 1}, ('ticket', 999, 'paused', self.START, {}))
+        rows = {row['id']: row for row in store.tickets(ticket.TicketView.BUILTIN[0], self.START)}
+        assert rows[changed]['paused'] == 1 and rows[changed]['frozen_remaining'] == '300.0'
+        assert rows[kept]['paused'] == 0
+        assert len(rows) == 2
+
+    def check_bulk_update_and_delete(self):
+        store = self.make()
+        ids = [self.add(store, f"t{n}", n) for n in range(10)]
+        done = self.START.isoformat()
+        store.update_many('ticket', [(i, {'completed': 1, 'completed_time': '09:30:00', 'completed_at': done})
+                                     for i in ids[:4]],
+                          [('ticket', i, 'completed', self.START, {'completed_at': done}) for i in ids[:4]])
+        store.delete_many('ticket', ids[2:6], self.START)
+        rows = {row['id']: row for row in store.tickets(ticket.TicketView.BUILTIN[0], self.START)}
+        assert set(rows) == set(ids[:2] + ids[6:])
+        assert [rows[i]['completed'] for i in ids[:2]] == [1, 1]
+        store.delete('ticket', ids[0], self.START)
+        assert ids[0] not in {row['id'] for row in store.tickets(ticket.TicketView.BUILTIN[0], self.START)}
+
+    def check_change_feed(self):
+        store = self.make()
+        first = self.add(store, "a", 5)
+        feed = store.changes()
+        assert [(entity, i, kind) for _, entity, i, kind, _, _ in feed] == [('ticket', first, 'created')]
+        assert feed[0][5]['title'] == "a" and feed[0][4] == self.START.isoformat()
+        mark = feed[-1][0]
+        store.update('ticket', first, {'paused': 1}, ('ticket', first, 'paused', self.START, {}))
+        store.delete('ticket', first, self.START)
+        later = store.changes(mark)
+        assert [kind for _, _, _, kind, _, _ in later] == ['paused', 'deleted']
+        assert later[0][5] == {} and [seq for seq, *_ in later] == sorted(seq for seq, *_ in later)
+        assert all(seq > mark for seq, *_ in later)
+        assert store.last_change() == later[-1][0]
+
+    def check_journal_replays_and_compacts(self):
+        store = self.make()
+        journal = getattr(store, 'journal', None)
+        if journal is None:
+            return  # Only the SQLite engines keep a replayable journal
+        ids = [self.add(store, f"t{n}", 30 + n) for n in range(6)]
+        later = (self.START + timedelta(hours=1)).isoformat()
+        store.update_many('ticket', [(i, {'paused': 1, 'paused_at': later, 'frozen_remaining': "60.0"})
+                                     for i in ids[:3]],
+                          [('ticket', i, 'paused', self.START, {'paused_at': later, 'frozen_remaining': "60.0"})
+                           for i in ids[:3]])
+        with store.conn:
+            journal.checkpoint()
+        store.cursor.execute("SELECT COUNT(*) FROM tickets_checkpoint")
+        assert store.cursor.fetchone()[0] == 6 and len(store.changes()) == 1
+        store.update('ticket', ids[3], {'completed': 1, 'completed_at': later},
+                     ('ticket', ids[3], 'completed', self.START, {'completed_at': later}))
+        store.delete('ticket', ids[4], self.START)
+        assert [kind for _, kind, _, _ in journal.history('ticket', ids[3])] == ['completed']
+        assert [i for _, _, i, *_ in journal.events(kind='completed')] == [ids[3]]
+        tables = {row['id']: {c: row[c] for c in ticket.Journal.DEFAULTS['ticket']}
+                  for row in store.tickets(ticket.TicketView.BUILTIN[0], self.START)}
+        assert journal.replay()['ticket'] == tables
+        # Losing the table rows is undone from the checkpoint and the events after it
+        with store.conn:
+            store.cursor.execute("UPDATE tickets SET due = NULL")
+            store.cursor.execute("DELETE FROM tickets WHERE id = ?", (ids[0],))
+            journal.restore()
+        assert {row['id']: {c: row[c] for c in ticket.Journal.DEFAULTS['ticket']}
+                for row in store.tickets(ticket.TicketView.BUILTIN[0], self.START)} == tables
+        assert not store.compact()  # Too few events since the checkpoint
+
+        # Rows stored before the journal are copied in a batch per checkpoint
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE tickets (title TEXT, description TEXT, created_at TEXT, due TEXT)")
+        conn.executemany("INSERT INTO tickets VALUES (?, 'old', ?, ?)",
+                         [(f"old{n}", self.START.isoformat(), later) for n in range(5)])
+        old = ticket.SQLiteStorage(conn)
+        old.journal.COPY_BATCH = 2
+        assert old.compact() and len(old.journal.replay()['ticket']) == 2
+        with old.conn:
+            old.cursor.execute("UPDATE tickets SET due = NULL")
+            old.journal.restore()  # Leaves the rows it has no copy of alone
+        rows = old.tickets(ticket.TicketView.BUILTIN[0], self.START)
+        assert sorted(row['due'] is None for row in rows) == [False, False, True, True, True]
+        assert old.compact() and old.compact() and not old.compact()
+        assert old.journal.replay()['ticket'] == {
+            row['id']: {c: row[c] for c in ticket.Journal.DEFAULTS['ticket']}
+            for row in old.tickets(ticket.TicketView.BUILTIN[0], self.START)}
+
+    def check_failed_write_leaves_nothing(self):
+        store = self.make()
+        first = self.add(store, "a", 5)
+        before = store.changes()
+        for write in (lambda: store.insert('ticket', {'no_such_column': 1}, self.START),
+                      lambda: store.update_many('ticket', [(first, {'paused': 1})],
+                                                [('ticket', first, 'exploded', self.START, {})])):
+            try:
+                write()
+            except Exception:
+                pass
+            else:
+                raise AssertionError("bad write was accepted")
+        assert store.changes() == before
+        rows = store.tickets(ticket.TicketView.BUILTIN[0], self.START)
+        assert [(row['id'], row['paused']) for row in rows] == [(first, 0)]
+
+    def check_views_filter_and_order(self):
+        store = self.make()
+        now = self.START + timedelta(hours=2)
+        minute = timedelta(minutes=1)
+        soon = self.add(store, "soon", 150, "dishes")
+        late = self.add(store, "late", 60, "laundry", self.START + minute)
+        later = self.add(store, "later", 30, "laundry", self.START + 2 * minute)
+        paused = self.add(store, "paused", 600, "Dishes and pans", self.START + 3 * minute)
+        store.update('ticket', paused, {'paused': 1}, ('ticket', paused, 'paused', now, {}))
+        done = self.add(store, "done", 10, created=self.START + 4 * minute)
+        store.update('ticket', done, {'completed': 1, 'completed_at': now.isoformat()},
+                     ('ticket', done, 'completed', now, {}))
+        views = {view.name: view for view in ticket.TicketView.BUILTIN}
+        expected = {
+            "All": [done, paused, later, late, soon],
+            "Overdue": [later, late],
+            "Due in the next hour": [soon],
+            "Paused": [paused],
+            "Done this week": [done],
+        }
+        for name, ids in expected.items():
+            got = [row['id'] for row in store.tickets(views[name], now)]
+            assert got == ids, f"{name}: {got} != {ids}"
+        search = ticket.TicketView("search", {'search': "dishes"})
+        assert {row['id'] for row in store.tickets(search, now)} == {soon, paused}
+        exact = ticket.TicketView("exact", {'description': "laundry", 'status': 'running'}, "due DESC")
+        assert [row['id'] for row in store.tickets(exact, now)] == [late, later]
+
+    def check_views_page_past_the_limit(self):
+        store = self.make()
+        now = self.START + timedelta(hours=2)
+        ids = [self.add(store, f"t{i}", 60 if i % 2 else 600, "mop", self.START + timedelta(seconds=i))
+               for i in range(5)]
+        overdue = ticket.TicketView("overdue", {'overdue': True}, "due")
+        assert store.count(ticket.TicketView.BUILTIN[0], now) == 5
+        assert store.count(overdue, now) == 2
+        assert [row['id'] for row in store.tickets(ticket.TicketView.BUILTIN[0], now, 3)] == ids[:1:-1]
+        assert sorted(store.ticket_ids(overdue, now)) == [ids[1], ids[3]]
+        rows = store.ticket_rows([ids[4], ids[0], -1])
+        assert sorted(row['id'] for row in rows) == [ids[0], ids[4]]
+        assert all(row['description'] == "mop" for row in rows)
+
+    def check_deleted_ids_are_not_reused(self):
+        store = self.make()
+        day = timedelta(days=1)
+        water = ticket.Recurrence("water", ticket.Recurrence.parse("every 3 days"), self.START + day, day)
+        store.save_recurrence(water)
+        first = self.add(store, "first", 5)
+        made = store.add_occurrence(water, {'title': "w", 'description': "water", 'created_at': self.START.isoformat(),
+                                            'due': (self.START + day).isoformat()}, self.START)
+        store.delete('ticket', made, self.START)
+        assert [r.ticket_id for r in store.recurrences()] == [None]
+        again = self.add(store, "again", 5)
+        assert again not in (first, made)
+        assert [i for _, _, i, kind, _, _ in store.changes() if kind == 'created'] == [first, made, again]
+        fridge = store.insert('fridge', {'name': "milk", 'added_at': self.START.isoformat()}, self.START)
+        store.delete('fridge', fridge, self.START)
+        assert store.insert('fridge', {'name': "eggs", 'added_at': self.START.isoformat()}, self.START) != fridge
+        if hasattr(store, 'conn'):
+            # Files from before keep their ids but stop reusing them
+            conn = sqlite3.connect(':memory:')
+            conn.execute("CREATE TABLE tickets (id INTEGER PRIMARY KEY, title TEXT, description TEXT, "
+                         "created_at TEXT, due TEXT)")
+            conn.executemany("INSERT INTO tickets VALUES (?, ?, 'old', ?, ?)",
+                             [(n, f"old{n}", self.START.isoformat(), self.START.isoformat()) for n in (1, 2, 7)])
+            old = ticket.SQLiteStorage(conn)
+            old.delete('ticket', 7, self.START)
+            assert self.add(old, "new", 5) == 8
+            assert {row['id'] for row in old.tickets(ticket.TicketView.BUILTIN[0], self.START)} == {1, 2, 8}
+
+    def check_descriptions_and_saved_views(self):
+        store = self.make()
+        self.add(store, "a", 5, "old", self.START)
+        self.add(store, "b", 5, "new", self.START + timedelta(days=1))
+        assert store.descriptions() == ["new", "old"]
+        assert store.views() == []
+        store.save_view(ticket.TicketView("Mine", {'search': "x"}, "due"))
+        store.save_view(ticket.TicketView("Later", {'status': 'paused'}))
+        assert [(v.name, v.spec, v.order) for v in store.views()] == [
+            ("Later", {'status': 'paused'}, "created_at DESC"), ("Mine", {'search': "x"}, "due")]
+        store.delete_view("Mine")
+        assert [v.name for v in store.views()] == ["Later"]
+
+    def check_recurrences_store_only_the_latest(self):
+        store = self.make()
+        assert store.recurrences() == []
+        day = timedelta(days=1)
+        first = ticket.Recurrence("water", ticket.Recurrence.parse("every 3 days"), self.START + day, day)
+        other = ticket.Recurrence("bins", ticket.Recurrence.parse("mon thu"), self.START, timedelta(hours=1))
+        store.save_recurrence(first)
+        store.save_recurrence(other)
+        assert first.id != other.id
+        due = first.next_due(self.START)
+        made = store.add_occurrence(first, {'title': "w", 'description': "water", 'created_at': self.START.isoformat(),
+                                            'due': due.isoformat()}, self.START)
+        assert (first.last_due, first.ticket_id) == (due, made)
+        loaded = {r.id: r for r in store.recurrences()}
+        assert (loaded[first.id].last_due, loaded[first.id].ticket_id) == (due, made)
+        assert loaded[first.id].spec() == first.spec() and loaded[other.id].last_due is None
+        assert loaded[first.id].next_due(self.START) == due + 3 * day
+        rows = store.tickets(ticket.TicketView.BUILTIN[0], self.START)
+        assert [(row['id'], row['due']) for row in rows] == [(made, due.isoformat())]
+        store.delete_recurrence(other.id)
+        assert [r.id for r in store.recurrences()] == [first.id]
+
+    def check_attachments_stream_in_chunks(self):
+        store = self.make()
+        kept, doomed = self.add(store, "a", 5), self.add(store, "b", 5)
+        data = bytes(random.Random(7).getrandbits(8) for _ in range(3 * store.CHUNK + 17))
+        meta = {'name': "receipt.png", 'mime': 'image/png', 'added_at': self.START.isoformat(), 'thumbnail': b"png"}
+        first = store.attach(kept, meta, io.BytesIO(data), len(data))
+        note = store.attach(kept, {'name': "Note", 'mime': 'text/plain', 'summary': "call back"},
+                            io.BytesIO(b"call back"), 9)
+        store.attach(doomed, meta, io.BytesIO(b"x"), 1)
+        listed = store.attachments(kept)
+        assert [a['id'] for a in listed] == [first, note]
+        assert set(listed[0]) == set(ticket.Storage.ATTACHMENT_COLUMNS)
+        assert (listed[0]['size'], listed[0]['thumbnail'], listed[1]['summary']) == (len(data), b"png", "call back")
+        sink = io.BytesIO()
+        store.read_attachment(first, sink)
+        assert sink.getvalue() == data
+        try:
+            store.attach(kept, meta, io.BytesIO(b"short"), 10)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("short attachment was accepted")
+        store.delete_attachment(note)
+        assert [a['id'] for a in store.attachments(kept)] == [first]
+        store.delete('ticket', doomed, self.START)
+        assert store.attachments(doomed) == []
+
+    def check_dependencies_push_deadlines(self):
+        store = self.make()
+        first, second, third = self.add(store, "a", 60), self.add(store, "b", 30), self.add(store, "c", 10)
+        store.add_dependency(second, first)
+        changes = store.add_dependency(third, second)
+        hour = timedelta(hours=1)
+        ready = (self.START + hour).isoformat()
+        assert store.schedules([second])[second] == (ready, (self.START + 1.5 * hour).isoformat(), 1, 1)
+        assert changes == {third: ((self.START + 1.5 * hour).isoformat(),
+                                   (self.START + 1.5 * hour + timedelta(minutes=10)).isoformat(), 1, 2)}
+        for ticket_id, blocker_id in ((first, third), (first, first)):
+            try:
+                store.add_dependency(ticket_id, blocker_id)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("a circle of waits was accepted")
+        assert sorted(store.blockers([first, second, third])) == [(second, first), (third, second)]
+        # Tickets pushed back by what they wait for aren't overdue at their own due time
+        overdue = ticket.TicketView.BUILTIN[1]
+        assert store.count(overdue, self.START + timedelta(minutes=45)) == 0
+        late = self.START + timedelta(minutes=95)
+        assert [row['id'] for row in store.tickets(overdue, late)] == [second, first]
+        assert sorted(store.ticket_ids(overdue, late)) == [first, second]
+        # Upcoming goes by the pushed-back deadline too: "c" is due first but comes last
+        soon = store.upcoming(self.START, self.START + timedelta(minutes=95))
+        assert [(deadline, row['id']) for deadline, row in soon] == [
+            ((self.START + hour).isoformat(), first), ((self.START + 1.5 * hour).isoformat(), second)]
+        assert [row['title'] for _, row in store.upcoming(self.START, late + hour, limit=2)] == ["a", "b"]
+        assert [row['id'] for _, row in store.upcoming(self.START + 1.6 * hour, late + hour)] == [third]
+        # Finishing early pulls everything downstream in
+        done = self.START + timedelta(minutes=20)
+        store.update('ticket', first, {'completed': 1, 'completed_at': done.isoformat()},
+                     ('ticket', first, 'completed', done, {}))
+        changes = store.reschedule([first])
+        assert set(changes) == {second, third}
+        assert changes[second] == (done.isoformat(), (done + timedelta(minutes=30)).isoformat(), 0, 1)
+        # Nobody knows when a paused blocker will be done
+        store.update('ticket', second, {'paused': 1, 'paused_at': done.isoformat()},
+                     ('ticket', second, 'paused', done, {}))
+        assert store.reschedule([second]) == {third: (None, None, 1, 2)}
+        assert store.remove_dependency(third, second) == {third: None}
+        assert store.schedules([third]) == {}
+        waiting = [t for _, t in store.dependents([first])]
+        store.delete('ticket', first, done)
+        assert store.reschedule(waiting) == {second: None}
+        assert store.blockers([second]) == [] and store.dependents([first]) == []
+
+    def check_bad_rows_are_reported_and_repaired(self):
+        store = self.make()
+        at = self.START.isoformat()
+        # Older versions wrote '' or '0' for columns that aren't set
+        good = store.insert('ticket', {'title': "fine", 'created_at': at, 'due': at, 'paused_at': "0",
+                                       'frozen_remaining': ""}, self.START)
+        word = store.insert('ticket', {'title': "word", 'created_at': "yesterday", 'due': at}, self.START)
+        feb = store.insert('ticket', {'title': "feb", 'created_at': at, 'due': "2026-02-30T10:00"}, self.START)
+        old = store.insert('ticket', {'title': "old", 'created_at': at, 'due': at, 'paused': 1, 'paused_at': "noon",
+                                      'frozen_remaining': "1.5.2"}, self.START)
+        zone = store.insert('ticket', {'title': "zone", 'created_at': at + "+02:00", 'due': at + " "}, self.START)
+        milk = store.insert('fridge', {'name': "milk", 'added_at': ""}, self.START)
+        store.insert('fridge', {'name': "eggs", 'added_at': at}, self.START)
+        # Near misses a loose SQL filter lets through, and odd but valid values it must not report
+        sneaky = [store.insert('ticket', {'title': "sneaky", 'created_at': stamp, 'due': at,
+                                          'frozen_remaining': number}, self.START)
+                  for stamp, number in (("2026-01-0112:00:04", "1.5.2"), ("0000-01-01", "-"),
+                                        ("2026-01-01T24:00", "+"), ("2026-01-01T12:00:60", "."),
+                                        ("2026-01-01T12:00:04.", "e"), ("2026-01-01T12:00:04.5x", "1e"),
+                                        ("2026-01-01T12:0", "--1"), ("2026-1-01", "+-"))]
+        # Numbers float() reads but a timedelta can't hold
+        huge = [store.insert('ticket', {'title': "huge", 'created_at': at, 'due': at, 'frozen_remaining': number},
+                             self.START)
+                for number in ("nan", "inf", "-inf", "1e14", "1e400", "100000000000000.0", 1e14, float('inf'))]
+        odd = store.insert('ticket', {'title': "odd", 'created_at': "20260101T120004", 'due': "2026-01-01 12:00",
+                                      'frozen_remaining': "1e5"}, self.START)
+        ancient = store.insert('ticket', {'title': "ancient", 'created_at': "0001-01-01T00:00",
+                                          'due': "9999-12-31T23:59"}, self.START)
+        report = store.check()
+        assert {(p['entity'], p['id']): set(p['columns']) for p in report.problems} == {
+            ('ticket', word): {'created_at'}, ('ticket', feb): {'due'},
+            ('ticket', old): {'paused_at', 'frozen_remaining'}, ('ticket', zone): {'created_at', 'due'},
+            ('fridge', milk): {'added_at'}, **{('ticket', i): {'created_at', 'frozen_remaining'} for i in sneaky},
+            **{('ticket', i): {'frozen_remaining'} for i in huge}}
+        assert not {good, odd, ancient} & report.skipped['ticket']
+        assert len(report.lines()) == 7 + 2 * len(sneaky) + len(huge)
+        fixed = self.START + timedelta(days=1)
+        store.repair(report, fixed)
+        assert not store.check()
+        rows = {row['id']: row for row in store.tickets(ticket.TicketView.BUILTIN[0], fixed)}
+        assert (rows[word]['created_at'], rows[word]['due']) == (fixed.isoformat(), at)
+        assert rows[feb]['due'] == (self.START + timedelta(minutes=5)).isoformat()
+        assert (rows[old]['paused'], rows[old]['paused_at'], rows[old]['frozen_remaining']) == (1, None, None)
+        assert rows[zone]['due'] == (fixed + timedelta(minutes=5)).isoformat()
+        assert all(rows[i]['frozen_remaining'] is None for i in huge)
+        # Whatever passes the check can be sorted by every key
+        order = ticket.TicketOrder(ticket.TicketApp.ticket_from_row(row) for row in rows.values())
+        assert order.ordered('Created')[-1].id == ancient and order.ordered('Due')[-1].id == ancient
+        assert [row['added_at'] for row in store.fridge_items() if row['id'] == milk] == [fixed.isoformat()]
+        repaired = {(entity, i) for _, entity, i, kind, _, _ in store.changes() if kind == 'repaired'}
+        assert repaired == {('ticket', word), ('ticket', feb), ('ticket', old), ('ticket', zone), ('fridge', milk),
+                            *(('ticket', i) for i in sneaky + huge)}
+
+    def check_open_rechecks_changed_rows(self):
+        store = self.make()
+        first = self.add(store, "first", 5)
+        second = self.add(store, "second", 5)
+        assert not store.check_changed()
+        store.update('ticket', second, {'due': "soon"}, ('ticket', second, 'resumed', self.START, {}))
+        assert [p['id'] for p in store.check_changed().problems] == [second]
+        assert [p['id'] for p in store.check_changed().problems] == [second]  # Until it is repaired
+        store.repair(store.check_changed(), self.START)
+        assert not store.check_changed()
+        if hasattr(store, 'conn'):
+            # Rows written behind the app's back are stamped by the triggers too
+            with store.conn:
+                store.cursor.execute("UPDATE tickets SET created_at = 'then' WHERE id = ?", (first,))
+            assert [p['id'] for p in store.check_changed().problems] == [first]
+
+    @classmethod
+    def script(cls, store, seed, steps):
+        """Random inserts, pauses, completions and deletes; returns what every view sees"""
+        rng = random.Random(seed)
+        handles = {}  # Engines may number rows differently; compare by insertion order
+        now = cls.START
+        for step in range(steps):
+            now += timedelta(minutes=rng.randint(0, 30))
+            live = list(handles.items())
+            roll = rng.random()
+            if roll < 0.5 or not live:
+                handles[step] = cls.add(store, f"t{step}", rng.randint(-60, 600),
+                                           rng.choice(["dishes", "laundry", "bins", "Dishes"]), now)
+                continue
+            picked = rng.sample(live, min(len(live), rng.randint(1, 5)))
+            if roll < 0.7:
+                store.update_many('ticket', [(i, {'paused': 1, 'paused_at': now.isoformat()}) for _, i in picked],
+                                  [('ticket', i, 'paused', now, {}) for _, i in picked])
+            elif roll < 0.9:
+                store.update_many('ticket', [(i, {'completed': 1, 'completed_at': now.isoformat()})
+                                             for _, i in picked],
+                                  [('ticket', i, 'completed', now, {}) for _, i in picked])
+            else:
+                store.delete_many('ticket', [i for _, i in picked], now)
+                for handle, _ in picked:
+                    del handles[handle]
+        by_id = {i: handle for handle, i in handles.items()}
+        views = list(ticket.TicketView.BUILTIN) + [
+            ticket.TicketView("search", {'search': "dish"}, "due"),
+            ticket.TicketView("exact", {'description': "bins", 'status': 'open'})]
+        seen = {}
+        for view in views:
+            rows = store.tickets(view, now)
+            keys = [tuple(row[term.split()[0]] for term in view.order.split(',')) for row in rows]
+            seen[view.name] = (sorted(by_id[row['id']] for row in rows), keys)
+        feed = [(entity, kind, at, data) for _, entity, _, kind, at, data in store.changes()]
+        return seen, feed, store.descriptions()
+
+
+def conformance(args):
+    engines = {
+        'sqlite': lambda: ticket.SQLiteStorage(sqlite3.connect(':memory:')),
+        'memory': ticket.MemoryStorage,
+    }
+    failures = 0
+    results = {}
+    for name, make in engines.items():
+        for check in Conformance(make).checks():
+            try:
+                check()
+            except Exception as e:
+                failures += 1
+                print(f"FAIL {name} {check.__name__}: {e!r}")
+        started = time.perf_counter()
+        results[name] = Conformance.script(make(), args.seed, args.steps)
+        print(f"{name:>8}: {args.steps} random steps in {time.perf_counter() - started:.3f}s")
+    reference = results.pop('sqlite')
+    for name, result in results.items():
+        for part, ours, theirs in zip(("views", "change feed", "descriptions"), result, reference):
+            if ours != theirs:
+                failures += 1
+                print(f"FAIL {name}: {part} differ from sqlite")
+    print("PASS" if not failures else f"FAIL: {failures} problems")
+    return 1 if failures else 0
+
+
+def descendants(widget):
+    for child in widget.winfo_children():
+        yield child
+        yield from descendants(child)
+
+
+def geometry(args):
+    """Count geometry requests and <Configure> events each tick causes"""
+    xvfb = start_display()
+    try:
+        root = tk.Tk()
+        clock = ticket.SimulatedClock()
+        app = ticket.TicketApp(root, clock=clock, storage=ticket.MemoryStorage())
+        rng = random.Random(args.seed)
+        words = "wash dry fold sort file email call book pay fix".split()
+        for n in range(args.tickets):
+            # Countdowns that cross the day, hour and minute formats while
+            # the benchmark runs, and descriptions of very different lengths
+            app.desc_var.set(' '.join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+            app.day_var.set(str(n % 2))
+            app.hour_var.set("0")
+            app.min_var.set(str(rng.randint(0, 2)))
+            app.sec_var.set(str(rng.randint(0, 59)))
+            app.add_ticket()
+        for n in range(args.tickets // 4):
+            app.fridge_var.set(' '.join(rng.choice(words) for _ in range(rng.randint(1, 6))))
+            app.add_fridge_item()
+        root.update()
+
+        configures = []
+        root.bind_all('<Configure>', lambda event: configures.append(event.widget), add='+')
+        widgets = list(descendants(app.ticket_frame)) + list(descendants(app.fridge_frame))
+        requests, events, times = [], [], []
+        for _ in range(args.ticks):
+            clock.advance(seconds=1)
+            before = [(w.winfo_reqwidth(), w.winfo_reqheight()) for w in widgets]
+            configures.clear()
+            started = time.perf_counter()
+            app.refresh_labels()
+            root.update_idletasks()
+            times.append((time.perf_counter() - started) * 1000)
+            after = [(w.winfo_reqwidth(), w.winfo_reqheight()) for w in widgets]
+            requests.append(sum(old != new for old, new in zip(before, after)))
+            events.append(len(configures))
+        root.destroy()
+
+        print(f"geometry requests per tick: {statistics.fmean(requests):8.2f}  (max {max(requests)})")
+        print(f" <Configure> events per tick: {statistics.fmean(events):8.2f}  (max {max(events)})")
+        print(f"          tick time (median): {statistics.median(times):8.2f} ms")
+        if max(requests) or max(events):
+            print("FAIL: ticks change the layout")
+            return 1
+        print("PASS")
+        return 0
+    finally:
+        if xvfb:
+            xvfb.terminate()
+
+
+def timeline(args):
+    """Time timeline frames while panning across several zoom levels"""
+    xvfb = start_display()
+    try:
+        root = tk.Tk()
+        clock = ticket.SimulatedClock()
+        app = ticket.TicketApp(root, clock=clock, storage=ticket.MemoryStorage())
+        rng = random.Random(args.seed)
+        now = clock.now()
+        # Straight into storage; the main list isn't reloaded for the benchmark
+        for n in range(args.tickets):
+            created = now + timedelta(days=rng.uniform(-60, 60))
+            due = created + timedelta(minutes=rng.expovariate(1 / 600))
+            fields = {'title': f"t{n}", 'description': "chore",
+                      'created_at': created.isoformat(), 'due': due.isoformat()}
+            if due < now and rng.random() < 0.7:
+                fields.update(completed=1, completed_at=(due - timedelta(minutes=rng.uniform(-60, 60))).isoformat())
+            elif created < now and rng.random() < 0.1:
+                fields.update(paused=1, paused_at=(created + (now - created) * rng.random()).isoformat())
+            app.storage.insert('ticket', fields, now)
+        started = time.perf_counter()
+        app.open_timeline()
+        view = app.timeline
+        root.update()
+        print(f"{args.tickets} tickets loaded in {time.perf_counter() - started:.2f} s")
+
+        width = view.canvas.winfo_width()
+        failures = 0
+        for label, span in (("30 days", 30 * 86400), ("1 day", 86400), ("1 hour", 3600)):
+            view.start = now.timestamp() - span / 2
+            view.end = view.start + span
+            view.redraw()
+            root.update_idletasks()
+            items = sum(len(pool.items) for pool in view.pools)
+            times = []
+            for frame in range(args.frames):
+                shift = (-1 if frame // 60 % 2 else 1) * span / width * 8  # 8 px a frame, back and forth
+                view.start += shift
+                view.end += shift
+                started = time.perf_counter()
+                view.redraw()
+                root.update_idletasks()
+                times.append((time.perf_counter() - started) * 1000)
+            grown = sum(len(pool.items) for pool in view.pools) - items
+            p95 = statistics.quantiles(times, n=20)[-1]
+            print(f"{label:>8}: {statistics.median(times):6.2f} ms median, {p95:6.2f} ms p95, "
+                  f"{items} items, {grown} created while panning")
+            if p95 > args.frame_ms:
+                failures += 1
+        if failures:
+            print(f"FAIL: frames slower than {args.frame_ms:.1f} ms")
+
+        # Focus re-reads the spans only when the journal moved
+        focus = SimpleNamespace(widget=view.window)
+        spans = view.spans
+        view.on_focus(focus)
+        if view.spans is not spans:
+            print("FAIL: focus reloaded the timeline with nothing changed")
+            failures += 1
+        app.storage.insert('ticket', {'title': "late", 'description': "chore", 'created_at': now.isoformat(),
+                                      'due': (now + timedelta(hours=1)).isoformat()}, now)
+        view.on_focus(focus)
+        if len(view.spans) != len(spans) + 1:
+            print("FAIL: focus missed a ticket added in the main window")
+            failures += 1
+        root.destroy()
+        if failures:
+            return 1
+        print("PASS")
+        return 0
+    finally:
+        if xvfb:
+            xvfb.terminate()
+
+
+def attachments(args):
+    """Round-trip a large attachment and measure the memory it takes"""
+    size = args.megabytes << 20
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path, copy_path = os.path.join(tmp, "source.bin"), os.path.join(tmp, "copy.bin")
+        with open(source_path, 'wb') as source:
+            for _ in range(args.megabytes):
+                source.write(os.urandom(1 << 20))
+        store = ticket.SQLiteStorage(sqlite3.connect(os.path.join(tmp, "attachments.db")))
+        now = datetime.now()
+        everything = ticket.TicketView.BUILTIN[0]
+        for n in range(args.tickets):
+            store.insert('ticket', {'title': f"t{n}", 'description': "chore", 'created_at': now.isoformat(),
+                                    'due': (now + timedelta(minutes=n)).isoformat()}, now)
+        started = time.perf_counter()
+        store.tickets(everything, now)
+        before = time.perf_counter() - started
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with open(source_path, 'rb') as source:
+            attachment = store.attach(1, {'name': "source.bin"}, source, size)
+        written = time.perf_counter() - started
+        _, write_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        with open(copy_path, 'wb') as sink:
+            store.read_attachment(attachment, sink)
+        read = time.perf_counter() - started
+        _, read_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        store.tickets(everything, now)
+        after = time.perf_counter() - started
+        store.close()
+        with open(source_path, 'rb') as a, open(copy_path, 'rb') as b:
+            same = all(x == y for x, y in zip(iter(lambda: a.read(1 << 20), b""), iter(lambda: b.read(1 << 20), b"")))
+
+    print(f"  write {args.megabytes} MB: {written:.2f} s, peak {write_peak / 1024:.0f} KB traced")
+    print(f"   read {args.megabytes} MB: {read:.2f} s, peak {read_peak / 1024:.0f} KB traced")
+    print(f"  load {args.tickets} tickets: {before * 1000:.1f} ms before, {after * 1000:.1f} ms after")
+    limit = args.max_peak_kb * 1024
+    if not same or max(write_peak, read_peak) > limit:
+        print("FAIL: " + ("copy differs" if not same else f"more than {args.max_peak_kb} KB held at once"))
+        return 1
+    print("PASS")
+    return 0
+
+
+def sync(args):
+    """Sync two copies of a file through conflicting edits and a delete"""
+    now = datetime.now().replace(microsecond=0)
+    failures = []
+
+    def check(what, got, expected):
+        if got != expected:
+            failures.append(f"{what}: {got} != {expected}")
+
+    def edit(path, changes):
+        store = ticket.SQLiteStorage(sqlite3.connect(path))
+        for ticket_id, fields, kind in changes:
+            store.update('ticket', ticket_id, fields, ('ticket', ticket_id, kind, now, fields))
+        store.close()
+        time.sleep(0.01)  # Field groups are stamped to the millisecond; keep the writers apart
+
+    def rows(path):
+        conn = sqlite3.connect(path)
+        found = conn.execute("SELECT uid, title, due, paused, completed FROM tickets ORDER BY uid").fetchall()
+        conn.close()
+        return found
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_a, path_b = os.path.join(tmp, "a.db"), os.path.join(tmp, "b.db")
+        store = ticket.SQLiteStorage(sqlite3.connect(path_a))
+        with store.conn:
+            ids = [store.insert_row('ticket', {'title': f"t{n}", 'description': "chore",
+                                               'created_at': now.isoformat(),
+                                               'due': (now + timedelta(hours=1)).isoformat()}, now)[0]
+                   for n in range(args.tickets)]
+        store.close()
+        shutil.copy(path_a, path_b)
+        check("hand copies", ticket.sync_databases(path_a, path_b, now), (0, 0))
+
+        # Both sides move the same due time; the later edit wins. One side
+        # pauses and the other completes the same ticket; different field
+        # groups, so both stick. An edit loses to a delete made elsewhere.
+        due_a, due_b = (now + timedelta(hours=2)).isoformat(), (now + timedelta(hours=3)).isoformat()
+        edit(path_a, [(ids[0], {'due': due_a}, 'resumed'),
+                      (ids[1], {'completed': 1, 'completed_at': now.isoformat()}, 'completed'),
+                      (ids[2], {'due': due_a}, 'resumed')])
+        edit(path_b, [(ids[0], {'due': due_b}, 'resumed'),
+                      (ids[1], {'paused': 1, 'paused_at': now.isoformat()}, 'paused')])
+        store = ticket.SQLiteStorage(sqlite3.connect(path_b))
+        store.delete('ticket', ids[2], now)
+        store.close()
+
+        synced = now + timedelta(days=1)  # Not the wall clock, so the journal shows whose time it used
+        started = time.perf_counter()
+        check("conflicting sync", ticket.sync_databases(path_a, path_b, synced), (3, 1))
+        print(f"{args.tickets} tickets synced in {(time.perf_counter() - started) * 1000:.1f} ms")
+        merged = rows(path_a)
+        check("copies after sync", rows(path_b), merged)
+        by_title = {title: (due, paused, completed) for _, title, due, paused, completed in merged}
+        check("later due", by_title.get("t0", (None,))[0], due_b)
+        check("pause and completion", by_title.get("t1", (None,))[1:], (1, 1))
+        check("deleted ticket", "t2" in by_title, False)
+        check("rows", len(merged), args.tickets - 1)
+        store = ticket.SQLiteStorage(sqlite3.connect(path_a))
+        check("delete journaled at", [at for _, _, _, _, at, _ in store.journal.events(kind='deleted')],
+              [synced.isoformat()])
+        store.close()
+
+        started = time.perf_counter()
+        check("second sync", ticket.sync_databases(path_a, path_b, synced), (0, 0))
+        print(f"  nothing new synced in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        return 1
+    print("PASS")
+    return 0
+
+
+def dependencies_after_sync(tmp):
+    """Waits planned in one copy of a file follow edits and deletes synced
+    from another copy; returns what went wrong"""
+    now = datetime.now().replace(microsecond=0)
+    path_a, path_b = os.path.join(tmp, "a.db"), os.path.join(tmp, "b.db")
+    store = ticket.SQLiteStorage(sqlite3.connect(path_a))
+    first = store.insert('ticket', {'title': "first", 'description': "wash", 'created_at': now.isoformat(),
+                                    'due': (now + timedelta(hours=1)).isoformat()}, now)
+    second = store.insert('ticket', {'title': "second", 'description': "dry", 'created_at': now.isoformat(),
+                                     'due': (now + timedelta(minutes=10)).isoformat()}, now)
+    store.add_dependency(second, first)
+    store.close()
+    shutil.copy(path_a, path_b)
+
+    failures = []
+    later = (now + timedelta(hours=3)).isoformat()
+    other = ticket.SQLiteStorage(sqlite3.connect(path_b))
+    other.update('ticket', first, {'due': later}, ('ticket', first, 'resumed', now, {'due': later}))
+    other.reschedule([first])
+    other.close()
+    ticket.sync_databases(path_a, path_b, now)
+    store = ticket.SQLiteStorage(sqlite3.connect(path_a))
+    schedule = store.schedules([second]).get(second)
+    if schedule is None or schedule[0] != later:
+        failures.append(f"synced due not replanned: {schedule}")
+    store.close()
+
+    other = ticket.SQLiteStorage(sqlite3.connect(path_b))
+    other.delete('ticket', first, now)
+    other.close()
+    ticket.sync_databases(path_a, path_b, now)
+    store = ticket.SQLiteStorage(sqlite3.connect(path_a))
+    if store.schedules([second]):
+        failures.append(f"still waits for a ticket deleted by sync: {store.schedules([second])}")
+    store.close()
+    return failures
+
+
+def dependencies(args):
+    """Time adding waits and completing tickets in a large waiting graph"""
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        failed = dependencies_after_sync(tmp)
+        for failure in failed:
+            print(f"FAIL after sync: {failure}")
+        store = ticket.SQLiteStorage(sqlite3.connect(os.path.join(tmp, "dependencies.db")))
+        now = datetime.now()
+        started = time.perf_counter()
+        with store.conn:
+            for n in range(args.tickets):
+                store.insert_row('ticket', {'title': f"t{n}", 'description': "chore", 'created_at': now.isoformat(),
+                                            'due': (now + timedelta(minutes=rng.randint(10, 600))).isoformat()}, now)
+        # A sparse random graph: every ticket waits for none, one or two older ones nearby
+        edges, depth = [], {}
+        for n in range(2, args.tickets + 1):
+            for blocker in rng.sample(range(max(1, n - args.reach), n), rng.choices((0, 1, 2), (6, 3, 1))[0]):
+                edges.append((n, blocker))
+                depth[n] = max(depth.get(n, 0), depth.get(blocker, 0) + 1)
+        with store.conn:
+            store.cursor.executemany("INSERT OR IGNORE INTO dependencies VALUES (?, ?)", edges)
+        store.write_schedules({n: (None, None, 0, d) for n, d in depth.items()})
+        store.reschedule(range(1, args.tickets + 1))
+        print(f"{args.tickets} tickets, {len(edges)} waits, {max(depth.values())} deep, "
+              f"built in {time.perf_counter() - started:.1f} s")
+
+        timings = {'wait': [], 'complete': []}
+        touched = []
+        for _ in range(args.operations):
+            n = rng.randint(2, args.tickets)
+            blocker = rng.randint(max(1, n - args.reach), n - 1)
+            started = time.perf_counter()
+            store.add_dependency(n, blocker)  # Older blockers never close a circle
+            timings['wait'].append((time.perf_counter() - started) * 1000)
+
+            n = rng.randint(1, args.tickets)
+            started = time.perf_counter()
+            store.update('ticket', n, {'completed': 1, 'completed_at': now.isoformat()},
+                         ('ticket', n, 'completed', now, {}))
+            touched.append(len(store.reschedule([n])))
+            timings['complete'].append((time.perf_counter() - started) * 1000)
+        store.close()
+
+    failures = len(failed)
+    for name, times in timings.items():
+        p95 = statistics.quantiles(times, n=20)[-1]
+        print(f"{name:>9}: {statistics.median(times):6.2f} ms median, {p95:6.2f} ms p95")
+        if p95 > args.max_ms:
+            failures += 1
+    print(f"  {statistics.mean(touched):.1f} schedules changed per completion, at most {max(touched)}")
+    if failures > len(failed):
+        print(f"FAIL: slower than {args.max_ms:.0f} ms")
+    if failures:
+        return 1
+    print("PASS")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('soak', help="churn tickets, timers and DB switches and watch for leaks")
+    run.add_argument('--cycles', type=int, default=3000)
+    run.add_argument('--population', type=int, default=40, help="tickets kept alive at once")
+    run.add_argument('--switch-every', type=int, default=250, help="cycles between DB switches")
+    run.add_argument('--sample-every', type=int, default=100)
+    run.add_argument('--clock-step', type=float, default=600,
+                     help="simulated seconds that pass per cycle")
+    run.add_argument('--max-widget-growth', type=float, default=20)
+    run.add_argument('--max-after-growth', type=float, default=2)
+    run.add_argument('--max-memory-growth-kb', type=float, default=2048)
+    run.add_argument('--max-tick-growth', type=float, default=1.0,
+                     help="allowed tick latency growth as a fraction of the median")
+    run.set_defaults(func=soak)
+
+    run = commands.add_parser('idle', help="measure CPU use of a window nobody interacts with")
+    run.add_argument('--tickets', type=int, default=5000)
+    run.add_argument('--running', type=int, default=5, help="tickets that tick every second")
+    run.add_argument('--seconds', type=float, default=10)
+    run.add_argument('--max-cpu', type=float, default=0.05, help="allowed CPU time as a fraction")
+    run.set_defaults(func=idle)
+
+    run = commands.add_parser('conformance', help="check every storage engine against the same expectations")
+    run.add_argument('--steps', type=int, default=3000, help="length of the random script")
+    run.add_argument('--seed', type=int, default=1)
+    run.set_defaults(func=conformance)
+
+    run = commands.add_parser('geometry', help="check that ticks change text without re-layout")
+    run.add_argument('--tickets', type=int, default=12, help="rows; keep them all on screen")
+    run.add_argument('--ticks', type=int, default=120)
+    run.add_argument('--seed', type=int, default=1)
+    run.set_defaults(func=geometry)
+
+    run = commands.add_parser('timeline', help="time timeline frames while panning at several zoom levels")
+    run.add_argument('--tickets', type=int, default=100000)
+    run.add_argument('--frames', type=int, default=240, help="pan steps per zoom level")
+    run.add_argument('--frame-ms', type=float, default=1000 / 60, help="allowed p95 frame time")
+    run.add_argument('--seed', type=int, default=1)
+    run.set_defaults(func=timeline)
+
+    run = commands.add_parser('attachments', help="stream a large attachment in and out and watch memory")
+    run.add_argument('--megabytes', type=int, default=50)
+    run.add_argument('--tickets', type=int, default=1000)
+    run.add_argument('--max-peak-kb', type=int, default=1024, help="most memory held while copying")
+    run.set_defaults(func=attachments)
+
+    run = commands.add_parser('sync', help="sync two copies of a file through conflicting edits and a delete")
+    run.add_argument('--tickets', type=int, default=10000)
+    run.set_defaults(func=sync)
+
+    run = commands.add_parser('dependencies', help="time waits and completions in a large waiting graph")
+    run.add_argument('--tickets', type=int, default=100000)
+    run.add_argument('--reach', type=int, default=2000, help="how far back a ticket's blockers can be")
+    run.add_argument('--operations', type=int, default=300, help="waits added and tickets completed")
+    run.add_argument('--max-ms', type=float, default=100, help="allowed p95 per operation")
+    run.add_argument('--seed', type=int, default=1)
+    run.set_defaults(func=dependencies)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,2518 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog, font as tkfont
 from datetime import datetime, timedelta
 import sqlite3
+import bisect
+import calendar
+import heapq
+import itertools
+import math
+import mimetypes
+import re
+import time
+import json
+import io
+import uuid
+import sys
 import os
+import urllib.parse
+import weakref
+
+class Clock:
+    """The app's source of the current time.
+
+    Wall time is advanced with time.monotonic(), so countdowns run smoothly
+    while NTP slews the system clock. Once the two part by more than DRIFT,
+    as after a suspend (the monotonic clock stops while the machine
+    sleeps) or a real correction, it re-anchors to the wall clock so the
+    times shown and saved stay right. Callers take one now() per tick and
+    pass it to every row.
+    """
+    DRIFT = timedelta(seconds=1)
+
+    def __init__(self):
+        self.resync()
+
+    def resync(self):
+        """Re-anchor to the wall clock"""
+        self.anchor_wall = datetime.now()
+        self.anchor_mono = time.monotonic()
+
+    def now(self):
+        wall = datetime.now()
+        steady = self.anchor_wall + timedelta(seconds=time.monotonic() - self.anchor_mono)
+        if abs(wall - steady) > self.DRIFT:
+            self.anchor_wall, self.anchor_mono = wall, time.monotonic()
+            return wall
+        return steady
+
+class SimulatedClock(Clock):
+    """A clock that only moves when told to, for tests and benchmarks"""
+    def __init__(self, start=None):
+        self.current = start or datetime.now()
+
+    def resync(self):
+        pass
+
+    def now(self):
+        return self.current
+
+    def advance(self, delta=None, **kwargs):
+        """Move time forward by a timedelta or timedelta keyword arguments"""
+        self.current += delta if delta is not None else timedelta(**kwargs)
+        return self.current
+
+default_clock = Clock()
 
 class Ticket:
     def __init__(self, title, description, created_at, due):
+        self.id = None
         self.title = title
         self.description = description
         self.created_at = created_at
         self.due = due
         self.completed = False
         self.completed_time = None
+        self.completed_at = None
         self.paused = False
         self.paused_at = None
         self.frozen_remaining = None
+        self.ready_at = None  # When the tickets it waits for should be done
+        self.effective_due = None  # Its due pushed back by those tickets
+        self.waiting = 0  # How many of them are still open
 
-    def remaining_time(self):
+    @property
+    def deadline(self):
+        return self.effective_due or self.due
+
+    def plan(self, schedule):
+        """Take the waiting times worked out by the storage, or None if it waits for nothing"""
+        ready_at, effective_due, waiting, _ = schedule or (None, None, 0, 0)
+        self.ready_at = datetime.fromisoformat(ready_at) if ready_at else None
+        self.effective_due = datetime.fromisoformat(effective_due) if effective_due else None
+        self.waiting = waiting
+
+    def remaining_time(self, now):
         try:
             if self.paused and self.frozen_remaining is not None:
                 return self.frozen_remaining
             if not isinstance(self.due, datetime):
                 return timedelta(0)
-            return self.due - datetime.now()
+            if self.completed and isinstance(self.completed_at, datetime):
+                return self.deadline - self.completed_at  # Stops counting once done
+            return self.deadline - now
         except Exception as e:
             print(f"Error calculating remaining time for {self.title}: {e}")
             return timedelta(0)
 
 class FridgeItem:
     def __init__(self, name, added_at):
+        self.id = None
         self.name = name
         self.added_at = added_at
         self.paused = False
         self.paused_at = None
         self.frozen_age = None
 
-    def age(self):
+    def age(self, now):
         try:
             if self.paused and self.frozen_age is not None:
                 return self.frozen_age
             if not isinstance(self.added_at, datetime):
                 return timedelta(0)
-            return datetime.now() - self.added_at
+            return now - self.added_at
         except Exception as e:
             print(f"Error calculating age for {self.name}: {e}")
             return timedelta(0)
 
+class TicketOrder:
+    """The loaded tickets kept sorted by every sort key at once.
+
+    Each order is a list of (key, ticket id) kept sorted with bisect, so
+    adding, removing or re-keying a ticket costs a binary search and one
+    list insert per order, and switching orders only reads another list.
+    Keys must not change with the clock alone: a running ticket's time
+    left shrinks while a paused one's doesn't, so "Remaining" lists the
+    running tickets first (by due time, the same order as time left),
+    then the paused ones, then the completed ones.
+    """
+    # Newest first by negating the time since datetime.min: exact, and unlike
+    # timestamp() it works for every year a datetime can hold
+    KEYS = {
+        'Created': lambda t: (datetime.min - t.created_at, -t.id),
+        'Due': lambda t: (t.deadline, t.id),
+        'Remaining': lambda t: (
+            (2, t.deadline - (t.completed_at or t.deadline)) if t.completed else
+            (1, t.frozen_remaining or timedelta(0)) if t.paused else
+            (0, t.deadline), t.id),
+        'Description': lambda t: ((t.description or "").casefold(), t.id),
+        'Status': lambda t: (2 if t.completed else 1 if t.paused else 0, datetime.min - t.created_at, -t.id),
+    }
+
+    def __init__(self, tickets=()):
+        self.tickets = {t.id: t for t in tickets}
+        self.keys = {t.id: {name: key(t) for name, key in self.KEYS.items()} for t in self.tickets.values()}
+        # Sorting once per load; every change after that is incremental
+        self.orders = {name: sorted((keys[name], ticket_id) for ticket_id, keys in self.keys.items())
+                       for name in self.KEYS}
+
+    def ordered(self, name):
+        return [self.tickets[ticket_id] for _, ticket_id in self.orders[name]]
+
+    def position(self, name, ticket):
+        return bisect.bisect_left(self.orders[name], (self.keys[ticket.id][name], ticket.id))
+
+    def add(self, ticket):
+        self.tickets[ticket.id] = ticket
+        self.keys[ticket.id] = {name: key(ticket) for name, key in self.KEYS.items()}
+        for name, order in self.orders.items():
+            bisect.insort(order, (self.keys[ticket.id][name], ticket.id))
+
+    def remove(self, ticket):
+        for name, order in self.orders.items():
+            del order[self.position(name, ticket)]
+        del self.keys[ticket.id]
+        del self.tickets[ticket.id]
+
+    def update(self, ticket):
+        """Move a ticket whose state changed to its new place in each order"""
+        keys = self.keys[ticket.id]
+        for name, key in self.KEYS.items():
+            new = key(ticket)
+            if new != keys[name]:
+                order = self.orders[name]
+                del order[self.position(name, ticket)]
+                keys[name] = new
+                bisect.insort(order, (new, ticket.id))
+
+class Journal:
+    """Append-only log of ticket and fridge state changes.
+
+    Events go through the caller's cursor, so they commit or roll back
+    together with the change they describe. `checkpoint` copies the rows
+    the events since the last checkpoint touched into a copy of each table
+    and drops the events it covers, so the log and replay time stay
+    bounded; it runs when storage closes, never inside a write. Rows stored
+    before the journal began are copied in COPY_BATCH at a time, so no
+    checkpoint reads a whole table.
+    """
+    KINDS = ('created', 'paused', 'resumed', 'completed', 'deleted', 'repaired')
+    TABLES = {'ticket': 'tickets', 'fridge': 'fridge_items'}
+    DEFAULTS = {
+        'ticket': {'title': None, 'description': None, 'created_at': None, 'due': None,
+                   'completed': 0, 'completed_time': None, 'completed_at': None,
+                   'paused': 0, 'paused_at': None, 'frozen_remaining': None},
+        'fridge': {'name': None, 'added_at': None,
+                   'paused': 0, 'paused_at': None, 'frozen_age': None},
+    }
+    CHECKPOINT_EVERY = 1000  # Events before closing folds them into a checkpoint
+    COPY_BATCH = 20000  # Rows from before the journal copied in per checkpoint
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    @staticmethod
+    def setup_schema(cursor):
+        """Create the journal tables, starting the checkpoints of a database that may already hold rows"""
+        cursor.execute('''CREATE TABLE IF NOT EXISTS events
+            (seq INTEGER PRIMARY KEY, entity TEXT NOT NULL, entity_id INTEGER NOT NULL,
+             kind TEXT NOT NULL, at TEXT NOT NULL, data TEXT)''')
+        cursor.execute("PRAGMA table_info(checkpoints)")
+        if 'state' in {row[1] for row in cursor.fetchall()}:
+            # Whole-state JSON checkpoints: start over with copies of the tables
+            cursor.execute("DROP TABLE checkpoints")
+        # How far each copy goes: every event up to seq is in it, and so are
+        # the rows up to `copied` of those up to `existing` that were stored
+        # before the journal began
+        cursor.execute('''CREATE TABLE IF NOT EXISTS checkpoints
+            (entity TEXT PRIMARY KEY, seq INTEGER NOT NULL, copied INTEGER NOT NULL,
+             existing INTEGER NOT NULL)''')
+        for entity, table in Journal.TABLES.items():
+            cursor.execute(f'''CREATE TABLE IF NOT EXISTS {table}_checkpoint
+                (id INTEGER PRIMARY KEY, {', '.join(Journal.stored_columns(entity))})''')
+            cursor.execute(f'''INSERT OR IGNORE INTO checkpoints VALUES
+                ('{entity}', (SELECT COALESCE(MAX(seq), 0) FROM events), 0, (SELECT COALESCE(MAX(id), 0) FROM {table}))''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_entity ON events(entity, entity_id, seq)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_kind ON events(kind, at)")
+
+    @classmethod
+    def stored_columns(cls, entity):
+        return [Descriptions.stored(c) for c in cls.DEFAULTS[entity]]
+
+    def record(self, entity, entity_id, kind, at, **data):
+        """Append one event; the caller commits"""
+        self.record_many([(entity, entity_id, kind, at, data)])
+
+    def record_many(self, events):
+        """Append (entity, entity_id, kind, at, data) events in one statement"""
+        rows = []
+        for entity, entity_id, kind, at, data in events:
+            if entity not in self.TABLES or kind not in self.KINDS:
+                raise ValueError(f"Unknown journal event {entity}/{kind}")
+            rows.append((entity, entity_id, kind, at.isoformat(), json.dumps(data) if data else None))
+        self.cursor.executemany(
+            "INSERT INTO events (entity, entity_id, kind, at, data) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def history(self, entity, entity_id):
+        """All events for one ticket or fridge item, oldest first"""
+        self.cursor.execute(
+            "SELECT seq, kind, at, data FROM events WHERE entity = ? AND entity_id = ? ORDER BY seq",
+            (entity, entity_id))
+        return [(seq, kind, at, json.loads(data) if data else {})
+                for seq, kind, at, data in self.cursor.fetchall()]
+
+    def events(self, kind=None, since=None, until=None, entity=None):
+        """Audit query over the whole log, e.g. everything completed this week"""
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if since is not None:
+            clauses.append("at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            clauses.append("at < ?")
+            params.append(until.isoformat())
+        if entity is not None:
+            clauses.append("entity = ?")
+            params.append(entity)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        self.cursor.execute(
+            f"SELECT seq, entity, entity_id, kind, at, data FROM events {where} ORDER BY seq", params)
+        return [(seq, ent, ent_id, k, at, json.loads(data) if data else {})
+                for seq, ent, ent_id, k, at, data in self.cursor.fetchall()]
+
+    def after(self, seq):
+        """Events appended after `seq`, oldest first; the change feed"""
+        self.cursor.execute(
+            "SELECT seq, entity, entity_id, kind, at, data FROM events WHERE seq > ? ORDER BY seq", (seq,))
+        return [(seq, ent, ent_id, k, at, json.loads(data) if data else {})
+                for seq, ent, ent_id, k, at, data in self.cursor.fetchall()]
+
+    def last_seq(self):
+        self.cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM events")
+        return self.cursor.fetchone()[0]
+
+    def marks(self):
+        """{entity: (seq, copied, existing)} from the checkpoints table"""
+        self.cursor.execute("SELECT entity, seq, copied, existing FROM checkpoints")
+        return {entity: tuple(mark) for entity, *mark in self.cursor.fetchall()}
+
+    def replay(self):
+        """Rebuild state from the checkpoint copies plus the events after them.
+
+        Returns {'ticket': {id: row}, 'fridge': {id: row}} where each row
+        holds the column values as stored in the database, descriptions as
+        text. Rows from before the journal that no checkpoint has copied in
+        yet, and nothing has changed since, are left out.
+        """
+        descriptions, state = Descriptions(self.cursor), {}
+        for entity, table in self.TABLES.items():
+            columns = list(self.DEFAULTS[entity])
+            self.cursor.execute(f"SELECT id, {', '.join(self.stored_columns(entity))} FROM {table}_checkpoint")
+            state[entity] = {row[0]: dict(zip(columns, row[1:])) for row in self.cursor.fetchall()}
+            for row in state[entity].values():
+                if 'description' in row:
+                    row['description'] = descriptions.text(row['description'])
+        start = min((seq for seq, _, _ in self.marks().values()), default=0)
+        self.cursor.execute(
+            "SELECT entity, entity_id, kind, data FROM events WHERE seq > ? ORDER BY seq", (start,))
+        for entity, entity_id, kind, data in self.cursor:
+            self._apply(state[entity], entity, entity_id, kind, json.loads(data) if data else {})
+        return state
+
+    def _apply(self, rows, entity, entity_id, kind, data):
+        if kind == 'created':
+            rows[entity_id] = {**self.DEFAULTS[entity], **data}
+        elif kind == 'deleted':
+            rows.pop(entity_id, None)
+        elif entity_id in rows:
+            row = rows[entity_id]
+            if kind == 'paused':
+                row['paused'] = 1
+            elif kind == 'resumed':
+                frozen = 'frozen_remaining' if entity == 'ticket' else 'frozen_age'
+                row.update({'paused': 0, 'paused_at': None, frozen: None})
+            elif kind == 'completed':
+                row['completed'] = 1
+            row.update(data)
+
+    def checkpoint(self):
+        """Bring the table copies up to the newest event and drop the events
+        they now hold; the caller commits"""
+        seq = self.last_seq()
+        marks = self.marks()
+        for entity, table in self.TABLES.items():
+            since, copied, existing = marks[entity]
+            columns = ', '.join(['id', *self.stored_columns(entity)])
+            # Rows the events since the last checkpoint touched, as they are now
+            touched = "SELECT entity_id FROM events WHERE entity = ? AND seq > ?"
+            self.cursor.execute(f"DELETE FROM {table}_checkpoint WHERE id IN ({touched})", (entity, since))
+            self.cursor.execute(f"INSERT INTO {table}_checkpoint SELECT {columns} FROM {table} WHERE id IN ({touched})",
+                                (entity, since))
+            if copied < existing:
+                # The next batch of rows from before the journal
+                self.cursor.execute(f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > ? AND id <= ? "
+                                    f"ORDER BY id LIMIT ?)", (copied, existing, self.COPY_BATCH))
+                through = self.cursor.fetchone()[0] or existing
+                self.cursor.execute(f"INSERT OR REPLACE INTO {table}_checkpoint SELECT {columns} FROM {table} "
+                                    f"WHERE id > ? AND id <= ?", (copied, through))
+                copied = existing if through >= existing else through
+            self.cursor.execute("UPDATE checkpoints SET seq = ?, copied = ? WHERE entity = ?", (seq, copied, entity))
+        # The newest event stays so the next seq keeps counting up from it
+        self.cursor.execute("DELETE FROM events WHERE seq < ?", (seq,))
+
+    def maybe_checkpoint(self):
+        """Checkpoint once CHECKPOINT_EVERY events have piled up, or while rows
+        from before the journal are still being copied; returns whether it did"""
+        marks = self.marks().values()
+        if (self.last_seq() - min(seq for seq, _, _ in marks) < self.CHECKPOINT_EVERY
+                and all(copied >= existing for _, copied, existing in marks)):
+            return False
+        self.checkpoint()
+        return True
+
+    def restore(self):
+        """Overwrite the ticket and fridge tables with the replayed state"""
+        state = self.replay()
+        descriptions = Descriptions(self.cursor)
+        for entity, table in self.TABLES.items():
+            columns = list(self.DEFAULTS[entity])
+            stored = [Descriptions.stored(c) for c in columns]
+            rows = state[entity]
+            _, copied, existing = self.marks()[entity]
+            self.cursor.execute(f"SELECT id FROM {table}")
+            # Rows not copied in yet are the journal's blind spot, not deletions
+            stale = [(row_id,) for (row_id,) in self.cursor.fetchall()
+                     if row_id not in rows and not copied < row_id <= existing]
+            self.cursor.executemany(f"DELETE FROM {table} WHERE id = ?", stale)
+            # Upsert rather than replace so sync identities (uid) survive
+            self.cursor.executemany(
+                f"""INSERT INTO {table} (id, {', '.join(stored)}) VALUES ({', '.join('?' * (len(columns) + 1))})
+                    ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in stored)}""",
+                [(entity_id, *(descriptions.intern(row.get(c)) if c == 'description'
+                               else row.get(c, self.DEFAULTS[entity][c]) for c in columns))
+                 for entity_id, row in rows.items()])
+
+class Descriptions:
+    """Ticket descriptions stored once in their own table and shared by id.
+
+    Texts are interned as they are loaded, so every ticket with the same
+    description points at the same string object.
+    """
+    # Where to read rows with the description as text rather than its id
+    READ_FROM = {'tickets': 'ticket_rows', 'fridge_items': 'fridge_items'}
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.texts = {}  # id -> text
+        self.ids = {}  # text -> id
+
+    @staticmethod
+    def setup_schema(cursor):
+        cursor.execute('''CREATE TABLE IF NOT EXISTS descriptions
+            (id INTEGER PRIMARY KEY, text TEXT NOT NULL UNIQUE,
+             use_count INTEGER DEFAULT 0, last_used TEXT)''')
+        try:
+            cursor.execute("SELECT description_id FROM tickets LIMIT 1")
+        except sqlite3.OperationalError:
+            # Move the texts out of tickets, then rebuild the table with an id
+            # column in place of the text, keeping every other column as is
+            cursor.execute('''INSERT OR IGNORE INTO descriptions (text, use_count, last_used)
+                SELECT description, COUNT(*), MAX(created_at) FROM tickets
+                WHERE description IS NOT NULL GROUP BY description''')
+            cursor.execute("PRAGMA table_info(tickets)")
+            definitions, values = [], []
+            for _, name, column_type, _, default, pk in cursor.fetchall():
+                if name == 'description':
+                    definitions.append("description_id INTEGER REFERENCES descriptions(id)")
+                    values.append("(SELECT id FROM descriptions WHERE text = tickets.description)")
+                else:
+                    definitions.append(' '.join(filter(None, [
+                        name, column_type, 'PRIMARY KEY AUTOINCREMENT' if pk else '',
+                        f'DEFAULT {default}' if default is not None else ''])))
+                    values.append(name)
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'tickets'")
+            issued = cursor.fetchone()[0]
+            cursor.execute(f"CREATE TABLE tickets_new ({', '.join(definitions)})")
+            cursor.execute(f"INSERT INTO tickets_new SELECT {', '.join(values)} FROM tickets")
+            cursor.execute("DROP TABLE tickets")
+            cursor.execute("ALTER TABLE tickets_new RENAME TO tickets")
+            reserve_ids(cursor, 'tickets', issued)
+            cursor.connection.commit()
+            cursor.execute("VACUUM")  # Hand the space of the repeated texts back
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_description ON tickets(description_id)")
+        cursor.execute('''CREATE VIEW IF NOT EXISTS ticket_rows AS
+            SELECT tickets.*, descriptions.text AS description
+            FROM tickets LEFT JOIN descriptions ON descriptions.id = tickets.description_id''')
+
+        # Keep usage counts right whichever code path writes tickets
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS tickets_description_insert AFTER INSERT ON tickets
+            BEGIN
+                UPDATE descriptions SET use_count = use_count + 1,
+                    last_used = MAX(COALESCE(last_used, ''), COALESCE(NEW.created_at, ''))
+                WHERE id = NEW.description_id;
+            END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS tickets_description_delete AFTER DELETE ON tickets
+            BEGIN
+                UPDATE descriptions SET use_count = use_count - 1 WHERE id = OLD.description_id;
+            END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS tickets_description_update
+            AFTER UPDATE OF description_id ON tickets
+            BEGIN
+                UPDATE descriptions SET use_count = use_count - 1 WHERE id = OLD.description_id;
+                UPDATE descriptions SET use_count = use_count + 1 WHERE id = NEW.description_id;
+            END''')
+
+    @staticmethod
+    def stored(column):
+        """The tickets column that holds a field"""
+        return 'description_id' if column == 'description' else column
+
+    def load(self):
+        self.cursor.execute("SELECT id, text FROM descriptions")
+        for desc_id, text in self.cursor.fetchall():
+            self.remember(desc_id, text)
+        return self
+
+    def remember(self, desc_id, text):
+        text = sys.intern(text)
+        self.texts[desc_id] = text
+        self.ids[text] = desc_id
+        return text
+
+    def text(self, desc_id):
+        """The shared text for an id"""
+        if desc_id is None:
+            return None
+        if desc_id not in self.texts:
+            self.cursor.execute("SELECT text FROM descriptions WHERE id = ?", (desc_id,))
+            row = self.cursor.fetchone()
+            return self.remember(desc_id, row[0]) if row else None
+        return self.texts[desc_id]
+
+    def intern(self, text):
+        """The id for a description, adding it to the table if it is new"""
+        if text is None:
+            return None
+        if text in self.ids:
+            return self.ids[text]
+        self.cursor.execute("INSERT OR IGNORE INTO descriptions (text) VALUES (?)", (text,))
+        self.cursor.execute("SELECT id FROM descriptions WHERE text = ?", (text,))
+        # Not cached yet: the caller's transaction may still roll the row back
+        return self.cursor.fetchone()[0]
+
+    def recent(self):
+        """All descriptions, most recently used first"""
+        self.cursor.execute("SELECT id, text FROM descriptions ORDER BY last_used DESC, use_count DESC")
+        return [self.remember(desc_id, text) for desc_id, text in self.cursor.fetchall()]
+
+class TicketView:
+    """A named ticket filter compiled to one parameterized, indexed query.
+
+    A spec is a dict of filters that must all match:
+      status       'open', 'running', 'paused' or 'done'
+      overdue      True for running tickets past their due time
+      due_within   seconds from now
+      due_before   'end_of_day' or 'end_of_week'
+      done_since   'start_of_day' or 'start_of_week'
+      description  exact description
+      search       text the description contains
+    """
+    LIMIT = 1000  # Most rows a view loads and draws
+    STATUS = {
+        'open': "completed = 0 AND paused IN (0, 1)",
+        'running': "completed = 0 AND paused = 0",
+        'paused': "completed = 0 AND paused = 1",
+        'done': "completed = 1",
+    }
+    # The same statuses as (completed, paused) pairs, for engines without SQL
+    STATES = {
+        'open': ((0, 0), (0, 1)),
+        'running': ((0, 0),),
+        'paused': ((0, 1),),
+        'done': ((1, 0), (1, 1)),
+    }
+
+    def __init__(self, name, spec, order="created_at DESC", builtin=False):
+        self.name = name
+        self.spec = spec
+        self.order = order
+        self.builtin = builtin
+
+    @staticmethod
+    def boundary(name, now):
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_of_week = start_of_day - timedelta(days=start_of_day.weekday())
+        return {
+            'start_of_day': start_of_day,
+            'end_of_day': start_of_day + timedelta(days=1),
+            'start_of_week': start_of_week,
+            'end_of_week': start_of_week + timedelta(days=7),
+        }[name]
+
+    def compile(self, now, text_descriptions=False, scheduled=True):
+        """Returns (where clause, parameters, order by) for the tickets table.
+
+        text_descriptions compiles for tables that still keep the description
+        text in each row, as files from before the descriptions table do;
+        scheduled=False for files from before the schedules table.
+        """
+        spec = self.spec
+        clauses, params = [], []
+        if 'status' in spec:
+            clauses.append(self.STATUS[spec['status']])
+        if spec.get('overdue'):
+            # Waiting pushes a deadline past `due`, never before it, so the
+            # due index still narrows the rows
+            clauses.append(f"{self.STATUS['running']} AND due < ?")
+            params.append(now.isoformat())
+            if scheduled:
+                clauses.append("COALESCE((SELECT effective_due FROM schedules WHERE ticket_id = tickets.id), due) < ?")
+                params.append(now.isoformat())
+        if 'due_within' in spec:
+            clauses.append("due >= ? AND due < ?")
+            params += [now.isoformat(), (now + timedelta(seconds=spec['due_within'])).isoformat()]
+        if 'due_before' in spec:
+            clauses.append("due < ?")
+            params.append(self.boundary(spec['due_before'], now).isoformat())
+        if 'done_since' in spec:
+            clauses.append("completed = 1 AND completed_at >= ?")
+            params.append(self.boundary(spec['done_since'], now).isoformat())
+        if 'description' in spec:
+            clauses.append("description = ?" if text_descriptions else
+                           "description_id = (SELECT id FROM descriptions WHERE text = ?)")
+            params.append(spec['description'])
+        if spec.get('search'):
+            clauses.append("description LIKE ? ESCAPE '\\'" if text_descriptions else
+                           "description_id IN (SELECT id FROM descriptions WHERE text LIKE ? ESCAPE '\\')")
+            escaped = spec['search'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params, self.order
+
+    def matches(self, row, now, effective_due=None):
+        """The compiled WHERE clause evaluated against one row dict, given its
+        effective due time if waiting pushed it back"""
+        spec = self.spec
+        state, due = (row['completed'], row['paused']), row['due']
+        if 'status' in spec and state not in self.STATES[spec['status']]:
+            return False
+        if spec.get('overdue') and not (state in self.STATES['running'] and due is not None
+                                        and (effective_due or due) < now.isoformat()):
+            return False
+        if 'due_within' in spec and not (due is not None and now.isoformat() <= due
+                                         < (now + timedelta(seconds=spec['due_within'])).isoformat()):
+            return False
+        if 'due_before' in spec and not (due is not None
+                                         and due < self.boundary(spec['due_before'], now).isoformat()):
+            return False
+        if 'done_since' in spec and not (row['completed'] == 1 and row['completed_at'] is not None
+                                         and row['completed_at'] >= self.boundary(spec['done_since'], now).isoformat()):
+            return False
+        if 'description' in spec and row['description'] != spec['description']:
+            return False
+        if spec.get('search') and spec['search'].lower() not in (row['description'] or '').lower():
+            return False
+        return True
+
+    def sort(self, rows):
+        """Sort row dicts by the ORDER BY terms, NULLs first as SQLite does"""
+        for term in reversed(self.order.split(',')):
+            column, *direction = term.split()
+            rows.sort(key=lambda row: (row[column] is not None, row[column] or ''),
+                      reverse=bool(direction) and direction[0].upper() == 'DESC')
+        return rows
+
+TicketView.BUILTIN = [
+    TicketView("All", {}, builtin=True),
+    TicketView("Overdue", {'overdue': True}, "due", builtin=True),
+    TicketView("Due in the next hour", {'status': 'running', 'due_within': 3600}, "due", builtin=True),
+    TicketView("Due today", {'status': 'open', 'due_before': 'end_of_day'}, "due", builtin=True),
+    TicketView("Paused", {'status': 'paused'}, builtin=True),
+    TicketView("Done this week", {'done_since': 'start_of_week'}, "completed_at DESC", builtin=True),
+]
+
+class Recurrence:
+    """A ticket that repeats, stored as its rule rather than as future rows.
+
+    A rule is one of
+      {'every': seconds}       a fixed interval from the first due time
+      {'weekdays': [0, 2]}     those days of the week (Monday is 0)
+      {'monthly': True}        the first due time's day of every month
+    always at the first due time's time of day. Only the latest occurrence
+    made into a ticket is stored; the next one is made when that ticket is
+    completed or when its window opens, `lead` before it is due. Anything
+    further ahead is computed when asked for.
+    """
+    DAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+    UNITS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+    ALIASES = {'hourly': "every hour", 'daily': "every day", 'weekly': "every week", 'every month': "monthly",
+               'weekdays': "mon tue wed thu fri", 'weekends': "sat sun"}
+    CHOICES = ["Once", "Every day", "Every 3 days", "Every week", "Weekdays", "Mon Wed Fri", "Monthly"]
+
+    def __init__(self, description, rule, start, lead, last_due=None, ticket_id=None):
+        self.id = None
+        self.description = description
+        self.rule = rule
+        self.start = start  # Due time of the first occurrence
+        self.lead = lead  # How long before its due time an occurrence becomes a ticket
+        self.last_due = last_due  # Due time of the latest occurrence made into a ticket
+        self.ticket_id = ticket_id  # ...and that ticket
+
+    @classmethod
+    def parse(cls, text):
+        """A rule from text like "every 3 days", "mon, thu" or "monthly"; None for "once" """
+        text = ' '.join(text.lower().split())
+        text = cls.ALIASES.get(text, text)
+        if text in ('', 'once', 'never'):
+            return None
+        if text == 'monthly':
+            return {'monthly': True}
+        match = re.fullmatch(r'every (\d+ )?(hour|day|week)s?', text)
+        if match:
+            count = int(match.group(1) or 1)
+            if count < 1:
+                raise ValueError("Repeat at most every hour")
+            return {'every': count * cls.UNITS[match.group(2)]}
+        words = re.split(r'[\s,]+', text)
+        if all(word[:3] in cls.DAYS for word in words):
+            return {'weekdays': sorted({cls.DAYS.index(word[:3]) for word in words})}
+        raise ValueError(f"Don't know how to repeat '{text}'")
+
+    def describe(self):
+        rule = self.rule
+        if 'every' in rule:
+            for unit, seconds in reversed(self.UNITS.items()):
+                if rule['every'] % seconds == 0:
+                    count = rule['every'] // seconds
+                    return f"every {unit}" if count == 1 else f"every {count} {unit}s"
+        if 'weekdays' in rule:
+            return ' '.join(self.DAYS[day].title() for day in rule['weekdays'])
+        return "monthly"
+
+    def occurrences(self, after=None):
+        """Due times later than `after`, earliest first and without end"""
+        start = self.start
+        if after is None or after < start:
+            after = start - timedelta(microseconds=1)
+        if 'every' in self.rule:
+            # Jump straight to the first one after `after`
+            every = timedelta(seconds=self.rule['every'])
+            due = start + ((after - start) // every + 1) * every
+            while True:
+                yield due
+                due += every
+        elif 'weekdays' in self.rule:
+            day = after.date()
+            while True:
+                due = datetime.combine(day, start.time(), start.tzinfo)
+                if due > after and day.weekday() in self.rule['weekdays']:
+                    yield due
+                day += timedelta(days=1)
+        else:
+            year, month = after.year, after.month
+            while True:
+                # The 31st falls on the last day of shorter months
+                due = start.replace(year=year, month=month,
+                                    day=min(start.day, calendar.monthrange(year, month)[1]))
+                if due > after:
+                    yield due
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def opens_at(self):
+        """When the next occurrence not yet made into a ticket is due to become one"""
+        return next(self.occurrences(self.last_due)) - self.lead
+
+    def next_due(self, now):
+        """Due time of the next ticket: the occurrence after the last one, or
+        the latest whose window has opened when several were missed"""
+        occurrences = self.occurrences(self.last_due)
+        due = next(occurrences)
+        for later in occurrences:
+            if later - self.lead > now:
+                break
+            due = later
+        return due
+
+    def spec(self):
+        return {'description': self.description, 'rule': self.rule,
+                'start': self.start.isoformat(), 'lead': self.lead.total_seconds()}
+
+    @classmethod
+    def from_spec(cls, recurrence_id, spec, last_due, ticket_id):
+        recurrence = cls(spec['description'], spec['rule'], datetime.fromisoformat(spec['start']),
+                         timedelta(seconds=spec['lead']),
+                         datetime.fromisoformat(last_due) if last_due else None, ticket_id)
+        recurrence.id = recurrence_id
+        return recurrence
+
+    @staticmethod
+    def upcoming(recurrences, now, until):
+        """(due, recurrence) for the occurrences not yet made into tickets that
+        fall between now and until, earliest first, generated as they're read"""
+        streams = [zip(itertools.takewhile(lambda due: due < until,
+                                           r.occurrences(max(r.last_due or now, now))),
+                       itertools.repeat(r))
+                   for r in recurrences]
+        return heapq.merge(*streams, key=lambda pair: pair[0])
+
+def reserve_ids(cursor, table, issued):
+    """Make an AUTOINCREMENT table hand out ids above both `issued` and its rows"""
+    cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = ?", (table,))
+    issued = max(issued, cursor.fetchone()[0])
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+    if issued:
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, issued))
+
+
+def upgrade_schema(cursor):
+    """Bring a database of any earlier version up to the current schema"""
+    # Create tables if they don't exist
+    cursor.execute('''CREATE TABLE IF NOT EXISTS tickets 
+        (title TEXT, description TEXT, created_at TEXT, due TEXT)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS fridge_items 
+        (name TEXT, added_at TEXT)''')
+    
+    # Check and add new columns one by one
+    try:
+        # Check for completed column
+        cursor.execute("SELECT completed FROM tickets LIMIT 1")
+    except sqlite3.OperationalError:
+        # Add completed columns
+        cursor.execute('ALTER TABLE tickets ADD COLUMN completed INTEGER DEFAULT 0')
+        cursor.execute('ALTER TABLE tickets ADD COLUMN completed_time TEXT')
+    
+    try:
+        # Check for paused column in tickets
+        cursor.execute("SELECT paused FROM tickets LIMIT 1")
+    except sqlite3.OperationalError:
+        # Add pause columns to tickets table
+        cursor.execute('ALTER TABLE tickets ADD COLUMN paused INTEGER DEFAULT 0')
+        cursor.execute('ALTER TABLE tickets ADD COLUMN paused_at TEXT')
+        cursor.execute('ALTER TABLE tickets ADD COLUMN frozen_remaining TEXT')
+    
+    try:
+        # Check for paused column in fridge_items
+        cursor.execute("SELECT paused FROM fridge_items LIMIT 1")
+    except sqlite3.OperationalError:
+        # Add pause columns to fridge_items table
+        cursor.execute('ALTER TABLE fridge_items ADD COLUMN paused INTEGER DEFAULT 0')
+        cursor.execute('ALTER TABLE fridge_items ADD COLUMN paused_at TEXT')
+        cursor.execute('ALTER TABLE fridge_items ADD COLUMN frozen_age TEXT')
+    
+    try:
+        # Check for a stable id column in tickets
+        cursor.execute("SELECT id FROM tickets LIMIT 1")
+    except sqlite3.OperationalError:
+        # Rebuild with an integer key so journal events can refer to rows
+        cursor.execute('''CREATE TABLE tickets_new 
+            (id INTEGER PRIMARY KEY, title TEXT, description TEXT, created_at TEXT, due TEXT,
+             completed INTEGER DEFAULT 0, completed_time TEXT,
+             paused INTEGER DEFAULT 0, paused_at TEXT, frozen_remaining TEXT)''')
+        cursor.execute('''INSERT INTO tickets_new 
+            SELECT rowid, title, description, created_at, due, completed, completed_time,
+                   paused, paused_at, frozen_remaining FROM tickets''')
+        cursor.execute('DROP TABLE tickets')
+        cursor.execute('ALTER TABLE tickets_new RENAME TO tickets')
+    
+    try:
+        # Check for a stable id column in fridge_items
+        cursor.execute("SELECT id FROM fridge_items LIMIT 1")
+    except sqlite3.OperationalError:
+        cursor.execute('''CREATE TABLE fridge_items_new 
+            (id INTEGER PRIMARY KEY, name TEXT, added_at TEXT,
+             paused INTEGER DEFAULT 0, paused_at TEXT, frozen_age TEXT)''')
+        cursor.execute('''INSERT INTO fridge_items_new 
+            SELECT rowid, name, added_at, paused, paused_at, frozen_age FROM fridge_items''')
+        cursor.execute('DROP TABLE fridge_items')
+        cursor.execute('ALTER TABLE fridge_items_new RENAME TO fridge_items')
+    
+    try:
+        # Check for the full completion timestamp used by views
+        cursor.execute("SELECT completed_at FROM tickets LIMIT 1")
+    except sqlite3.OperationalError:
+        cursor.execute('ALTER TABLE tickets ADD COLUMN completed_at TEXT')
+    
+    # Ids are never handed out twice, so a new row can't inherit the journal
+    # or recurrence of a deleted one. Rebuilding drops the table's indexes,
+    # triggers and view; everything below recreates them
+    for entity, table in Journal.TABLES.items():
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        if 'AUTOINCREMENT' in cursor.fetchone()[0].upper():
+            continue
+        cursor.execute(f"PRAGMA table_info({table})")
+        definitions = [' '.join(filter(None, [
+            name, column_type, 'PRIMARY KEY AUTOINCREMENT' if pk else '',
+            f'DEFAULT {default}' if default is not None else '']))
+            for _, name, column_type, _, default, pk in cursor.fetchall()]
+        cursor.execute("DROP VIEW IF EXISTS ticket_rows")
+        cursor.execute(f"CREATE TABLE {table}_new ({', '.join(definitions)})")
+        cursor.execute(f"INSERT INTO {table}_new SELECT * FROM {table}")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        # Deleted rows above the highest surviving id may have left events
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'")
+        if cursor.fetchone():
+            cursor.execute("SELECT COALESCE(MAX(entity_id), 0) FROM events WHERE entity = ?", (entity,))
+            reserve_ids(cursor, table, cursor.fetchone()[0])
+
+    # Each distinct description is stored once and referenced by id; this
+    # may rebuild tickets, so it comes before the indexes on that table
+    Descriptions.setup_schema(cursor)
+    
+    # Indexes behind the saved views
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_state_due ON tickets(completed, paused, due)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_done_at ON tickets(completed, completed_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_state_created ON tickets(completed, paused, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_at)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS saved_views (name TEXT PRIMARY KEY, spec TEXT)")
+    cursor.execute('''CREATE TABLE IF NOT EXISTS recurrences
+        (id INTEGER PRIMARY KEY, spec TEXT, last_due TEXT, ticket_id INTEGER)''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS tickets_recurrences_delete AFTER DELETE ON tickets
+        BEGIN
+            UPDATE recurrences SET ticket_id = NULL WHERE ticket_id = OLD.id;
+        END''')
+    
+    # Files and notes on tickets. data stays the last column so reading the
+    # metadata never touches the overflow pages that hold it
+    cursor.execute('''CREATE TABLE IF NOT EXISTS attachments
+        (id INTEGER PRIMARY KEY, ticket_id INTEGER NOT NULL, name TEXT, mime TEXT, size INTEGER,
+         added_at TEXT, summary TEXT, thumbnail, data BLOB)''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attachments_ticket ON attachments(ticket_id)")
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS tickets_attachments_delete AFTER DELETE ON tickets
+        BEGIN
+            DELETE FROM attachments WHERE ticket_id = OLD.id;
+        END''')
+    
+    # Tickets waiting for other tickets, looked up from either end, and the
+    # times derived from them for every ticket that waits
+    cursor.execute('''CREATE TABLE IF NOT EXISTS dependencies
+        (ticket_id INTEGER NOT NULL, blocker_id INTEGER NOT NULL,
+         PRIMARY KEY (ticket_id, blocker_id)) WITHOUT ROWID''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_dependencies_blocker ON dependencies(blocker_id, ticket_id)")
+    cursor.execute('''CREATE TABLE IF NOT EXISTS schedules
+        (ticket_id INTEGER PRIMARY KEY, ready_at TEXT, effective_due TEXT, waiting INTEGER, depth INTEGER)''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS tickets_dependencies_delete AFTER DELETE ON tickets
+        BEGIN
+            DELETE FROM dependencies WHERE ticket_id = OLD.id;
+            DELETE FROM dependencies WHERE blocker_id = OLD.id;
+            DELETE FROM schedules WHERE ticket_id = OLD.id;
+        END''')
+    
+    # Start the journal; checkpoints copy in whatever is already stored
+    Journal.setup_schema(cursor)
+
+    # Change tracking for syncing copies of the same database
+    Replica.setup_schema(cursor)
+
+class Replica:
+    """One database file taking part in an offline sync.
+
+    Triggers stamp every row change with a per-database sequence number and
+    a timestamp per field group, and turn deletes into tombstones. A sync
+    then only reads rows changed since the last sync with that peer, merges
+    each field group by last writer, and lets deletes win over edits.
+    """
+    # entity: (table, fields fixed at creation, {mtime column: fields it covers})
+    ENTITIES = {
+        'ticket': ('tickets', ('title', 'description', 'created_at'),
+                   {'timer_mtime': ('due', 'paused', 'paused_at', 'frozen_remaining'),
+                    'done_mtime': ('completed', 'completed_time', 'completed_at')}),
+        'fridge': ('fridge_items', ('name',),
+                   {'timer_mtime': ('added_at', 'paused', 'paused_at', 'frozen_age')}),
+    }
+    # Columns that identify a row stored before sync existed
+    LEGACY_KEYS = {'ticket': ('id', 'title', 'created_at'), 'fridge': ('id', 'name', 'added_at')}
+    NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+    NEXT_SEQ = "(SELECT value FROM sync_meta WHERE key = 'seq')"
+    BATCH = 500  # uids per lookup query, below SQLite's parameter limit
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        upgrade_schema(self.cursor)
+        self.conn.commit()
+        self.journal = Journal(self.cursor)
+        self.descriptions = Descriptions(self.cursor)
+
+    @classmethod
+    def setup_schema(cls, cursor):
+        cursor.execute("CREATE TABLE IF NOT EXISTS sync_meta (key TEXT PRIMARY KEY, value)")
+        cursor.execute("INSERT OR IGNORE INTO sync_meta VALUES ('replica', ?)", (uuid.uuid4().hex,))
+        cursor.execute("INSERT OR IGNORE INTO sync_meta VALUES ('seq', 0)")
+        cursor.execute('''CREATE TABLE IF NOT EXISTS tombstones
+            (uid TEXT PRIMARY KEY, entity TEXT, deleted_at TEXT, seq INTEGER)''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tombstones_seq ON tombstones(seq)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS sync_peers (replica TEXT PRIMARY KEY, last_seq INTEGER)")
+
+        for entity, (table, fixed, groups) in cls.ENTITIES.items():
+            try:
+                cursor.execute(f"SELECT uid FROM {table} LIMIT 1")
+            except sqlite3.OperationalError:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN uid TEXT")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN seq INTEGER")
+                for mtime in groups:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {mtime} TEXT")
+                # Derive ids of existing rows from what never changes, so two
+                # hand-made copies of one file agree on which rows are the same
+                cursor.execute(f"SELECT {', '.join(cls.LEGACY_KEYS[entity])} FROM {table}")
+                cursor.executemany(f"UPDATE {table} SET uid = ?, seq = id WHERE id = ?",
+                    [(uuid.uuid5(uuid.NAMESPACE_URL, '|'.join([entity, *map(str, row)])).hex, row[0])
+                     for row in cursor.fetchall()])
+                cursor.execute(f"UPDATE sync_meta SET value = MAX(value, (SELECT COALESCE(MAX(id), 0) FROM {table})) WHERE key = 'seq'")
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uid ON {table}(uid)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_seq ON {table}(seq)")
+
+            tracked = [f for fields in groups.values() for f in fields]
+            stamps = ', '.join(f'''{mtime} = CASE WHEN NEW.{mtime} IS OLD.{mtime}
+                    AND ({' OR '.join(f'NEW.{f} IS NOT OLD.{f}' for f in fields)})
+                    THEN {cls.NOW} ELSE NEW.{mtime} END''' for mtime, fields in groups.items())
+            # Recreate the triggers so they always track the current columns
+            for trigger in ('insert', 'update', 'delete'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_sync_{trigger}")
+            cursor.execute(f'''CREATE TRIGGER {table}_sync_insert AFTER INSERT ON {table}
+                BEGIN
+                    UPDATE sync_meta SET value = value + 1 WHERE key = 'seq';
+                    UPDATE {table} SET uid = COALESCE(NEW.uid, lower(hex(randomblob(16)))),
+                        seq = {cls.NEXT_SEQ},
+                        {', '.join(f'{mtime} = COALESCE(NEW.{mtime}, {cls.NOW})' for mtime in groups)}
+                    WHERE id = NEW.id;
+                END''')
+            cursor.execute(f'''CREATE TRIGGER {table}_sync_update
+                AFTER UPDATE OF {', '.join(map(Descriptions.stored, fixed + tuple(tracked)))} ON {table}
+                BEGIN
+                    UPDATE sync_meta SET value = value + 1 WHERE key = 'seq';
+                    UPDATE {table} SET seq = {cls.NEXT_SEQ}, {stamps} WHERE id = NEW.id;
+                END''')
+            cursor.execute(f'''CREATE TRIGGER {table}_sync_delete AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE sync_meta SET value = value + 1 WHERE key = 'seq';
+                    INSERT OR IGNORE INTO tombstones VALUES (OLD.uid, '{entity}', {cls.NOW}, {cls.NEXT_SEQ});
+                END''')
+
+    def meta(self, key):
+        self.cursor.execute("SELECT value FROM sync_meta WHERE key = ?", (key,))
+        return self.cursor.fetchone()[0]
+
+    def new_replica_id(self):
+        """Give a hand-copied file its own identity"""
+        self.cursor.execute("UPDATE sync_meta SET value = ? WHERE key = 'replica'", (uuid.uuid4().hex,))
+
+    def last_seen(self, replica):
+        """Highest sequence number of `replica` already merged into this file"""
+        self.cursor.execute("SELECT last_seq FROM sync_peers WHERE replica = ?", (replica,))
+        row = self.cursor.fetchone()
+        return row[0] if row else 0
+
+    def mark_seen(self, replica, seq):
+        self.cursor.execute("INSERT OR REPLACE INTO sync_peers VALUES (?, ?)", (replica, seq))
+
+    def _columns(self, entity):
+        _, fixed, groups = self.ENTITIES[entity]
+        return ['uid', *fixed, *(f for fields in groups.values() for f in fields), *groups]
+
+    def changes_since(self, seq):
+        """Rows and tombstones changed after `seq`, found through the seq indexes"""
+        changes = {}
+        for entity, (table, _, _) in self.ENTITIES.items():
+            columns = self._columns(entity)
+            self.cursor.execute(f"SELECT {', '.join(columns)} FROM {Descriptions.READ_FROM[table]} WHERE seq > ?", (seq,))
+            changes[entity] = [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        self.cursor.execute("SELECT uid, entity, deleted_at FROM tombstones WHERE seq > ?", (seq,))
+        changes['tombstones'] = self.cursor.fetchall()
+        return changes
+
+    def apply(self, changes, now):
+        """Merge a peer's changes, journaled as happening at `now`; returns
+        the number of rows that changed here.
+
+        Leaves the ids of tickets whose timing changed, and of tickets that
+        waited for deleted ones, in `retimed` for rescheduling.
+        """
+        applied = 0
+        events = []
+        self.retimed = set()
+        for uid, entity, deleted_at in changes['tombstones']:
+            table = self.ENTITIES[entity][0]
+            self.cursor.execute(f"SELECT id FROM {table} WHERE uid = ?", (uid,))
+            found = self.cursor.fetchone()
+            if found and entity == 'ticket':
+                # The delete trigger drops the waits, so find who waited first
+                self.cursor.execute("SELECT ticket_id FROM dependencies WHERE blocker_id = ?", found)
+                self.retimed.update(ticket_id for (ticket_id,) in self.cursor.fetchall())
+            if found:
+                self.cursor.execute(f"DELETE FROM {table} WHERE id = ?", found)
+                self.cursor.execute("UPDATE tombstones SET deleted_at = ? WHERE uid = ?", (deleted_at, uid))
+                events.append((entity, found[0], 'deleted', now, {}))
+                applied += 1
+            else:
+                self.cursor.execute("UPDATE sync_meta SET value = value + 1 WHERE key = 'seq'")
+                self.cursor.execute(f"INSERT OR IGNORE INTO tombstones VALUES (?, ?, ?, {self.NEXT_SEQ})",
+                                    (uid, entity, deleted_at))
+
+        for entity, (table, fixed, groups) in self.ENTITIES.items():
+            columns = self._columns(entity)
+            incoming = changes[entity]
+            tombstoned, existing = set(), {}
+            for start in range(0, len(incoming), self.BATCH):
+                uids = [row['uid'] for row in incoming[start:start + self.BATCH]]
+                marks = ', '.join('?' * len(uids))
+                self.cursor.execute(f"SELECT uid FROM tombstones WHERE uid IN ({marks})", uids)
+                tombstoned.update(uid for (uid,) in self.cursor.fetchall())
+                self.cursor.execute(
+                    f"SELECT id, {', '.join(columns)} FROM {Descriptions.READ_FROM[table]} WHERE uid IN ({marks})", uids)
+                existing.update((found[1], found) for found in self.cursor.fetchall())
+
+            for row in incoming:
+                if row['uid'] in tombstoned:
+                    continue  # Deleted here; the tombstone goes the other way
+                found = existing.get(row['uid'])
+                if found is None:
+                    # Descriptions travel as text; each file has its own ids
+                    self.cursor.execute(
+                        f"INSERT INTO {table} ({', '.join(map(Descriptions.stored, columns))}) VALUES ({', '.join('?' * len(columns))})",
+                        [self.descriptions.intern(row[c]) if c == 'description' else row[c] for c in columns])
+                    data = {f: row[f] for f in Journal.DEFAULTS[entity]}
+                    events.append((entity, self.cursor.lastrowid, 'created', now, data))
+                    applied += 1
+                    continue
+
+                local_id, local = found[0], dict(zip(columns, found[1:]))
+                changed = False
+                for mtime, fields in groups.items():
+                    if not self._wins(row, local, mtime, fields):
+                        continue
+                    self.cursor.execute(
+                        f"UPDATE {table} SET {', '.join(f'{f} = ?' for f in fields)}, {mtime} = ? WHERE id = ?",
+                        [*(row[f] for f in fields), row[mtime], local_id])
+                    events.extend(self._events(entity, local_id, mtime, row, now))
+                    changed = True
+                    if entity == 'ticket':
+                        self.retimed.add(local_id)
+                applied += changed
+        if events:
+            self.journal.record_many(events)
+        return applied
+
+    @staticmethod
+    def _wins(row, local, mtime, fields):
+        """True if the incoming field group should overwrite the local one"""
+        theirs, ours = row[mtime] or '', local[mtime] or ''
+        if theirs != ours:
+            return theirs > ours
+        # Equal timestamps fall back to the values so both sides of a sync
+        # always pick the same winner
+        values, local_values = [row[f] for f in fields], [local[f] for f in fields]
+        return values != local_values and json.dumps(values) > json.dumps(local_values)
+
+    @staticmethod
+    def _events(entity, entity_id, mtime, row, now):
+        if mtime == 'done_mtime':
+            if row['completed']:
+                yield (entity, entity_id, 'completed', now,
+                   {'completed_time': row['completed_time'], 'completed_at': row['completed_at']})
+            return
+        clock = 'due' if entity == 'ticket' else 'added_at'
+        frozen = 'frozen_remaining' if entity == 'ticket' else 'frozen_age'
+        if row['paused']:
+            yield (entity, entity_id, 'paused', now,
+                   {'paused_at': row['paused_at'], frozen: row[frozen], clock: row[clock]})
+        else:
+            yield (entity, entity_id, 'resumed', now, {clock: row[clock]})
+
+def sync_databases(path_a, path_b, now):
+    """Exchange changes between two database files in both directions at `now`.
+
+    Returns (changes applied to a, changes applied to b).
+    """
+    conn_a, conn_b = sqlite3.connect(path_a), sqlite3.connect(path_b)
+    try:
+        a, b = Replica(conn_a), Replica(conn_b)
+        if a.meta('replica') == b.meta('replica'):
+            b.new_replica_id()
+        id_a, id_b = a.meta('replica'), b.meta('replica')
+
+        # Read both deltas before applying either, so nothing echoes back
+        from_a = a.changes_since(b.last_seen(id_a))
+        from_b = b.changes_since(a.last_seen(id_b))
+        applied_b = b.apply(from_a, now)
+        applied_a = a.apply(from_b, now)
+        b.mark_seen(id_a, a.meta('seq'))
+        a.mark_seen(id_b, b.meta('seq'))
+
+        conn_a.commit()
+        conn_b.commit()
+        # Schedules aren't synced; each file replans from its merged rows
+        for replica in (a, b):
+            if replica.retimed:
+                SQLiteStorage(replica.conn).reschedule(replica.retimed)
+        return applied_a, applied_b
+    except Exception:
+        conn_a.rollback()
+        conn_b.rollback()
+        raise
+    finally:
+        conn_a.close()
+        conn_b.close()
+
+class LoadReport:
+    """Rows that can't be loaded as they are, found when a database opens.
+
+    Engines first narrow each table to suspect rows (SQLite in one query),
+    then `decode` parses those once with the same calls the loader uses.
+    Loading skips the reported rows and decodes the rest without checks;
+    `Storage.repair` writes the fallback values the loader used to put in
+    silently, journaled, in one transaction.
+    """
+    # Column -> (kind, required) for every column the loader parses
+    CHECKS = {
+        'ticket': {'created_at': ('timestamp', True), 'due': ('timestamp', True),
+                   'paused_at': ('timestamp', False), 'completed_at': ('timestamp', False),
+                   'frozen_remaining': ('number', False)},
+        'fridge': {'added_at': ('timestamp', True), 'paused_at': ('timestamp', False),
+                   'frozen_age': ('number', False)},
+    }
+    LABELS = {'ticket': 'title', 'fridge': 'name'}
+    UNSET = (None, '', '0')  # Older versions wrote '' or '0' for "not set"
+    MAX_SECONDS = timedelta.max // timedelta(seconds=1)  # Longest span a timedelta holds
+
+    def __init__(self):
+        self.problems = []  # {'entity', 'id', 'label', 'row', 'columns': {column: reason}}
+        self.skipped = {entity: set() for entity in self.CHECKS}
+
+    def __bool__(self):
+        return bool(self.problems)
+
+    def __len__(self):
+        return len(self.problems)
+
+    @staticmethod
+    def timestamp(value):
+        if not isinstance(value, str):
+            return "is not text"
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return "is not an ISO timestamp"
+        return "has a time zone" if parsed.tzinfo is not None else None
+
+    @staticmethod
+    def number(value):
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            return "is not a number"
+        if not abs(seconds) <= LoadReport.MAX_SECONDS:  # Also false for NaN
+            return "is out of range"
+        return None
+
+    @classmethod
+    def decode(cls, entity, rows):
+        """The problems with `rows`, found by parsing each checked column once"""
+        problems = []
+        for row in rows:
+            columns = {}
+            for column, (kind, required) in cls.CHECKS[entity].items():
+                value = row[column]
+                if value in cls.UNSET:
+                    reason = "is missing" if required else None
+                else:
+                    reason = cls.timestamp(value) if kind == 'timestamp' else cls.number(value)
+                if reason:
+                    columns[column] = reason
+            if columns:
+                problems.append({'entity': entity, 'id': row['id'], 'label': row[cls.LABELS[entity]],
+                                 'row': row, 'columns': columns})
+        return problems
+
+    def add(self, problems):
+        for problem in problems:
+            if problem['id'] not in self.skipped[problem['entity']]:
+                self.skipped[problem['entity']].add(problem['id'])
+                self.problems.append(problem)
+
+    def lines(self):
+        """One line per bad value, for showing to people"""
+        return [f"{'Ticket' if p['entity'] == 'ticket' else 'Fridge item'} {p['label']!r}: "
+                f"{column} {p['row'][column]!r} {reason}"
+                for p in self.problems for column, reason in p['columns'].items()]
+
+    def fixes(self, now):
+        """(entity, changes, events) putting the loader's old fallbacks into every bad column"""
+        fixes = {entity: ([], []) for entity in self.CHECKS}
+        for problem in self.problems:
+            entity, row, bad = problem['entity'], problem['row'], problem['columns']
+            fields = {column: None for column in bad}
+            if entity == 'ticket':
+                if 'created_at' in bad:
+                    fields['created_at'] = now.isoformat()
+                if 'due' in bad:
+                    created = fields.get('created_at', row['created_at'])
+                    fields['due'] = (datetime.fromisoformat(created) + timedelta(minutes=5)).isoformat()
+            elif 'added_at' in bad:
+                fields['added_at'] = now.isoformat()
+            changes, events = fixes[entity]
+            changes.append((problem['id'], fields))
+            events.append((entity, problem['id'], 'repaired', now, fields))
+        return [(entity, changes, events) for entity, (changes, events) in fixes.items() if changes]
+
+class Storage:
+    """Where tickets, fridge items and saved views are kept.
+
+    Rows are dicts of column values as SQLite stores them: ISO timestamps,
+    0/1 flags and the description as text. Every write commits on its own
+    and appends journal events to the change feed; a write that fails
+    leaves nothing behind. `harness.py conformance` checks every engine
+    against the same expectations.
+    """
+    COLUMNS = {entity: ('id', *defaults) for entity, defaults in Journal.DEFAULTS.items()}
+    ATTACHMENT_COLUMNS = ('id', 'ticket_id', 'name', 'mime', 'size', 'added_at', 'summary', 'thumbnail')
+    CHUNK = 1 << 16  # Bytes of attachment data copied at a time
+    read_only = False
+
+    def tickets(self, view, now, limit=TicketView.LIMIT):
+        """Rows matching a TicketView, in its order, at most `limit` of them"""
+        raise NotImplementedError
+
+    def count(self, view, now):
+        """How many tickets match a TicketView, however many are loaded"""
+        raise NotImplementedError
+
+    def ticket_ids(self, view, now):
+        """Ids of every ticket matching a TicketView, with no limit"""
+        raise NotImplementedError
+
+    def ticket_rows(self, ids):
+        """Rows of the given tickets, e.g. selected ones the view hasn't loaded"""
+        raise NotImplementedError
+
+    def upcoming(self, now, until, limit=TicketView.LIMIT):
+        """Open tickets whose deadline, pushed back by what they wait for,
+        falls in [now, until); the soonest `limit` as (deadline, row) pairs"""
+        raise NotImplementedError
+
+    def fridge_items(self):
+        raise NotImplementedError
+
+    def timeline(self):
+        """Every ticket as (id, created_at, due, completed, completed_at, paused, paused_at)"""
+        raise NotImplementedError
+
+    def insert(self, entity, fields, at):
+        """Add a row and its 'created' event; returns the new id"""
+        raise NotImplementedError
+
+    def update(self, entity, entity_id, fields, event):
+        self.update_many(entity, [(entity_id, fields)], [event])
+
+    def update_many(self, entity, changes, events):
+        """Apply (id, fields) changes and their journal events together"""
+        raise NotImplementedError
+
+    def delete(self, entity, entity_id, at):
+        self.delete_many(entity, [entity_id], at)
+
+    def delete_many(self, entity, ids, at):
+        raise NotImplementedError
+
+    def suspects(self, entity, since=0):
+        """Rows that may not load, a superset of the bad ones; LoadReport.decode has the last word.
+        `since` narrows to rows changed after that sync sequence number where the engine can"""
+        raise NotImplementedError
+
+    def check(self, since=0):
+        """A LoadReport of the rows the loader can't parse"""
+        report = LoadReport()
+        for entity in LoadReport.CHECKS:
+            report.add(LoadReport.decode(entity, self.suspects(entity, since)))
+        return report
+
+    def check_changed(self):
+        """A LoadReport of the rows changed since the last check that found
+        nothing, for opening; engines that can't tell check every row"""
+        return self.check()
+
+    def repair(self, report, now):
+        """Write fallback values into every reported row, journaled as 'repaired',
+        then replan whatever waits for the repaired tickets"""
+        repaired = set()
+        for entity, changes, events in report.fixes(now):
+            self.update_many(entity, changes, events)
+            if entity == 'ticket':
+                repaired.update(ticket_id for ticket_id, _ in changes)
+        self.reschedule(repaired)
+
+    def changes(self, after=0):
+        """Journal events after sequence number `after`, oldest first"""
+        raise NotImplementedError
+
+    def last_change(self):
+        """Sequence number of the newest journal event; 0 when there is none"""
+        raise NotImplementedError
+
+    def descriptions(self):
+        """Every description, most recently used first"""
+        raise NotImplementedError
+
+    def views(self):
+        """Saved TicketViews, by name"""
+        raise NotImplementedError
+
+    def save_view(self, view):
+        raise NotImplementedError
+
+    def delete_view(self, name):
+        raise NotImplementedError
+
+    def recurrences(self):
+        """Repeating tickets' Recurrences"""
+        raise NotImplementedError
+
+    def save_recurrence(self, recurrence):
+        """Store a new Recurrence and set its id"""
+        raise NotImplementedError
+
+    def delete_recurrence(self, recurrence_id):
+        raise NotImplementedError
+
+    def add_occurrence(self, recurrence, fields, at):
+        """Insert a recurrence's next ticket and record it as the latest, together; returns the ticket id"""
+        raise NotImplementedError
+
+    def attachments(self, ticket_id):
+        """A ticket's attachments as dicts of ATTACHMENT_COLUMNS, oldest first, without their data"""
+        raise NotImplementedError
+
+    def attach(self, ticket_id, meta, source, size):
+        """Store `size` bytes read in chunks from the file object `source`,
+        with name, mime, added_at, summary and thumbnail from `meta`; returns the id"""
+        raise NotImplementedError
+
+    def read_attachment(self, attachment_id, sink):
+        """Write an attachment's data in chunks to the file object `sink`"""
+        raise NotImplementedError
+
+    def delete_attachment(self, attachment_id):
+        raise NotImplementedError
+
+    # Tickets can wait for other tickets. Engines store the edges and one
+    # schedule per waiting ticket; working out what changes is shared.
+    BATCH = 500  # Ids per lookup query, below SQLite's parameter limit
+
+    def blockers(self, ticket_ids):
+        """(ticket id, blocker id) for everything the tickets wait for"""
+        raise NotImplementedError
+
+    def dependents(self, ticket_ids):
+        """(blocker id, ticket id) for every ticket waiting for them"""
+        raise NotImplementedError
+
+    def timings(self, ticket_ids):
+        """{id: (created_at, due, completed, completed_at, paused)} for the tickets that exist"""
+        raise NotImplementedError
+
+    def schedules(self, ticket_ids):
+        """{id: (ready_at, effective_due, waiting, depth)} for the tickets that wait for others"""
+        raise NotImplementedError
+
+    def write_dependency(self, ticket_id, blocker_id, add):
+        raise NotImplementedError
+
+    def write_schedules(self, changes):
+        """Store {id: schedule}, dropping the ones set to None"""
+        raise NotImplementedError
+
+    @staticmethod
+    def finish(timing, schedule):
+        """When a ticket should be done, as ISO text; None while that can't be known"""
+        if timing is None:
+            return None
+        _, due, completed, completed_at, paused = timing
+        if completed:
+            return completed_at or due
+        if paused:
+            return None  # Nobody knows when it will be resumed
+        return schedule[1] if schedule is not None else due
+
+    @staticmethod
+    def plan(timing, blockers, depth):
+        """A waiting ticket's schedule: ready when its last blocker should be
+        done, and due no sooner than its own countdown after that"""
+        waiting = sum(1 for blocker_timing, _ in blockers if blocker_timing is None or not blocker_timing[2])
+        finishes = [Storage.finish(*blocker) for blocker in blockers]
+        if timing is None or None in finishes:
+            return (None, None, waiting, depth)
+        ready = max(finishes)
+        created_at, due = timing[:2]
+        try:
+            pushed = (datetime.fromisoformat(ready) + (datetime.fromisoformat(due)
+                                                        - datetime.fromisoformat(created_at))).isoformat()
+        except (TypeError, ValueError):
+            pushed = ready
+        return (ready, max(due or '', pushed), waiting, depth)
+
+    def depth(self, ticket_id):
+        schedule = self.schedules([ticket_id]).get(ticket_id)
+        return schedule[3] if schedule else 0
+
+    def waits_for(self, ticket_id, blocker_id):
+        """Whether ticket_id already waits for blocker_id, directly or not"""
+        # Depth grows along every edge, so only tickets deeper than the
+        # blocker can lead to it
+        floor = self.depth(blocker_id)
+        frontier, seen = [ticket_id], {ticket_id}
+        while frontier:
+            found = {b for _, b in self.blockers(frontier)} - seen
+            if blocker_id in found:
+                return True
+            seen |= found
+            depths = self.schedules(found)
+            frontier = [b for b in found if b in depths and depths[b][3] > floor]
+        return False
+
+    def add_dependency(self, ticket_id, blocker_id):
+        """Make a ticket wait for another; returns the schedules that changed"""
+        if ticket_id == blocker_id or self.waits_for(blocker_id, ticket_id):
+            raise ValueError("Tickets can't wait for each other in a circle")
+        self.write_dependency(ticket_id, blocker_id, True)
+        # Keep every ticket deeper than everything it waits for
+        changes, frontier, depth = {}, [ticket_id], self.depth(blocker_id) + 1
+        while frontier:
+            schedules = self.schedules(frontier)
+            deeper = []
+            for node in frontier:
+                schedule = changes.get(node) or schedules.get(node) or (None, None, 0, 0)
+                if schedule[3] < depth:
+                    changes[node] = (*schedule[:3], depth)
+                    deeper.append(node)
+            frontier = list({t for _, t in self.dependents(deeper)})
+            depth += 1
+        self.write_schedules(changes)
+        return self.reschedule([ticket_id])
+
+    def remove_dependency(self, ticket_id, blocker_id):
+        self.write_dependency(ticket_id, blocker_id, False)
+        return self.reschedule([ticket_id])
+
+    def reschedule(self, ticket_ids):
+        """Recompute the tickets that wait, directly or not, for tickets whose
+        timing just changed. Goes downstream one depth at a time, so each
+        ticket is planned after everything it waits for, and stops wherever a
+        finish time comes out the same. Returns {id: schedule or None} for
+        the schedules that changed."""
+        roots = set(ticket_ids)
+        depths = self.schedules(roots)
+        heap = [(depths[i][3] if i in depths else 0, i) for i in roots]
+        heapq.heapify(heap)
+        queued, changes = set(roots), {}
+        while heap:
+            # Tickets at the same depth never wait for each other
+            depth, level = heap[0][0], []
+            while heap and heap[0][0] == depth:
+                level.append(heapq.heappop(heap)[1])
+            blockers = {}
+            for node, blocker_id in self.blockers(level):
+                blockers.setdefault(node, []).append(blocker_id)
+            involved = set(level).union(*blockers.values())
+            timings, schedules = self.timings(involved), self.schedules(involved)
+            schedules.update((i, changes[i]) for i in involved if i in changes)  # Written at the end
+            moved = []
+            for node in level:
+                old, new = schedules.get(node), None
+                if node in blockers:
+                    new = self.plan(timings.get(node), [(timings.get(b), schedules.get(b)) for b in blockers[node]],
+                                    old[3] if old else 1)
+                if new != old:
+                    changes[node] = new
+                if node in roots or self.finish(timings.get(node), new) != self.finish(timings.get(node), old):
+                    moved.append(node)
+            waiting = {t for _, t in self.dependents(moved)} - queued
+            depths = self.schedules(waiting)
+            for dependent in waiting:
+                heapq.heappush(heap, (depths[dependent][3] if dependent in depths else 0, dependent))
+            queued |= waiting
+        self.write_schedules(changes)
+        return changes
+
+    def compact(self):
+        """Fold a long journal into a checkpoint; returns whether it did"""
+        return False
+
+    def close(self):
+        pass
+
+class SQLiteStorage(Storage):
+    """Storage in a database file, upgraded to the current schema on open"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        upgrade_schema(self.cursor)
+        self.journal = Journal(self.cursor)
+        self.texts = Descriptions(self.cursor).load()
+        self.conn.commit()
+
+    text_descriptions = False  # Tickets refer to description text by id
+    scheduled = True  # Has the schedules table
+
+    def stored(self, fields):
+        """Column names and values as written to the table"""
+        return ({Descriptions.stored(c): self.texts.intern(v) if c == 'description' else v
+                 for c, v in fields.items()})
+
+    TICKET_SQL = """SELECT id, title, description_id, created_at, due,
+        COALESCE(completed, 0), completed_time, completed_at,
+        COALESCE(paused, 0), paused_at, frozen_remaining FROM tickets"""
+
+    def tickets(self, view, now, limit=TicketView.LIMIT):
+        where, params, order = view.compile(now, self.text_descriptions, self.scheduled)
+        self.cursor.execute(f"{self.TICKET_SQL} {where} ORDER BY {order} LIMIT {int(limit)}", params)
+        return self.ticket_dicts(self.cursor.fetchall())
+
+    def ticket_dicts(self, rows):
+        rows = [dict(zip(self.COLUMNS['ticket'], row)) for row in rows]
+        for row in rows:
+            row['description'] = self.texts.text(row['description'])
+        return rows
+
+    def count(self, view, now):
+        if self.sources['ticket'] is None:
+            return 0
+        where, params, _ = view.compile(now, self.text_descriptions, self.scheduled)
+        self.cursor.execute(f"SELECT COUNT(*) FROM {self.sources['ticket']} {where}", params)
+        return self.cursor.fetchone()[0]
+
+    def ticket_ids(self, view, now):
+        if self.sources['ticket'] is None:
+            return []
+        where, params, _ = view.compile(now, self.text_descriptions, self.scheduled)
+        self.cursor.execute(f"SELECT id FROM {self.sources['ticket']} {where}", params)
+        return [ticket_id for (ticket_id,) in self.cursor.fetchall()]
+
+    def ticket_rows(self, ids):
+        return self.ticket_dicts(self.lookup(f"{self.TICKET_SQL} WHERE id IN (?)", ids))
+
+    def upcoming(self, now, until, limit=TicketView.LIMIT):
+        if self.sources['ticket'] is None:
+            return []
+        description = "description" if self.text_descriptions else "description_id"
+        select = f"""SELECT id, title, {description}, created_at, due,
+            COALESCE(completed, 0), completed_time, completed_at,
+            COALESCE(paused, 0), paused_at, frozen_remaining"""
+        window = (now.isoformat(), until.isoformat(), int(limit))
+        # Tickets that wait for nothing are due at their deadline and come in
+        # order off the due index; ordering every row by its pushed-back
+        # deadline would sort the whole window. The few that wait are merged in
+        waits = "EXISTS (SELECT 1 FROM schedules WHERE ticket_id = tickets.id AND effective_due IS NOT NULL)"
+        self.cursor.execute(f"""{select}, due FROM {self.sources['ticket']}
+            WHERE {TicketView.STATUS['open']} AND due >= ? AND due < ? {f'AND NOT {waits}' if self.scheduled else ''}
+            ORDER BY due, id LIMIT ?""", window)
+        found = self.cursor.fetchall()
+        if self.scheduled:
+            self.cursor.execute(f"""{select}, effective_due FROM schedules
+                CROSS JOIN {self.sources['ticket']} ON tickets.id = schedules.ticket_id
+                WHERE {TicketView.STATUS['open']} AND effective_due >= ? AND effective_due < ?
+                ORDER BY effective_due, id LIMIT ?""", window)
+            found = sorted(found + self.cursor.fetchall(), key=lambda row: (row[-1], row[0]))[:int(limit)]
+        return list(zip([row[-1] for row in found], self.ticket_dicts([row[:-1] for row in found])))
+
+    def fridge_items(self):
+        self.cursor.execute(
+            "SELECT id, name, added_at, COALESCE(paused, 0), paused_at, frozen_age FROM fridge_items")
+        return [dict(zip(self.COLUMNS['fridge'], row)) for row in self.cursor.fetchall()]
+
+    TIMELINE_SQL = """SELECT id, created_at, due, COALESCE(completed, 0), completed_at,
+        COALESCE(paused, 0), paused_at FROM {}"""
+
+    def timeline(self):
+        self.cursor.execute(self.TIMELINE_SQL.format('tickets'))
+        return self.cursor.fetchall()
+
+    def insert(self, entity, fields, at):
+        with self.conn:
+            entity_id, stored = self.insert_row(entity, fields, at)
+        self.remember(stored, fields)
+        return entity_id
+
+    def insert_row(self, entity, fields, at):
+        """INSERT a row and its event inside the caller's transaction; returns its id and stored columns"""
+        table = Journal.TABLES[entity]
+        stored = self.stored(fields)
+        self.cursor.execute(
+            f"INSERT INTO {table} ({', '.join(stored)}) VALUES ({', '.join('?' * len(stored))})",
+            list(stored.values()))
+        entity_id = self.cursor.lastrowid
+        self.journal.record(entity, entity_id, 'created', at, **fields)
+        return entity_id, stored
+
+    def remember(self, stored, fields):
+        """Cache the description id of a committed row"""
+        if stored.get('description_id') is not None:
+            self.texts.remember(stored['description_id'], fields['description'])
+
+    def update_many(self, entity, changes, events):
+        with self.conn:
+            self.update_rows(entity, changes, events)
+
+    def update_rows(self, entity, changes, events):
+        """UPDATE rows and record their events inside the caller's transaction"""
+        table = Journal.TABLES[entity]
+        # One executemany per distinct set of columns
+        batches = {}
+        for entity_id, fields in changes:
+            stored = self.stored(fields)
+            batches.setdefault(tuple(stored), []).append((*stored.values(), entity_id))
+        for columns, rows in batches.items():
+            self.cursor.executemany(
+                f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?", rows)
+        self.journal.record_many(events)
+
+    def delete_many(self, entity, ids, at):
+        with self.conn:
+            self.cursor.executemany(f"DELETE FROM {Journal.TABLES[entity]} WHERE id = ?",
+                                    [(i,) for i in ids])
+            self.journal.record_many([(entity, i, 'deleted', at, {}) for i in ids])
+
+    # Values SQL can vouch for: plain local ISO text (a real day, then
+    # optionally T or space, HH:MM, :SS and a fraction, each in range) and
+    # numbers that read back as the same text. Anything else is a suspect
+    # for LoadReport.decode, so these may turn away good values but must
+    # never let a bad one through.
+    DAY = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+    CLEAN = {
+        'timestamp': f"""typeof({{0}}) = 'text' AND substr({{0}}, 1, 4) > '0000'
+            AND date({{0}}, '+0 days') IS substr({{0}}, 1, 10)
+            AND (length({{0}}) = 10 OR {{0}} GLOB '{DAY}[T ][0-9][0-9]:[0-9][0-9]*'
+                 AND substr({{0}}, 12, 2) <= '23' AND substr({{0}}, 15, 2) <= '59'
+                 AND (length({{0}}) = 16 OR substr({{0}}, 17) GLOB ':[0-5][0-9]'
+                      OR substr({{0}}, 17) GLOB ':[0-5][0-9].[0-9]*' AND substr({{0}}, 21) NOT GLOB '*[^0-9]*'))""",
+        'number': f"""(typeof({{0}}) IN ('integer', 'real')
+            OR typeof({{0}}) = 'text' AND CAST(CAST({{0}} AS REAL) AS TEXT) = {{0}})
+            AND abs(CAST({{0}} AS REAL)) <= {LoadReport.MAX_SECONDS}""",
+    }
+
+    sources = Journal.TABLES  # What to read each entity from
+
+    def suspects(self, entity, since=0):
+        source = self.sources[entity]
+        if source is None:
+            return []
+        checks = LoadReport.CHECKS[entity]
+        clauses = [f"NOT ({self.CLEAN[kind].format(column)})" if required else
+                   f"{column} IS NOT NULL AND {column} NOT IN ('', '0') AND NOT ({self.CLEAN[kind].format(column)})"
+                   for column, (kind, required) in checks.items()]
+        columns = ['id', LoadReport.LABELS[entity], *checks]
+        changed = "seq > ? AND " if since else ""  # Through idx_..._seq
+        self.cursor.execute(f"SELECT {', '.join(columns)} FROM {source} WHERE {changed}("
+                            + " OR ".join(f"({clause})" for clause in clauses) + ")", (since,) if since else ())
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def check_changed(self):
+        # The sync triggers stamp every inserted or edited row with a rising
+        # seq, whoever writes the file, so rows at or below the seq of the
+        # last clean check are known good
+        self.cursor.execute("SELECT key, value FROM sync_meta WHERE key IN ('seq', 'checked')")
+        meta = dict(self.cursor.fetchall())
+        report = self.check(meta.get('checked', 0))
+        if not report:
+            with self.conn:
+                self.cursor.execute("INSERT OR REPLACE INTO sync_meta VALUES ('checked', ?)", (meta['seq'],))
+        return report
+
+    def repair(self, report, now):
+        repaired = set()
+        with self.conn:
+            for entity, changes, events in report.fixes(now):
+                self.update_rows(entity, changes, events)
+                if entity == 'ticket':
+                    repaired.update(ticket_id for ticket_id, _ in changes)
+        self.reschedule(repaired)
+
+    def changes(self, after=0):
+        return self.journal.after(after)
+
+    def last_change(self):
+        return self.journal.last_seq()
+
+    def descriptions(self):
+        return self.texts.recent()
+
+    def views(self):
+        self.cursor.execute("SELECT name, spec FROM saved_views ORDER BY name")
+        saved = []
+        for name, spec in self.cursor.fetchall():
+            spec = json.loads(spec)
+            saved.append(TicketView(name, spec.pop('filter'), spec.get('order', "created_at DESC")))
+        return saved
+
+    def save_view(self, view):
+        with self.conn:
+            self.cursor.execute("INSERT OR REPLACE INTO saved_views VALUES (?, ?)",
+                (view.name, json.dumps({'filter': view.spec, 'order': view.order})))
+
+    def delete_view(self, name):
+        with self.conn:
+            self.cursor.execute("DELETE FROM saved_views WHERE name = ?", (name,))
+
+    def recurrences(self):
+        self.cursor.execute("SELECT id, spec, last_due, ticket_id FROM recurrences ORDER BY id")
+        return [Recurrence.from_spec(recurrence_id, json.loads(spec), last_due, ticket_id)
+                for recurrence_id, spec, last_due, ticket_id in self.cursor.fetchall()]
+
+    def save_recurrence(self, recurrence):
+        with self.conn:
+            self.cursor.execute("INSERT INTO recurrences (spec) VALUES (?)", (json.dumps(recurrence.spec()),))
+        recurrence.id = self.cursor.lastrowid
+
+    def delete_recurrence(self, recurrence_id):
+        with self.conn:
+            self.cursor.execute("DELETE FROM recurrences WHERE id = ?", (recurrence_id,))
+
+    def add_occurrence(self, recurrence, fields, at):
+        with self.conn:
+            ticket_id, stored = self.insert_row('ticket', fields, at)
+            self.cursor.execute("UPDATE recurrences SET last_due = ?, ticket_id = ? WHERE id = ?",
+                                (fields['due'], ticket_id, recurrence.id))
+        self.remember(stored, fields)
+        recurrence.last_due = datetime.fromisoformat(fields['due'])
+        recurrence.ticket_id = ticket_id
+        return ticket_id
+
+    def attachments(self, ticket_id):
+        self.cursor.execute(f"""SELECT {', '.join(self.ATTACHMENT_COLUMNS)} FROM attachments
+            WHERE ticket_id = ? ORDER BY id""", (ticket_id,))
+        return [dict(zip(self.ATTACHMENT_COLUMNS, row)) for row in self.cursor.fetchall()]
+
+    def attach(self, ticket_id, meta, source, size):
+        with self.conn:
+            # Reserve the space, then fill it through an incremental blob handle
+            self.cursor.execute('''INSERT INTO attachments
+                (ticket_id, name, mime, size, added_at, summary, thumbnail, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, zeroblob(?))''',
+                (ticket_id, meta.get('name'), meta.get('mime'), size, meta.get('added_at'),
+                 meta.get('summary'), meta.get('thumbnail'), size))
+            attachment_id = self.cursor.lastrowid
+            with self.conn.blobopen('attachments', 'data', attachment_id) as blob:
+                while blob.tell() < size:
+                    chunk = source.read(min(self.CHUNK, size - blob.tell()))
+                    if not chunk:
+                        raise ValueError(f"Attachment ended after {blob.tell()} of {size} bytes")
+                    blob.write(chunk)
+        return attachment_id
+
+    def read_attachment(self, attachment_id, sink):
+        with self.conn.blobopen('attachments', 'data', attachment_id, readonly=True) as blob:
+            while chunk := blob.read(self.CHUNK):
+                sink.write(chunk)
+
+    def delete_attachment(self, attachment_id):
+        with self.conn:
+            self.cursor.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
+
+    def lookup(self, sql, ids):
+        """Rows of `sql`, whose IN (?) is filled with `ids` a batch at a time"""
+        ids, rows = list(ids), []
+        for start in range(0, len(ids), self.BATCH):
+            batch = ids[start:start + self.BATCH]
+            self.cursor.execute(sql.replace('(?)', f"({', '.join('?' * len(batch))})"), batch)
+            rows += self.cursor.fetchall()
+        return rows
+
+    def blockers(self, ticket_ids):
+        return self.lookup("SELECT ticket_id, blocker_id FROM dependencies WHERE ticket_id IN (?)", ticket_ids)
+
+    def dependents(self, ticket_ids):
+        return self.lookup("SELECT blocker_id, ticket_id FROM dependencies WHERE blocker_id IN (?)", ticket_ids)
+
+    def timings(self, ticket_ids):
+        return {row[0]: row[1:] for row in self.lookup(
+            """SELECT id, created_at, due, COALESCE(completed, 0), completed_at, COALESCE(paused, 0)
+               FROM tickets WHERE id IN (?)""", ticket_ids)}
+
+    def schedules(self, ticket_ids):
+        return {row[0]: row[1:] for row in self.lookup(
+            "SELECT ticket_id, ready_at, effective_due, waiting, depth FROM schedules WHERE ticket_id IN (?)",
+            ticket_ids)}
+
+    def write_dependency(self, ticket_id, blocker_id, add):
+        with self.conn:
+            self.cursor.execute("INSERT OR IGNORE INTO dependencies VALUES (?, ?)" if add else
+                                "DELETE FROM dependencies WHERE ticket_id = ? AND blocker_id = ?",
+                                (ticket_id, blocker_id))
+
+    def write_schedules(self, changes):
+        with self.conn:
+            self.cursor.executemany("INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?, ?)",
+                                    [(i, *s) for i, s in changes.items() if s is not None])
+            self.cursor.executemany("DELETE FROM schedules WHERE ticket_id = ?",
+                                    [(i,) for i, s in changes.items() if s is None])
+
+    def compact(self):
+        with self.conn:
+            return self.journal.maybe_checkpoint()
+
+    def close(self):
+        self.compact()
+        self.conn.close()
+
+class ArchiveStorage(SQLiteStorage):
+    """A database file opened only for reading, e.g. a large archive.
+
+    Nothing is written: there is no schema upgrade, SQLite opens the file
+    read-only and immutable with query_only set, and every write raises.
+    Pages are memory-mapped and only read when a query touches them, and
+    views load at most TicketView.LIMIT rows, so opening takes the same
+    time whatever the file size. Files from any earlier schema version
+    can be browsed; missing columns read as their defaults.
+    """
+    MMAP_SIZE = 1 << 34  # SQLite caps this at its compile-time maximum
+    read_only = True
+    text_descriptions = False  # Description text still stored in each ticket row
+
+    def __init__(self, path):
+        # immutable=1 also skips locking, so the file must not change while open
+        uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro&immutable=1"
+        self.path = path
+        self.conn = sqlite3.connect(uri, uri=True)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute("PRAGMA query_only = ON")
+        self.cursor.execute(f"PRAGMA mmap_size = {self.MMAP_SIZE}")
+        self.journal = Journal(self.cursor)
+        self.texts = Descriptions(self.cursor)  # Filled lazily by the rows shown
+        self.sources = {entity: self.source(entity) for entity in Journal.TABLES}
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schedules'")
+        self.scheduled = self.cursor.fetchone() is not None
+        self.cursor.execute("SELECT name FROM pragma_index_list('tickets')")
+        self.indexed = set()  # Columns that lead an index on tickets
+        for (index,) in self.cursor.fetchall():
+            self.cursor.execute("SELECT name FROM pragma_index_info(?) WHERE seqno = 0", (index,))
+            self.indexed.update(name for (name,) in self.cursor.fetchall())
+
+    def source(self, entity):
+        """A FROM clause giving every current column, whatever the file's schema"""
+        table = Journal.TABLES[entity]
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        present = {row[1] for row in self.cursor.fetchall()}
+        if not present:
+            return None
+        if entity == 'ticket' and 'description_id' in present:
+            present.add('description')
+        elif entity == 'ticket':
+            self.text_descriptions = True
+        if present >= set(self.COLUMNS[entity]):
+            return table  # Current schema: query the table and its indexes directly
+        columns = ['id' if 'id' in present else 'rowid AS id']
+        for column, default in Journal.DEFAULTS[entity].items():
+            columns.append(column if column in present else f"{default if default is not None else 'NULL'} AS {column}")
+        return f"(SELECT {', '.join(columns)} FROM {table}) AS {table}"
+
+    def tickets(self, view, now, limit=TicketView.LIMIT):
+        if self.sources['ticket'] is None:
+            return []
+        where, params, order = view.compile(now, self.text_descriptions, self.scheduled)
+        column, *direction = order.split(',')[0].split()
+        if not where and column not in self.indexed:
+            # Unfiltered and unindexed, e.g. "All" in an old file: rows were
+            # added in time order, so read the last pages by id instead of
+            # sorting the whole table
+            order = ' '.join(['id', *direction])
+        description = "description" if self.text_descriptions else "description_id"
+        self.cursor.execute(f"""
+            SELECT id, title, {description}, created_at, due,
+                   COALESCE(completed, 0), completed_time, completed_at,
+                   COALESCE(paused, 0), paused_at, frozen_remaining
+            FROM {self.sources['ticket']}
+            {where}
+            ORDER BY {order}
+            LIMIT {int(limit)}""", params)
+        return self.ticket_dicts(self.cursor.fetchall())
+
+    def ticket_dicts(self, rows):
+        if not self.text_descriptions:
+            return super().ticket_dicts(rows)
+        rows = [dict(zip(self.COLUMNS['ticket'], row)) for row in rows]
+        for row in rows:
+            if row['description'] is not None:
+                row['description'] = sys.intern(row['description'])
+        return rows
+
+    def fridge_items(self):
+        if self.sources['fridge'] is None:
+            return []
+        self.cursor.execute(f"""SELECT id, name, added_at, COALESCE(paused, 0), paused_at, frozen_age
+            FROM {self.sources['fridge']}""")
+        return [dict(zip(self.COLUMNS['fridge'], row)) for row in self.cursor.fetchall()]
+
+    def timeline(self):
+        if self.sources['ticket'] is None:
+            return []
+        self.cursor.execute(self.TIMELINE_SQL.format(self.sources['ticket']))
+        return self.cursor.fetchall()
+
+    def refuse(self, *args):
+        raise PermissionError(f"{self.path} is open read-only")
+
+    insert = update_many = delete_many = save_view = delete_view = refuse
+    save_recurrence = delete_recurrence = add_occurrence = attach = delete_attachment = refuse
+    add_dependency = remove_dependency = reschedule = write_dependency = write_schedules = repair = refuse
+
+    def compact(self):
+        return False  # Closing must not write either
+
+    check_changed = Storage.check_changed  # Nowhere to record a clean check
+
+    def changes(self, after=0):
+        try:
+            return self.journal.after(after)
+        except sqlite3.OperationalError:
+            return []  # Saved before the journal existed
+
+    def last_change(self):
+        return 0  # The file can't change while it is open
+
+    def descriptions(self):
+        return []  # Only offered for new tickets, which can't be added here
+
+    def views(self):
+        try:
+            return super().views()
+        except sqlite3.OperationalError:
+            return []  # Saved before views existed
+
+    def recurrences(self):
+        return []  # Nothing repeats in an archive: occurrences couldn't be added
+
+    def attachments(self, ticket_id):
+        try:
+            return super().attachments(ticket_id)
+        except sqlite3.OperationalError:
+            return []  # Saved before attachments existed
+
+    def schedules(self, ticket_ids):
+        try:
+            return super().schedules(ticket_ids)
+        except sqlite3.OperationalError:
+            return {}  # Saved before tickets could wait for each other
+
+class MemoryStorage(Storage):
+    """Storage in dicts, for tests, benchmarks and throwaway sessions.
+
+    Rows are indexed by id, and tickets also by (completed, paused) and by
+    description, so views only look at the rows that can match.
+    """
+
+    def __init__(self):
+        self.rows = {entity: {} for entity in Journal.TABLES}
+        self.next_id = {entity: 1 for entity in Journal.TABLES}
+        self.by_state = {}  # (completed, paused) -> ticket ids
+        self.by_description = {}  # text -> ticket ids
+        self.usage = {}  # description -> [use count, last used]
+        self.events = []
+        self.saved = {}
+        self.repeating = {}  # id -> (spec, last due, ticket id)
+        self.attached = {}  # id -> (metadata, data)
+        self.blocked_by = {}  # ticket id -> ids it waits for
+        self.blocking = {}  # ticket id -> ids waiting for it
+        self.planned = {}  # ticket id -> schedule
+
+    def index(self, row, add):
+        for index, key in ((self.by_state, (row['completed'], row['paused'])),
+                           (self.by_description, row['description'])):
+            ids = index.setdefault(key, set())
+            if add:
+                ids.add(row['id'])
+            else:
+                ids.discard(row['id'])
+
+    def use_description(self, text, replaced=None):
+        """Count one more use of `text` (and one less of the row's old text); returns it interned"""
+        if replaced is not None and replaced['description'] in self.usage:
+            self.usage[replaced['description']][0] -= 1
+        if text is None:
+            return None
+        text = sys.intern(text)
+        self.usage.setdefault(text, [0, ''])[0] += 1
+        return text
+
+    def record(self, events):
+        """Append journal events, checked and stored as the SQLite journal would"""
+        entries = []
+        for entity, entity_id, kind, at, data in events:
+            if entity not in Journal.TABLES or kind not in Journal.KINDS:
+                raise ValueError(f"Unknown journal event {entity}/{kind}")
+            entries.append((entity, entity_id, kind, at.isoformat(), json.loads(json.dumps(data))))
+        start = len(self.events) + 1
+        self.events.extend((seq, *entry) for seq, entry in enumerate(entries, start))
+
+    def matching(self, view, now):
+        """Every row matching a TicketView, in its order"""
+        spec, rows = view.spec, self.rows['ticket']
+        # Narrow to the index entries the filters allow before testing rows
+        candidates = None
+        states = [view.STATES[spec['status']]] if 'status' in spec else []
+        if spec.get('overdue'):
+            states.append(view.STATES['running'])
+        if 'done_since' in spec:
+            states.append(view.STATES['done'])
+        for allowed in states:
+            ids = set().union(*(self.by_state.get(state, ()) for state in allowed))
+            candidates = ids if candidates is None else candidates & ids
+        if 'description' in spec:
+            ids = self.by_description.get(spec['description'], set())
+            candidates = ids if candidates is None else candidates & ids
+        found = [dict(rows[i]) for i in (rows if candidates is None else candidates)
+                 if view.matches(rows[i], now, self.planned.get(i, (None, None))[1])]
+        return view.sort(sorted(found, key=lambda row: row['id']))
+
+    def tickets(self, view, now, limit=TicketView.LIMIT):
+        return self.matching(view, now)[:limit]
+
+    def count(self, view, now):
+        return len(self.matching(view, now))
+
+    def ticket_ids(self, view, now):
+        return [row['id'] for row in self.matching(view, now)]
+
+    def ticket_rows(self, ids):
+        rows = self.rows['ticket']
+        return [dict(rows[i]) for i in ids if i in rows]
+
+    def upcoming(self, now, until, limit=TicketView.LIMIT):
+        rows, found = self.rows['ticket'], []
+        for state in TicketView.STATES['open']:
+            for i in self.by_state.get(state, ()):
+                deadline = self.planned.get(i, (None, None))[1] or rows[i]['due']
+                if deadline is not None and now.isoformat() <= deadline < until.isoformat():
+                    found.append((deadline, i))
+        return [(deadline, dict(rows[i])) for deadline, i in heapq.nsmallest(int(limit), found)]
+
+    def fridge_items(self):
+        return [dict(row) for row in self.rows['fridge'].values()]
+
+    def suspects(self, entity, since=0):
+        return list(self.rows[entity].values())  # Nothing cheaper to narrow by
+
+    def timeline(self):
+        return [(row['id'], row['created_at'], row['due'], row['completed'], row['completed_at'],
+                 row['paused'], row['paused_at']) for row in self.rows['ticket'].values()]
+
+    def insert(self, entity, fields, at):
+        unknown = set(fields) - set(Journal.DEFAULTS[entity])
+        if unknown:
+            raise ValueError(f"Unknown {entity} fields: {', '.join(sorted(unknown))}")
+        entity_id = self.next_id[entity]
+        row = {'id': entity_id, **Journal.DEFAULTS[entity], **fields}
+        self.record([(entity, entity_id, 'created', at, fields)])
+        self.next_id[entity] += 1
+        if entity == 'ticket':
+            row['description'] = self.use_description(row['description'])
+            if row['description'] is not None:
+                usage = self.usage[row['description']]
+                usage[1] = max(usage[1], row['created_at'] or '')
+            self.index(row, True)
+        self.rows[entity][entity_id] = row
+        return entity_id
+
+    def update_many(self, entity, changes, events):
+        for _, fields in changes:
+            unknown = set(fields) - set(Journal.DEFAULTS[entity])
+            if unknown:
+                raise ValueError(f"Unknown {entity} fields: {', '.join(sorted(unknown))}")
+        self.record(events)
+        for entity_id, fields in changes:
+            row = self.rows[entity].get(entity_id)
+            if row is None:
+                continue  # Like an UPDATE that matches nothing
+            if entity == 'ticket':
+                self.index(row, False)
+                if 'description' in fields:
+                    fields = {**fields, 'description': self.use_description(fields['description'], row)}
+            row.update(fields)
+            if entity == 'ticket':
+                self.index(row, True)
+
+    def delete_many(self, entity, ids, at):
+        self.record([(entity, i, 'deleted', at, {}) for i in ids])
+        if entity == 'ticket':
+            gone = set(ids)
+            self.attached = {i: entry for i, entry in self.attached.items() if entry[0]['ticket_id'] not in gone}
+            for ticket_id in gone:
+                for blocker_id in self.blocked_by.pop(ticket_id, ()):
+                    self.blocking[blocker_id].discard(ticket_id)
+                for dependent_id in self.blocking.pop(ticket_id, ()):
+                    self.blocked_by[dependent_id].discard(ticket_id)
+                self.planned.pop(ticket_id, None)
+            self.repeating = {i: (spec, last_due, None if ticket_id in gone else ticket_id)
+                              for i, (spec, last_due, ticket_id) in self.repeating.items()}
+        for entity_id in ids:
+            row = self.rows[entity].pop(entity_id, None)
+            if row is not None and entity == 'ticket':
+                self.index(row, False)
+                if row['description'] in self.usage:
+                    self.usage[row['description']][0] -= 1
+
+    def changes(self, after=0):
+        return [(seq, *entry[:4], dict(entry[4])) for seq, *entry in self.events[after:]]
+
+    def last_change(self):
+        return len(self.events)
+
+    def descriptions(self):
+        return sorted(self.usage, key=lambda text: self.usage[text][::-1], reverse=True)
+
+    def views(self):
+        return [TicketView(name, dict(spec), order) for name, (spec, order) in sorted(self.saved.items())]
+
+    def save_view(self, view):
+        self.saved[view.name] = (dict(view.spec), view.order)
+
+    def delete_view(self, name):
+        self.saved.pop(name, None)
+
+    def recurrences(self):
+        return [Recurrence.from_spec(recurrence_id, json.loads(spec), last_due, ticket_id)
+                for recurrence_id, (spec, last_due, ticket_id) in sorted(self.repeating.items())]
+
+    def save_recurrence(self, recurrence):
+        recurrence.id = max(self.repeating, default=0) + 1
+        self.repeating[recurrence.id] = (json.dumps(recurrence.spec()), None, None)
+
+    def delete_recurrence(self, recurrence_id):
+        self.repeating.pop(recurrence_id, None)
+
+    def add_occurrence(self, recurrence, fields, at):
+        ticket_id = self.insert('ticket', fields, at)
+        if recurrence.id in self.repeating:
+            self.repeating[recurrence.id] = (self.repeating[recurrence.id][0], fields['due'], ticket_id)
+        recurrence.last_due = datetime.fromisoformat(fields['due'])
+        recurrence.ticket_id = ticket_id
+        return ticket_id
+
+    def attachments(self, ticket_id):
+        return [dict(meta) for _, (meta, _) in sorted(self.attached.items()) if meta['ticket_id'] == ticket_id]
+
+    def attach(self, ticket_id, meta, source, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = source.read(min(self.CHUNK, size - len(data)))
+            if not chunk:
+                raise ValueError(f"Attachment ended after {len(data)} of {size} bytes")
+            data += chunk
+        attachment_id = max(self.attached, default=0) + 1
+        self.attached[attachment_id] = ({**{c: meta.get(c) for c in self.ATTACHMENT_COLUMNS},
+                                         'id': attachment_id, 'ticket_id': ticket_id, 'size': size}, bytes(data))
+        return attachment_id
+
+    def read_attachment(self, attachment_id, sink):
+        data = memoryview(self.attached[attachment_id][1])
+        for start in range(0, len(data), self.CHUNK):
+            sink.write(data[start:start + self.CHUNK])
+
+    def delete_attachment(self, attachment_id):
+        self.attached.pop(attachment_id, None)
+
+    def blockers(self, ticket_ids):
+        return [(t, b) for t in ticket_ids for b in self.blocked_by.get(t, ())]
+
+    def dependents(self, ticket_ids):
+        return [(b, t) for b in ticket_ids for t in self.blocking.get(b, ())]
+
+    def timings(self, ticket_ids):
+        rows = self.rows['ticket']
+        return {i: (rows[i]['created_at'], rows[i]['due'], rows[i]['completed'], rows[i]['completed_at'],
+                    rows[i]['paused']) for i in ticket_ids if i in rows}
+
+    def schedules(self, ticket_ids):
+        return {i: self.planned[i] for i in ticket_ids if i in self.planned}
+
+    def write_dependency(self, ticket_id, blocker_id, add):
+        if add:
+            self.blocked_by.setdefault(ticket_id, set()).add(blocker_id)
+            self.blocking.setdefault(blocker_id, set()).add(ticket_id)
+        else:
+            self.blocked_by.get(ticket_id, set()).discard(blocker_id)
+            self.blocking.get(blocker_id, set()).discard(ticket_id)
+
+    def write_schedules(self, changes):
+        for ticket_id, schedule in changes.items():
+            if schedule is None:
+                self.planned.pop(ticket_id, None)
+            else:
+                self.planned[ticket_id] = schedule
+
+class CanvasPool:
+    """Canvas items of one kind, moved and restyled from frame to frame
+    instead of being deleted and created again"""
+
+    def __init__(self, canvas, kind, tag, **defaults):
+        self.canvas = canvas
+        self.create = getattr(canvas, f"create_{kind}")
+        self.tag = tag
+        self.defaults = defaults
+        self.items = []
+        self.options = []  # Options last applied to each item
+        self.used = 0
+        self.shown = 0
+
+    def begin(self):
+        self.used = 0
+
+    def place(self, coords, **options):
+        i = self.used
+        self.used += 1
+        if i == len(self.items):
+            self.items.append(self.create(*coords, tags=self.tag, **self.defaults, **options))
+            self.options.append(options)
+            return
+        self.canvas.coords(self.items[i], *coords)
+        changes = {} if options == self.options[i] else dict(options)
+        if i >= self.shown:
+            changes['state'] = tk.NORMAL
+        if changes:
+            self.canvas.itemconfigure(self.items[i], **changes)
+            self.options[i] = options
+
+    def end(self):
+        """Hide the items this frame didn't use"""
+        for item in self.items[self.used:self.shown]:
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+        self.shown = self.used
+
+class Timeline:
+    """Zoomable, pannable plot of every ticket from creation to deadline.
+
+    Zoomed out, tickets are counted into bins a few pixels wide by bisecting
+    sorted start, end, due and completion times, so a frame costs the same
+    for a hundred tickets or a hundred thousand. Once few enough spans are
+    on screen each one is drawn with its pause and completion.
+    """
+    MAX_SPANS = 400  # Spans drawn one by one; more than this are binned
+    BIN_PX = 6
+    LANE_PX = 7
+    AXIS_PX = 18
+    BLOCK = 64  # Spans per block in the overlap search
+    STEPS = [60, 300, 900, 3600, 3 * 3600, 6 * 3600, 86400, 7 * 86400, 30 * 86400, 365 * 86400]
+    COLORS = {'running': "#64B5F6", 'overdue': "#E57373", 'paused': "#90A4AE", 'done': "#81C784"}
+
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Timeline")
+        self.canvas = tk.Canvas(self.window, width=960, height=360, bg=app.bg_color, highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        canvas = self.canvas
+        # Listed bottom to top
+        self.pools = [
+            CanvasPool(canvas, 'line', 'grid', fill=app.border_color),
+            CanvasPool(canvas, 'text', 'label', anchor='nw', fill=app.secondary_color, font=(app.font_family, 9)),
+            CanvasPool(canvas, 'rectangle', 'active', width=0, fill="#BBDEFB"),
+            CanvasPool(canvas, 'rectangle', 'due', width=0, fill=self.COLORS['overdue']),
+            CanvasPool(canvas, 'rectangle', 'done', width=0, fill=self.COLORS['done']),
+            CanvasPool(canvas, 'line', 'span', width=3),
+            CanvasPool(canvas, 'line', 'pause', width=3, fill="#FFB74D"),
+            CanvasPool(canvas, 'rectangle', 'marker', width=0),
+        ]
+        self.grid, self.labels, self.active, self.due, self.done, self.span, self.pause, self.marker = self.pools
+        self.now_line = canvas.create_line(0, 0, 0, 0, fill=app.accent_color, width=2, tags='now')
+
+        now = app.clock.now().timestamp()
+        self.start, self.end = now - 86400, now + 86400
+        self.redraw_job = None
+        self.drag_x = None
+        
+        canvas.bind('<Configure>', lambda e: self.redraw_soon())
+        canvas.bind('<ButtonPress-1>', self.on_press)
+        canvas.bind('<B1-Motion>', self.on_drag)
+        canvas.bind('<MouseWheel>', lambda e: self.zoom(0.8 if e.delta > 0 else 1.25, e.x))
+        canvas.bind('<Button-4>', lambda e: self.zoom(0.8, e.x))  # Wheel on X11
+        canvas.bind('<Button-5>', lambda e: self.zoom(1.25, e.x))
+        self.window.bind('<FocusIn>', self.on_focus)
+        self.window.protocol('WM_DELETE_WINDOW', self.close)
+        self.load()
+
+    @staticmethod
+    def timestamp(text):
+        try:
+            return datetime.fromisoformat(text).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    def load(self):
+        """Read every ticket's span from storage and index it"""
+        self.storage = self.app.storage
+        self.seen = self.storage.last_change()
+        now = self.app.clock.now().timestamp()
+        spans = []
+        for ticket_id, created_at, due, completed, completed_at, paused, paused_at in self.app.storage.timeline():
+            start, due_at = self.timestamp(created_at), self.timestamp(due)
+            if start is None or due_at is None:
+                continue
+            paused_from = self.timestamp(paused_at) if paused and not completed else None
+            if paused_from is not None:
+                due_at += max(now - paused_from, 0)  # Where the deadline moves if resumed now
+            done_at = self.timestamp(completed_at) if completed else None
+            end = done_at if done_at is not None else due_at
+            spans.append((start, max(end, start), due_at, done_at, paused_from, ticket_id))
+        spans.sort()
+        self.spans = spans
+        self.starts = [span[0] for span in spans]
+        self.ends = sorted(span[1] for span in spans)
+        self.dues = sorted(span[2] for span in spans)
+        self.dones = sorted(span[3] for span in spans if span[3] is not None)
+        # Latest end within each block, and within it and every block before,
+        # so the overlap search skips blocks and stops once all is in the past
+        self.block_end, self.prefix_end = [], []
+        latest = float('-inf')
+        for first in range(0, len(spans), self.BLOCK):
+            block = max(span[1] for span in spans[first:first + self.BLOCK])
+            latest = max(latest, block)
+            self.block_end.append(block)
+            self.prefix_end.append(latest)
+        self.redraw_soon()
+
+    def overlapping(self, t0, t1):
+        """Indexes of the spans crossing [t0, t1), or None if there are more than MAX_SPANS"""
+        before = bisect.bisect_left(self.starts, t1)  # Spans starting before t1
+        if before - bisect.bisect_right(self.ends, t0) > self.MAX_SPANS:
+            return None
+        found = []
+        block = (before - 1) // self.BLOCK
+        while block >= 0 and self.prefix_end[block] > t0:
+            if self.block_end[block] > t0:
+                for i in range(min(before, (block + 1) * self.BLOCK) - 1, block * self.BLOCK - 1, -1):
+                    if self.spans[i][1] > t0:
+                        found.append(i)
+            block -= 1
+        return found
+
+    def redraw_soon(self):
+        """Coalesce bursts of pan and zoom events into one frame"""
+        if self.redraw_job is None:
+            self.redraw_job = self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        self.redraw_job = None
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width < 2 or height <= self.AXIS_PX:
+            return
+        t0, t1 = self.start, self.end
+        scale = width / (t1 - t0)
+        for pool in self.pools:
+            pool.begin()
+        
+        # Time axis
+        step = next((s for s in self.STEPS if s * scale >= 90), self.STEPS[-1])
+        offset = time.localtime(t0).tm_gmtoff  # Align ticks to local midnights and hours
+        tick = math.ceil((t0 + offset) / step) * step - offset
+        fmt = "%H:%M" if step < 86400 else "%b %d" if step < 365 * 86400 else "%Y"
+        while tick < t1:
+            x = (tick - t0) * scale
+            self.grid.place((x, 0, x, height))
+            self.labels.place((x + 3, 2), text=datetime.fromtimestamp(tick).strftime(fmt))
+            tick += step
+        
+        now = self.app.clock.now().timestamp()
+        top, bottom = self.AXIS_PX + 4, height - 2
+        visible = self.overlapping(t0, t1)
+        if visible is None:
+            self.draw_bins(t0, scale, width, top, bottom)
+        else:
+            self.draw_spans(visible, t0, scale, width, top, bottom, now)
+        now_x = (now - t0) * scale
+        self.canvas.coords(self.now_line, now_x, 0, now_x, height)
+        
+        for pool in self.pools:
+            pool.end()
+            self.canvas.tag_raise(pool.tag)  # New items land on top of everything
+        self.canvas.tag_raise('now')
+
+    def draw_bins(self, t0, scale, width, top, bottom):
+        """Tickets open, due and completed per bin, each scaled to the busiest bin"""
+        counts = []
+        for x in range(0, width, self.BIN_PX):
+            a, b = t0 + x / scale, t0 + (x + self.BIN_PX) / scale
+            counts.append((x,
+                           bisect.bisect_left(self.starts, b) - bisect.bisect_right(self.ends, a),
+                           bisect.bisect_left(self.dues, b) - bisect.bisect_left(self.dues, a),
+                           bisect.bisect_left(self.dones, b) - bisect.bisect_left(self.dones, a)))
+        peaks = [max(max(c[n] for c in counts), 1) for n in (1, 2, 3)]
+        room = bottom - top
+        half = self.BIN_PX // 2
+        for x, active, due, done in counts:
+            if active:
+                self.active.place((x, bottom - room * active / peaks[0], x + self.BIN_PX - 1, bottom))
+            if due:
+                self.due.place((x, bottom - room * due / peaks[1], x + half - 1, bottom))
+            if done:
+                self.done.place((x + half, bottom - room * done / peaks[2], x + self.BIN_PX - 1, bottom))
+
+    def draw_spans(self, visible, t0, scale, width, top, bottom, now):
+        """One line per ticket in a lane picked by its start order, so lanes don't move while panning"""
+        lanes = max((bottom - top) // self.LANE_PX, 1)
+        clip = lambda t: min(max((t - t0) * scale, -10), width + 10)
+        for i in visible:
+            start, end, due, done, paused_from, _ = self.spans[i]
+            y = top + (i % lanes) * self.LANE_PX + self.LANE_PX // 2
+            if done is not None:
+                state = 'done'
+            elif paused_from is not None:
+                state = 'paused'
+            else:
+                state = 'overdue' if due < now else 'running'
+            self.span.place((clip(start), y, clip(end), y), fill=self.COLORS[state])
+            if paused_from is not None:
+                self.pause.place((clip(paused_from), y, clip(now), y))
+            x = clip(due)
+            self.marker.place((x - 1, y - 3, x + 1, y + 3), fill="#C62828")
+            if done is not None:
+                x = clip(done)
+                self.marker.place((x - 2, y - 3, x + 2, y + 3), fill="#2E7D32")
+
+    def pan(self, pixels):
+        shift = pixels * (self.end - self.start) / max(self.canvas.winfo_width(), 1)
+        self.start += shift
+        self.end += shift
+        self.redraw_soon()
+
+    def zoom(self, factor, x):
+        """Scale the visible range around the time under pixel x"""
+        span = self.end - self.start
+        factor = min(max(factor, 60 / span), 20 * 365 * 86400 / span)  # Between a minute and 20 years
+        anchor = self.start + x / max(self.canvas.winfo_width(), 1) * span
+        self.start = anchor - (anchor - self.start) * factor
+        self.end = anchor + (self.end - anchor) * factor
+        self.redraw_soon()
+
+    def on_press(self, event):
+        self.drag_x = event.x
+
+    def on_drag(self, event):
+        if self.drag_x is not None:
+            self.pan(self.drag_x - event.x)
+            self.drag_x = event.x
+
+    def on_focus(self, event):
+        # Pick up tickets changed in the main window, or another database
+        # opened there, without re-reading anything when nothing changed
+        if event.widget is self.window and (self.app.storage is not self.storage
+                                            or self.storage.last_change() != self.seen):
+            self.load()
+
+    def close(self):
+        self.window.destroy()
+        self.app.timeline = None
+
 class TicketApp:
-    def __init__(self, root):
+    def __init__(self, root, clock=None, storage=None):
         self.root = root
+        self.clock = clock or default_clock
+        self.storage = None
+        self.timeline = None
+        self.report = LoadReport()  # Rows of the open database that couldn't be loaded
+        self.report_window = None
+        # Bound by name: as a state mask, Mod1 is Command on Mac but Alt on X11
+        self.toggle_modifier = 'Command' if root.tk.call('tk', 'windowingsystem') == 'aqua' else 'Control'
         self.root.title("Ticket System")
         
         # Modern color scheme that works well on both platforms
@@ -110,12 +2574,33 @@ class TicketApp:
         
         self.root.configure(bg=self.bg_color)
         
+        # Row fonts; countdowns use fixed-pitch digits so they never jitter
+        self.row_font = tkfont.Font(family=self.font_family, size=11)
+        self.time_font = tkfont.Font(family=tkfont.nametofont('TkFixedFont').actual('family'), size=11)
+        self.zero_width = self.row_font.measure('0')  # Tk's unit for a label's width in characters
+        self.char_widths = {}  # Character -> pixels in row_font
+        self.elided = {}  # (text, width in characters) -> text that fits
+        
         # Initialize lists first
-        self.tickets = []
+        self.tickets = []  # In the chosen sort order, like the rows on screen
+        self.order = TicketOrder()
         self.description_history = []
         self.fridge_items = []
         self.ticket_labels = []
         self.fridge_labels = []
+        self.recurrences = []
+        self.recurrence_job = None  # Wakes up when the next repeating ticket is due to appear
+        self.drawn = weakref.WeakKeyDictionary()  # row frame -> (state, next redraw, cell texts)
+        self.expanded = weakref.WeakKeyDictionary()  # row frame -> its attachments panel
+        self.attachment_meta = {}  # ticket id -> attachment metadata, read when first expanded
+        self.thumbnails = {}  # attachment id -> PhotoImage
+        self.update_job = None
+        self.update_due = None
+        self.visible = True
+        self.views = list(TicketView.BUILTIN)
+        self.view = self.views[0]  # Filter deciding which tickets are loaded
+        self.selected = set()  # Ids of tickets selected for bulk actions
+        self.select_anchor = None  # Last clicked ticket, start of shift-click ranges
         
         # Configure styles for modern look
         style = ttk.Style()
@@ -148,6 +2633,30 @@ class TicketApp:
         # Database buttons with modern styling
         ttk.Button(self.db_frame, text="New DB", command=self.create_new_database).pack(side=tk.LEFT, padx=4)
         ttk.Button(self.db_frame, text="Open DB", command=self.open_database).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.db_frame, text="Browse DB", command=self.browse_database).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.db_frame, text="Sync DB", command=self.sync_database).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.db_frame, text="Timeline", command=self.open_timeline).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.db_frame, text="Upcoming", command=self.show_upcoming).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.db_frame, text="Check Data", command=self.check_data).pack(side=tk.LEFT, padx=4)
+        
+        # Saved view selector
+        ttk.Button(self.db_frame, text="Delete View", command=self.delete_view).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.db_frame, text="Save View", command=self.save_view).pack(side=tk.RIGHT, padx=4)
+        self.view_var = tk.StringVar(value=self.view.name)
+        self.view_combo = ttk.Combobox(self.db_frame, textvariable=self.view_var, width=22, state='readonly')
+        self.view_combo.pack(side=tk.RIGHT, padx=6)
+        self.view_combo.bind('<<ComboboxSelected>>', self.switch_view)
+        self.sort_var = tk.StringVar(value='Created')
+        self.sort_combo = ttk.Combobox(self.db_frame, textvariable=self.sort_var, values=list(TicketOrder.KEYS),
+                                       width=12, state='readonly')
+        self.sort_combo.pack(side=tk.RIGHT, padx=6)
+        self.sort_combo.bind('<<ComboboxSelected>>', self.switch_sort)
+        # Views load a page at a time; say how much of the view is shown
+        self.more_button = ttk.Button(self.db_frame, text="More", command=self.load_more, state=tk.DISABLED)
+        self.more_button.pack(side=tk.RIGHT, padx=4)
+        self.page_label = tk.Label(self.db_frame, text="", font=(self.font_family, 11),
+                                   bg=self.bg_color, fg=self.secondary_color)
+        self.page_label.pack(side=tk.RIGHT, padx=6)
         
         # Create input frame with modern spacing
         self.input_frame = tk.Frame(root, bg=self.bg_color, padx=12, pady=12)
@@ -191,6 +2700,11 @@ class TicketApp:
         tk.Entry(time_frame, textvariable=self.sec_var, **time_entry_style).pack(side=tk.LEFT)
         tk.Label(time_frame, text="s", **time_label_style).pack(side=tk.LEFT, padx=(0, 6))
 
+        # How the ticket repeats; free text such as "every 2 weeks" works too
+        self.repeat_var = tk.StringVar(value=Recurrence.CHOICES[0])
+        ttk.Combobox(self.input_frame, textvariable=self.repeat_var, values=Recurrence.CHOICES,
+                     width=14).pack(side=tk.LEFT, padx=6)
+
         # Add Ticket button with modern styling
         ttk.Button(self.input_frame, text="Add Ticket", command=self.add_ticket).pack(side=tk.LEFT, padx=12)
 
@@ -200,6 +2714,28 @@ class TicketApp:
                 font=(self.font_family, 11), relief='solid', borderwidth=1).pack(side=tk.LEFT, padx=12)
         ttk.Button(self.input_frame, text="Add Item", command=self.add_fridge_item).pack(side=tk.LEFT, padx=4)
 
+        # Selection and bulk action bar
+        self.bulk_frame = tk.Frame(root, bg=self.bg_color, padx=12)
+        self.bulk_frame.pack(fill=tk.X)
+        
+        self.select_var = tk.StringVar()
+        tk.Entry(self.bulk_frame, textvariable=self.select_var, width=20,
+                font=(self.font_family, 11), relief='solid', borderwidth=1).pack(side=tk.LEFT, padx=6)
+        ttk.Button(self.bulk_frame, text="Select Matching", command=self.select_matching).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.bulk_frame, text="Select Overdue", command=self.select_overdue).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self.bulk_frame, text="Select None", command=lambda: self.set_selection(())).pack(side=tk.LEFT, padx=4)
+        
+        ttk.Button(self.bulk_frame, text="Stop Repeating", command=self.stop_repeating).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.bulk_frame, text="Clear Waits", command=self.clear_waits).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.bulk_frame, text="Wait For Selected", command=self.wait_for_selected).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.bulk_frame, text="Delete", command=self.bulk_delete).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.bulk_frame, text="Complete", command=self.bulk_complete).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.bulk_frame, text="Resume", command=lambda: self.bulk_pause(False)).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(self.bulk_frame, text="Pause", command=lambda: self.bulk_pause(True)).pack(side=tk.RIGHT, padx=4)
+        self.selection_label = tk.Label(self.bulk_frame, text="", font=(self.font_family, 11),
+                                        bg=self.bg_color, fg=self.secondary_color)
+        self.selection_label.pack(side=tk.RIGHT, padx=12)
+
         # Ticket frame with modern styling
         self.ticket_frame = tk.LabelFrame(root, text="Tickets", 
                                         font=(self.font_family, 12, "bold"),
@@ -216,7 +2752,17 @@ class TicketApp:
         
         # Initialize database
         self.current_db = None
-        self.update_database_list()
+        if storage is not None:
+            self.show_storage(storage, "In memory")
+        else:
+            self.update_database_list()
+        
+        # Only tick while something is on screen; rows the window is too
+        # small to show are unmapped and skipped until they map again
+        root.bind('<Map>', self.on_map, add='+')
+        root.bind('<Unmap>', self.on_unmap, add='+')
+        root.bind('<Visibility>', self.on_visibility, add='+')
+        root.bind('<FocusIn>', self.on_map, add='+')
         self.update_ui()
 
     def clear_ui(self):
@@ -321,276 +2867,430 @@ class TicketApp:
             self.load_database(self.current_db)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Error opening database: {e}")
+            messagebox.showerror("Error", f"Error opening database: {e}")
+
+    def sync_database(self):
+        """Merge changes with another copy of the current database"""
+        try:
+            other_db = filedialog.askopenfilename(
+                filetypes=[("Database files", "*.db")],
+                title="Sync With Database"
+            )
+            if not other_db or not self.current_db:
+                return
+            if os.path.abspath(other_db) == os.path.abspath(self.current_db):
+                return
+                
+            received, sent = sync_databases(self.current_db, other_db, self.clock.now())
+            self.load_database(self.current_db)
+            messagebox.showinfo("Sync Complete", 
+                f"Received {received} changes, sent {sent} to {os.path.basename(other_db)}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error syncing database: {e}")
+
+    def switch_database(self, event=None):
+        """Switch to a different database"""
+        try:
+            new_db = self.db_var.get()
+            if new_db and new_db != self.current_db:
+                self.load_database(new_db)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error switching database: {e}")
+
+    def load_database(self, db_name):
+        """Load a database and update the UI"""
+        try:
+            if not db_name:
+                return
+                
+            # Connect to the new database, upgrading its schema if needed
+            self.clock.resync()
+            self.show_storage(SQLiteStorage(sqlite3.connect(db_name)), db_name)
+            self.current_db = db_name
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading database: {e}")
+            # Ensure we have a valid connection
+            if self.storage is None:
+                self.create_default_database()
+                self.storage = SQLiteStorage(sqlite3.connect("ticket_data.db"))
+                self.current_db = "ticket_data.db"
+                self.db_var.set("ticket_data.db")
+
+    def show_storage(self, storage, name):
+        """Switch to another storage and rebuild the UI from it"""
+        # Close existing storage if any
+        if self.storage is not None:
+            self.storage.close()
+        self.storage = storage
+        
+        # Clear existing UI
+        self.clear_ui()
+        self.selected = set()
+        self.select_anchor = None
+        self.attachment_meta = {}
+        self.thumbnails = {}
+        if self.report_window is not None:
+            self.report_window.destroy()
+            self.report_window = None
+        
+        # Load data, leaving out the rows that can't be parsed. Only rows
+        # changed since the last clean check are scanned, and archives
+        # aren't scanned at all; rows that fail to load are still caught as
+        # they are decoded, and Check Data scans everything on demand
+        self.report = LoadReport() if self.storage.read_only else self.storage.check_changed()
+        self.load_views()
+        self.set_tickets(self.load_tickets(self.view))
+        self.description_history = self.storage.descriptions()
+        self.fridge_items = self.load_fridge_items()
+        self.recurrences = self.storage.recurrences()
+        
+        # Update description combobox
+        self.desc_combo['values'] = self.description_history
+        
+        # Update UI
+        self.enable_editing(not self.storage.read_only)
+        self.build_ticket_ui()
+        self.build_fridge_ui()
+        
+        # Update window title
+        suffix = " (read-only)" if self.storage.read_only else ""
+        self.root.title(f"Ticket System - {name}{suffix}")
+        if self.timeline is not None:
+            self.timeline.load()
+        if self.report:
+            self.show_report()
+        
+        # Make the repeating tickets whose windows opened while the file was closed
+        self.check_recurrences()
+
+    def open_timeline(self):
+        """Show the deadline timeline, or bring it up to date if it's already open"""
+        try:
+            if self.timeline is None:
+                self.timeline = Timeline(self)
+            else:
+                self.timeline.window.lift()
+                self.timeline.load()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error opening timeline: {e}")
+
+    def browse_database(self, db_file=None):
+        """Open a database file read-only, without migrating or locking it"""
+        try:
+            db_file = db_file or filedialog.askopenfilename(
+                filetypes=[("Database files", "*.db")],
+                title="Browse Database (read-only)"
+            )
+            if not db_file:
+                return
+            self.show_storage(ArchiveStorage(db_file), os.path.basename(db_file))
+            self.current_db = None  # Picking any file from the list opens it normally
+            self.db_var.set("")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error browsing database: {e}")
+
+    def enable_editing(self, enabled):
+        """Enable or disable the inputs and bulk actions that write"""
+        state = tk.NORMAL if enabled else tk.DISABLED
+        for widget in (*self.input_frame.winfo_children(), *self.bulk_frame.winfo_children()):
+            for control in (widget, *widget.winfo_children()):
+                if isinstance(control, (tk.Entry, ttk.Entry, ttk.Button)):
+                    control.configure(state=state)
+
+    def load_views(self):
+        """Built-in views plus the ones saved in the current database"""
+        self.views = list(TicketView.BUILTIN) + self.storage.views()
+        self.view = next((v for v in self.views if v.name == self.view.name), self.views[0])
+        self.view_combo['values'] = [v.name for v in self.views]
+        self.view_var.set(self.view.name)
+
+    def switch_view(self, event=None):
+        """Reload only the tickets the chosen view matches"""
+        try:
+            self.view = next(v for v in self.views if v.name == self.view_var.get())
+            self.set_tickets(self.load_tickets(self.view))
+            self.selected = set()
+            self.select_anchor = None
+            self.update_selection_label()
+            self.build_ticket_ui()
+            self.refresh_labels()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error switching view: {e}")
+
+    def set_tickets(self, tickets):
+        """Index freshly loaded tickets by every sort key and list them in the chosen one"""
+        self.plan_tickets(tickets)
+        self.order = TicketOrder(tickets)
+        self.tickets = self.order.ordered(self.sort_var.get())
+        self.limit = TicketView.LIMIT
+        self.total = self.storage.count(self.view, self.clock.now())
+        self.update_page_label()
+
+    def plan_tickets(self, tickets):
+        schedules = self.storage.schedules([t.id for t in tickets])
+        for ticket in tickets:
+            if ticket.id in schedules:
+                ticket.plan(schedules[ticket.id])
+
+    def update_page_label(self):
+        shown = len(self.tickets)
+        self.page_label.configure(text=f"Showing {shown} of {self.total}" if self.total > shown
+                                  else f"{shown} tickets")
+        self.more_button.configure(state=tk.NORMAL if self.total > shown else tk.DISABLED)
+
+    def load_more(self):
+        """Load the view's next page under the rows already shown"""
+        try:
+            # Ask for a longer prefix rather than an offset, which tickets
+            # added or deleted since the last page would have shifted
+            self.limit += TicketView.LIMIT
+            rows = self.storage.tickets(self.view, self.clock.now(), self.limit)
+            fresh = self.decode_rows('ticket', [row for row in rows if row['id'] not in self.order.tickets],
+                                     self.ticket_from_row)
+            self.plan_tickets(fresh)
+            for ticket in fresh:
+                self.insert_ticket(ticket)
+            self.update_page_label()
+            self.refresh_labels()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading more tickets: {e}")
+
+    def switch_sort(self, event=None):
+        """Show the rows in another order without rebuilding them"""
+        try:
+            self.tickets = self.order.ordered(self.sort_var.get())
+            rows = {entry[1].id: entry for entry in self.ticket_labels}
+            self.ticket_labels = [rows[t.id] for t in self.tickets]
+            if not self.ticket_labels:
+                return
+            first = self.ticket_labels[0][2]
+            packed = self.ticket_frame.pack_slaves()
+            if packed and packed[0] is not first:
+                first.pack_configure(before=packed[0])
+            for above, below in zip(self.ticket_labels, self.ticket_labels[1:]):
+                below[2].pack_configure(after=above[2])
+        except Exception as e:
+            print(f"Error sorting tickets: {e}")
+
+    def move_ticket(self, ticket):
+        """Move a ticket whose state changed to its new place in the list and on screen"""
+        name = self.sort_var.get()
+        old = self.order.position(name, ticket)
+        self.order.update(ticket)
+        new = self.order.position(name, ticket)
+        if new == old:
+            return
+        self.tickets.insert(new, self.tickets.pop(old))
+        entry = self.ticket_labels.pop(old)
+        self.ticket_labels.insert(new, entry)
+        if new > 0:
+            entry[2].pack_configure(after=self.ticket_labels[new - 1][2])
+        else:
+            entry[2].pack_configure(before=self.ticket_labels[1][2])
+
+    def replan(self, ticket_ids):
+        """Recompute what waits for tickets whose timing changed"""
+        self.apply_plans(self.storage.reschedule(ticket_ids))
+
+    def apply_plans(self, changes):
+        """Move the loaded tickets whose schedule changed"""
+        for ticket_id, schedule in changes.items():
+            ticket = self.order.tickets.get(ticket_id)
+            if ticket is not None:
+                ticket.plan(schedule)
+                self.move_ticket(ticket)
+
+    def wait_for_selected(self):
+        """Make the last clicked ticket wait for the other selected tickets"""
+        changes = {}
+        try:
+            ticket = self.select_anchor
+            blocker_ids = self.selected - {ticket.id} if ticket in self.tickets else set()
+            if not blocker_ids:
+                messagebox.showinfo("Wait For Selected", "Click the ticket that waits, then ctrl-click what it waits for.")
+                return
+            for blocker_id in sorted(blocker_ids):
+                changes.update(self.storage.add_dependency(ticket.id, blocker_id))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))  # The ones added before the circle stay
+        except Exception as e:
+            messagebox.showerror("Error", f"Error adding waits: {e}")
+        self.apply_plans(changes)
+        self.refresh_labels()
 
-    def switch_database(self, event=None):
-        """Switch to a different database"""
+    def clear_waits(self):
+        """Stop the selected tickets waiting for anything"""
         try:
-            new_db = self.db_var.get()
-            if new_db and new_db != self.current_db:
-                self.load_database(new_db)
+            changes = {}
+            for ticket_id, blocker_id in self.storage.blockers(sorted(self.selected)):
+                changes.update(self.storage.remove_dependency(ticket_id, blocker_id))
+            self.apply_plans(changes)
+            self.refresh_labels()
         except Exception as e:
-            messagebox.showerror("Error", f"Error switching database: {e}")
+            messagebox.showerror("Error", f"Error clearing waits: {e}")
 
-    def load_database(self, db_name):
-        """Load a database and update the UI"""
+    def save_view(self):
+        """Save the current view narrowed by the selection filter text under a new name"""
         try:
-            if not db_name:
+            name = simpledialog.askstring("Save View", "View name:", parent=self.root)
+            if not name or not name.strip():
                 return
-                
-            # Close existing connection if any
-            if hasattr(self, 'conn'):
-                self.conn.close()
-            
-            # Connect to new database
-            self.conn = sqlite3.connect(db_name)
-            self.cursor = self.conn.cursor()
-            
-            # Setup database schema if needed
-            self.setup_database()
-            
-            # Clear existing UI
-            self.clear_ui()
-            
-            # Load data
-            self.tickets = self.load_tickets()
-            self.description_history = list({t.description for t in self.tickets})
-            self.fridge_items = self.load_fridge_items()
-            
-            # Update description combobox
-            self.desc_combo['values'] = self.description_history
-            
-            # Update UI
-            self.build_ticket_ui()
-            self.build_fridge_ui()
-            
-            # Update window title and current database
-            self.root.title(f"Ticket System - {db_name}")
-            self.current_db = db_name
-            
+            name = name.strip()
+            if any(v.builtin and v.name == name for v in self.views):
+                messagebox.showerror("Error", f"'{name}' is a built-in view")
+                return
+            spec = dict(self.view.spec)
+            search = self.select_var.get().strip()
+            if search:
+                spec['search'] = search
+            self.view = TicketView(name, spec, self.view.order)
+            self.storage.save_view(self.view)
+            self.load_views()
+            self.switch_view()
         except Exception as e:
-            messagebox.showerror("Error", f"Error loading database: {e}")
-            # Ensure we have a valid connection
-            if not hasattr(self, 'conn') or not self.conn:
-                self.create_default_database()
-                self.conn = sqlite3.connect("ticket_data.db")
-                self.cursor = self.conn.cursor()
-                self.setup_database()
-                self.current_db = "ticket_data.db"
-                self.db_var.set("ticket_data.db")
+            messagebox.showerror("Error", f"Error saving view: {e}")
+
+    def delete_view(self):
+        try:
+            if self.view.builtin:
+                return
+            self.storage.delete_view(self.view.name)
+            self.view = self.views[0]
+            self.load_views()
+            self.switch_view()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error deleting view: {e}")
 
     def setup_database_schema(self, cursor):
         """Setup the database schema for a new database"""
         cursor.execute('''CREATE TABLE IF NOT EXISTS tickets 
-            (title TEXT, description TEXT, created_at TEXT, due TEXT,
-             completed INTEGER DEFAULT 0, completed_time TEXT,
+            (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, description_id INTEGER REFERENCES descriptions(id),
+             created_at TEXT, due TEXT,
+             completed INTEGER DEFAULT 0, completed_time TEXT, completed_at TEXT,
              paused INTEGER DEFAULT 0, paused_at TEXT, frozen_remaining TEXT)''')
         cursor.execute('''CREATE TABLE IF NOT EXISTS fridge_items 
-            (name TEXT, added_at TEXT,
+            (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, added_at TEXT,
              paused INTEGER DEFAULT 0, paused_at TEXT, frozen_age TEXT)''')
+        Descriptions.setup_schema(cursor)
+        Journal.setup_schema(cursor)
 
     def __del__(self):
         """Ensure database connection is closed properly"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
-
-    def setup_database(self):
-        # Create tables if they don't exist
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS tickets 
-            (title TEXT, description TEXT, created_at TEXT, due TEXT)''')
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS fridge_items 
-            (name TEXT, added_at TEXT)''')
-        
-        # Check and add new columns one by one
-        try:
-            # Check for completed column
-            self.cursor.execute("SELECT completed FROM tickets LIMIT 1")
-        except sqlite3.OperationalError:
-            # Add completed columns
-            self.cursor.execute('ALTER TABLE tickets ADD COLUMN completed INTEGER DEFAULT 0')
-            self.cursor.execute('ALTER TABLE tickets ADD COLUMN completed_time TEXT')
-        
-        try:
-            # Check for paused column in tickets
-            self.cursor.execute("SELECT paused FROM tickets LIMIT 1")
-        except sqlite3.OperationalError:
-            # Add pause columns to tickets table
-            self.cursor.execute('ALTER TABLE tickets ADD COLUMN paused INTEGER DEFAULT 0')
-            self.cursor.execute('ALTER TABLE tickets ADD COLUMN paused_at TEXT')
-            self.cursor.execute('ALTER TABLE tickets ADD COLUMN frozen_remaining TEXT')
-        
-        try:
-            # Check for paused column in fridge_items
-            self.cursor.execute("SELECT paused FROM fridge_items LIMIT 1")
-        except sqlite3.OperationalError:
-            # Add pause columns to fridge_items table
-            self.cursor.execute('ALTER TABLE fridge_items ADD COLUMN paused INTEGER DEFAULT 0')
-            self.cursor.execute('ALTER TABLE fridge_items ADD COLUMN paused_at TEXT')
-            self.cursor.execute('ALTER TABLE fridge_items ADD COLUMN frozen_age TEXT')
-        
-        self.conn.commit()
+        if getattr(self, 'storage', None) is not None:
+            self.storage.close()
 
-    def load_tickets(self):
-        try:
-            # Try to load with all columns
-            self.cursor.execute("""
-                SELECT title, description, created_at, due, 
-                       COALESCE(paused, 0) as paused, 
-                       paused_at, 
-                       frozen_remaining,
-                       COALESCE(completed, 0) as completed, 
-                       completed_time 
-                FROM tickets
-                ORDER BY created_at DESC""")
-        except sqlite3.OperationalError:
-            # If new columns don't exist yet, load with basic columns
-            self.cursor.execute("SELECT title, description, created_at, due FROM tickets ORDER BY created_at DESC")
-            rows = self.cursor.fetchall()
-            tickets = []
-            for row in rows:
-                try:
-                    title, desc, created, due = row
-                    # Handle invalid datetime strings
-                    try:
-                        created_dt = datetime.fromisoformat(created) if created and created != '0' else datetime.now()
-                    except ValueError:
-                        created_dt = datetime.now()
-                    try:
-                        due_dt = datetime.fromisoformat(due) if due and due != '0' else (created_dt + timedelta(minutes=5))
-                    except ValueError:
-                        due_dt = created_dt + timedelta(minutes=5)
-                    
-                    ticket = Ticket(title, desc, created_dt, due_dt)
-                    tickets.append(ticket)
-                except Exception as e:
-                    print(f"Error loading ticket {row}: {e}")
-                    continue
-            return tickets
-        
-        rows = self.cursor.fetchall()
-        tickets = []
-        for row in rows:
-            try:
-                if len(row) == 9:  # New format with all columns
-                    title, desc, created, due, paused, paused_at, frozen_remaining, completed, completed_time = row
-                    
-                    # Handle invalid datetime strings
-                    try:
-                        created_dt = datetime.fromisoformat(created) if created and created != '0' else datetime.now()
-                    except ValueError:
-                        created_dt = datetime.now()
-                    try:
-                        due_dt = datetime.fromisoformat(due) if due and due != '0' else (created_dt + timedelta(minutes=5))
-                    except ValueError:
-                        due_dt = created_dt + timedelta(minutes=5)
-                    
-                    ticket = Ticket(title, desc, created_dt, due_dt)
-                    ticket.paused = bool(paused)
-                    
-                    if paused_at and paused_at != '0':
-                        try:
-                            ticket.paused_at = datetime.fromisoformat(paused_at)
-                        except ValueError:
-                            ticket.paused_at = None
-                    
-                    if frozen_remaining and frozen_remaining != '0':
-                        try:
-                            ticket.frozen_remaining = timedelta(seconds=float(frozen_remaining))
-                        except ValueError:
-                            ticket.frozen_remaining = None
-                    
-                    ticket.completed = bool(completed)
-                    ticket.completed_time = completed_time if completed_time and completed_time != '0' else None
-                else:  # Old format
-                    title, desc, created, due = row
-                    # Handle invalid datetime strings
-                    try:
-                        created_dt = datetime.fromisoformat(created) if created and created != '0' else datetime.now()
-                    except ValueError:
-                        created_dt = datetime.now()
-                    try:
-                        due_dt = datetime.fromisoformat(due) if due and due != '0' else (created_dt + timedelta(minutes=5))
-                    except ValueError:
-                        due_dt = created_dt + timedelta(minutes=5)
-                    
-                    ticket = Ticket(title, desc, created_dt, due_dt)
-                tickets.append(ticket)
-            except Exception as e:
-                print(f"Error loading ticket {row}: {e}")
-                continue
-        return tickets
+    def load_tickets(self, view=None):
+        rows = self.storage.tickets(view or TicketView.BUILTIN[0], self.clock.now())
+        return self.decode_rows('ticket', rows, self.ticket_from_row)
 
     def load_fridge_items(self):
+        return self.decode_rows('fridge', self.storage.fridge_items(), self.item_from_row)
+
+    def decode_rows(self, entity, rows, build):
+        """Build objects from rows, leaving out the ones the open-time check reported"""
+        skipped = self.report.skipped[entity]
         try:
-            # Try to load with all columns
-            self.cursor.execute("SELECT name, added_at, paused, paused_at, frozen_age FROM fridge_items")
-        except sqlite3.OperationalError:
-            # If new columns don't exist yet, load with basic columns
-            self.cursor.execute("SELECT name, added_at FROM fridge_items")
-            rows = self.cursor.fetchall()
-            items = []
+            return [build(row) for row in rows if row['id'] not in skipped]
+        except (TypeError, ValueError, OverflowError):
+            # Something the database's own check let through: look at every row this once
+            self.report.add(LoadReport.decode(entity, rows))
+            self.show_report()
+            built = []
             for row in rows:
-                try:
-                    name, added_at = row
-                    # Handle invalid datetime strings
-                    try:
-                        added_dt = datetime.fromisoformat(added_at) if added_at and added_at != '0' else datetime.now()
-                    except ValueError:
-                        added_dt = datetime.now()
-                    item = FridgeItem(name, added_dt)
-                    items.append(item)
-                except Exception as e:
-                    print(f"Error loading fridge item {row}: {e}")
+                if row['id'] in skipped:
                     continue
-            return items
-        
-        rows = self.cursor.fetchall()
-        items = []
-        for row in rows:
-            try:
-                if len(row) == 5:  # New format with all columns
-                    name, added_at, paused, paused_at, frozen_age = row
-                    
-                    # Handle invalid datetime strings
-                    try:
-                        added_dt = datetime.fromisoformat(added_at) if added_at and added_at != '0' else datetime.now()
-                    except ValueError:
-                        added_dt = datetime.now()
-                    
-                    item = FridgeItem(name, added_dt)
-                    item.paused = bool(paused)
-                    
-                    if paused_at and paused_at != '0':
-                        try:
-                            item.paused_at = datetime.fromisoformat(paused_at)
-                        except ValueError:
-                            item.paused_at = None
-                    
-                    if frozen_age and frozen_age != '0':
-                        try:
-                            item.frozen_age = timedelta(seconds=float(frozen_age))
-                        except ValueError:
-                            item.frozen_age = None
-                else:  # Old format
-                    name, added_at = row
-                    # Handle invalid datetime strings
-                    try:
-                        added_dt = datetime.fromisoformat(added_at) if added_at and added_at != '0' else datetime.now()
-                    except ValueError:
-                        added_dt = datetime.now()
-                    item = FridgeItem(name, added_dt)
-                items.append(item)
-            except Exception as e:
-                print(f"Error loading fridge item {row}: {e}")
-                continue
-        return items
+                try:
+                    built.append(build(row))
+                except (TypeError, ValueError, OverflowError) as e:
+                    print(f"Error loading {entity} {row['id']}: {e}")  # Still unreadable; leave it out
+            return built
+
+    @staticmethod
+    def when(value):
+        return datetime.fromisoformat(value) if value not in LoadReport.UNSET else None
+
+    @classmethod
+    def ticket_from_row(cls, row):
+        ticket = Ticket(row['title'], row['description'], datetime.fromisoformat(row['created_at']),
+                        datetime.fromisoformat(row['due']))
+        ticket.id = row['id']
+        ticket.paused = bool(row['paused'])
+        ticket.paused_at = cls.when(row['paused_at'])
+        if row['frozen_remaining'] not in LoadReport.UNSET:
+            ticket.frozen_remaining = timedelta(seconds=float(row['frozen_remaining']))
+        ticket.completed = bool(row['completed'])
+        completed_time = row['completed_time']
+        ticket.completed_time = completed_time if completed_time and completed_time != '0' else None
+        ticket.completed_at = cls.when(row['completed_at'])
+        return ticket
+
+    @classmethod
+    def item_from_row(cls, row):
+        item = FridgeItem(row['name'], datetime.fromisoformat(row['added_at']))
+        item.id = row['id']
+        item.paused = bool(row['paused'])
+        item.paused_at = cls.when(row['paused_at'])
+        if row['frozen_age'] not in LoadReport.UNSET:
+            item.frozen_age = timedelta(seconds=float(row['frozen_age']))
+        return item
+
+    def check_data(self):
+        """Look for rows that can't be loaded and show what was found"""
+        try:
+            report = self.storage.check()
+            if not report:
+                messagebox.showinfo("Check Data", "Every row loads.")
+                return
+            self.report.add(report.problems)
+            self.show_report()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error checking data: {e}")
+
+    def show_report(self):
+        """List the rows that couldn't be loaded and offer to repair them"""
+        try:
+            if self.report_window is not None and self.report_window.winfo_exists():
+                self.report_window.destroy()
+            window = self.report_window = tk.Toplevel(self.root)
+            window.title(f"{len(self.report)} rows couldn't be loaded")
+            buttons = tk.Frame(window)
+            buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=6)
+            repair = ttk.Button(buttons, text="Repair All", command=self.repair_rows)
+            repair.pack(side=tk.RIGHT, padx=6)
+            if self.storage.read_only:
+                repair.configure(state=tk.DISABLED)
+            ttk.Button(buttons, text="Close", command=window.destroy).pack(side=tk.RIGHT, padx=6)
+            listbox = tk.Listbox(window, width=90, height=16, font=(self.font_family, 11))
+            scrollbar = tk.Scrollbar(window, command=listbox.yview)
+            listbox.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            for line in self.report.lines():
+                listbox.insert(tk.END, line)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error showing rows that couldn't be loaded: {e}")
+
+    def repair_rows(self):
+        """Write fallback values into every reported row in one transaction, then show them"""
+        try:
+            self.storage.repair(self.report, self.clock.now())
+            self.report = LoadReport()
+            if self.report_window is not None:
+                self.report_window.destroy()
+                self.report_window = None
+            self.set_tickets(self.load_tickets(self.view))
+            self.fridge_items = self.load_fridge_items()
+            self.build_ticket_ui()
+            self.build_fridge_ui()
+            self.refresh_labels()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error repairing rows: {e}")
 
     def add_ticket(self):
         try:
             desc = self.desc_var.get().strip() or "No Description"
-            if desc not in self.description_history:
-                self.description_history.append(desc)
-                self.desc_combo['values'] = self.description_history  # Update combobox values
 
             try:
                 days = int(self.day_var.get())
@@ -600,38 +3300,42 @@ class TicketApp:
             except ValueError:
                 days, hours, minutes, seconds = 0, 0, 5, 0
 
-            created_at = datetime.now()
+            try:
+                rule = Recurrence.parse(self.repeat_var.get())
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+
+            created_at = self.clock.now()
             due = created_at + timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
             title = f"Ticket #{len(self.tickets)+1}"
 
-            # Create ticket object
-            ticket = Ticket(title, desc, created_at, due)
+            # Create ticket object; equal descriptions share one string
+            ticket = Ticket(title, sys.intern(desc), created_at, due)
             
-            # Save to database first
+            # Save to storage first; new tickets start neither paused nor completed
+            fields = {'title': title, 'description': ticket.description,
+                      'created_at': created_at.isoformat(), 'due': due.isoformat()}
             try:
-                self.cursor.execute("INSERT INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", 
-                    (title, desc, created_at.isoformat(), due.isoformat(), 
-                     0, None, None, 0, None))  # Initial state: not paused, not completed
-                self.conn.commit()
-            except sqlite3.Error as e:
+                if rule is None:
+                    ticket.id = self.storage.insert('ticket', fields, created_at)
+                else:
+                    # The first occurrence; each later one appears as much
+                    # ahead of its due time as this countdown is long
+                    recurrence = Recurrence(ticket.description, rule, due, due - created_at)
+                    self.storage.save_recurrence(recurrence)
+                    ticket.id = self.storage.add_occurrence(recurrence, fields, created_at)
+                    self.recurrences.append(recurrence)
+                    self.schedule_recurrences()
+            except Exception as e:
                 print(f"Error saving ticket to database: {e}")
-                self.conn.rollback()
                 return
 
             # Only add to memory if database save was successful
-            self.tickets.append(ticket)
-            
-            # Clear existing UI
-            self.clear_ui()
-            
-            # Rebuild UI with new ticket
-            self.build_ticket_ui()
-            self.build_fridge_ui()
-            
-            # Force an immediate UI update
-            self.update_ui()
+            self.show_new_ticket(ticket)
 
             # Clear input fields
+            self.repeat_var.set(Recurrence.CHOICES[0])
             self.desc_var.set("")
             self.day_var.set("0")
             self.hour_var.set("0")
@@ -640,7 +3344,94 @@ class TicketApp:
 
         except Exception as e:
             print(f"Error adding ticket: {e}")
-            self.conn.rollback()
+
+    def show_new_ticket(self, ticket):
+        """Add a just-saved ticket to the list and the screen"""
+        # Most recently used descriptions come first in the combobox
+        if self.description_history[:1] != [ticket.description]:
+            self.description_history = [ticket.description, *(
+                d for d in self.description_history if d != ticket.description)]
+            self.desc_combo['values'] = self.description_history
+
+        # Filtered views only show the new ticket if it belongs in them
+        row = {'completed': int(ticket.completed), 'paused': int(ticket.paused), 'due': ticket.due.isoformat(),
+               'completed_at': None, 'description': ticket.description}
+        if not self.view.matches(row, self.clock.now()):
+            return
+        self.total += 1
+        self.insert_ticket(ticket)
+        self.update_page_label()
+        self.refresh_labels()
+
+    def insert_ticket(self, ticket):
+        """Put a ticket in its place in the list and add its row on screen"""
+        self.order.add(ticket)
+        index = self.order.position(self.sort_var.get(), ticket)
+        self.tickets.insert(index, ticket)
+        self.build_ticket_row(ticket, index)
+
+    def check_recurrences(self, completed=()):
+        """Make the next ticket of each recurrence whose latest ticket was
+        just completed or whose next window has opened"""
+        try:
+            now = self.clock.now()
+            for recurrence in self.recurrences:
+                if recurrence.ticket_id not in completed and recurrence.opens_at() > now:
+                    continue
+                due = recurrence.next_due(now)
+                title = f"Ticket #{len(self.tickets)+1} ↻"
+                ticket = Ticket(title, sys.intern(recurrence.description), now, due)
+                ticket.id = self.storage.add_occurrence(recurrence, {
+                    'title': title, 'description': ticket.description,
+                    'created_at': now.isoformat(), 'due': due.isoformat()}, now)
+                self.show_new_ticket(ticket)
+        except Exception as e:
+            print(f"Error adding repeating tickets: {e}")
+        self.schedule_recurrences()
+
+    def schedule_recurrences(self):
+        """Wake up when the next recurrence's window opens"""
+        if self.recurrence_job is not None:
+            self.root.after_cancel(self.recurrence_job)
+            self.recurrence_job = None
+        if not self.recurrences:
+            return
+        wait = (min(r.opens_at() for r in self.recurrences) - self.clock.now()).total_seconds()
+        # Check at least hourly in case the system clock jumps
+        self.recurrence_job = self.root.after(int(min(max(wait, 0), 3600) * 1000) + 1, self.check_recurrences)
+
+    def stop_repeating(self):
+        """Stop the selected tickets from coming back; the tickets themselves stay"""
+        try:
+            stopped = [r for r in self.recurrences if r.ticket_id in self.selected]
+            for recurrence in stopped:
+                self.storage.delete_recurrence(recurrence.id)
+            self.recurrences = [r for r in self.recurrences if r not in stopped]
+            self.schedule_recurrences()
+        except Exception as e:
+            print(f"Error stopping repeating tickets: {e}")
+
+    def show_upcoming(self, days=30):
+        """List open tickets and future occurrences of repeating ones due in the next `days`"""
+        try:
+            now = self.clock.now()
+            until = now + timedelta(days=days)
+            stored = ((datetime.fromisoformat(deadline), row['description'] or "")
+                      for deadline, row in self.storage.upcoming(now, until))
+            projected = ((due, f"{r.description}  ({r.describe()})")
+                         for due, r in Recurrence.upcoming(self.recurrences, now, until))
+            
+            window = tk.Toplevel(self.root)
+            window.title(f"Due in the next {days} days")
+            listbox = tk.Listbox(window, width=60, height=24, font=(self.font_family, 11))
+            scrollbar = tk.Scrollbar(window, command=listbox.yview)
+            listbox.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            for due, text in heapq.merge(stored, projected, key=lambda entry: entry[0]):
+                listbox.insert(tk.END, f"{due:%a %b %d %H:%M}   {text}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error listing upcoming tickets: {e}")
 
     def add_fridge_item(self):
         try:
@@ -648,29 +3439,27 @@ class TicketApp:
             if not name:
                 return
 
-            added_at = datetime.now()
+            added_at = self.clock.now()
             
-            # Save to database first
+            # Save to storage first
             try:
-                self.cursor.execute("INSERT INTO fridge_items VALUES (?, ?, ?, ?, ?)", 
-                    (name, added_at.isoformat(), 0, None, None))  # Initial pause state
-                self.conn.commit()
-            except sqlite3.Error as e:
+                item_id = self.storage.insert('fridge', {'name': name, 'added_at': added_at.isoformat()}, added_at)
+            except Exception as e:
                 print(f"Error saving fridge item to database: {e}")
-                self.conn.rollback()
                 return
 
             # Only add to memory if database save was successful
             item = FridgeItem(name, added_at)
+            item.id = item_id
             self.fridge_items.append(item)
-            self.build_fridge_ui()  # Rebuild UI to include new item with proper styling
+            self.build_fridge_row(item)
+            self.refresh_labels()
 
             # Clear input field
             self.fridge_var.set("")
 
         except Exception as e:
             print(f"Error adding fridge item: {e}")
-            self.conn.rollback()
 
     def create_mac_button(self, parent, text, color_type, command):
         """Create a Mac-style button with proper effects"""
@@ -702,6 +3491,8 @@ class TicketApp:
         btn.bind('<Leave>', on_leave)
         btn.bind('<ButtonPress-1>', on_press)
         btn.bind('<ButtonRelease-1>', on_release)
+        if self.storage is not None and self.storage.read_only:
+            btn.configure(state=tk.DISABLED)  # Every row button writes
         
         return btn
 
@@ -712,54 +3503,253 @@ class TicketApp:
         self.ticket_labels = []
         
         # Build UI for all tickets
-        for i, ticket in enumerate(self.tickets):
-            # Create a frame with modern styling
-            frame = tk.Frame(self.ticket_frame, 
-                           bg=self.bg_color,
-                           highlightbackground=self.border_color,
-                           highlightthickness=1,
-                           padx=14, pady=10)
+        for ticket in self.tickets:
+            self.build_ticket_row(ticket)
+
+    # Row cells as (name, width in characters). Every cell has a fixed size,
+    # so changing its text never asks the packer for a new layout.
+    TICKET_COLUMNS = (('title', 20), ('status', 18), ('time', 12), ('description', 36))
+    FRIDGE_COLUMNS = (('name', 20), ('status', 9), ('time', 12), ('added', 26))
+
+    def build_cells(self, parent, columns):
+        cells = []
+        for name, width in columns:
+            cell = tk.Label(parent, anchor='w', width=width,
+                            bg=self.bg_color, fg=self.text_color,
+                            font=self.time_font if name == 'time' else self.row_font)
+            cell.pack(side=tk.LEFT)
+            cells.append(cell)
+        return tuple(cells)
+
+    def elide(self, text, width):
+        """Cut text to fit `width` characters of row_font, ending in an ellipsis"""
+        key = (text, width)
+        if key in self.elided:
+            return self.elided[key]
+        limit = width * self.zero_width
+        widths = self.char_widths
+        for ch in text + '…':
+            if ch not in widths:
+                widths[ch] = self.row_font.measure(ch)
+        ellipsis, used, cut = widths['…'], 0, 0
+        for i, ch in enumerate(text):
+            if used + ellipsis <= limit:
+                cut = i
+            used += widths[ch]
+            if used > limit:
+                break
+        fitted = text if used <= limit else text[:cut] + '…'
+        if len(self.elided) > 20000:
+            self.elided.clear()  # Titles are unique per ticket; don't grow forever
+        self.elided[key] = fitted
+        return fitted
+
+    def fit_cells(self, values, columns):
+        return tuple(value if name == 'time' else self.elide(value, width)
+                     for value, (name, width) in zip(values, columns))
+
+    def build_ticket_row(self, ticket, index=None):
+        """Add one ticket row to the ticket frame, at the end or above row `index`"""
+        # Create a frame with modern styling
+        frame = tk.Frame(self.ticket_frame, 
+                       bg=self.bg_color,
+                       highlightbackground=self.border_color,
+                       highlightthickness=1,
+                       padx=14, pady=10)
+        if index is None or index >= len(self.ticket_labels):
+            index = len(self.ticket_labels)
             frame.pack(fill=tk.X, pady=5, padx=8)
-            
-            # Create a container for the label
-            label_container = tk.Frame(frame, bg=self.bg_color)
-            label_container.pack(side=tk.LEFT, expand=True, fill=tk.X)
-            
-            lbl = tk.Label(label_container, 
-                         anchor='w',
-                         bg=self.bg_color,
-                         font=(self.font_family, 11),
-                         fg=self.text_color)
-            lbl.pack(side=tk.LEFT, expand=True, fill=tk.X)
-            
-            # Style the buttons with modern appearance
-            button_frame = tk.Frame(frame, bg=self.bg_color)
-            button_frame.pack(side=tk.RIGHT, padx=(10, 0))
-            
-            # Create Mac-style buttons
-            complete_btn = self.create_mac_button(
-                button_frame, "✔", 
-                'success' if not ticket.completed else 'accent',
-                lambda i=i: self.complete_ticket(i)
-            )
-            complete_btn.pack(side=tk.LEFT, padx=4)
-            
-            delete_btn = self.create_mac_button(
-                button_frame, "✕",
-                'danger',
-                lambda i=i: self.delete_ticket(i)
-            )
-            delete_btn.pack(side=tk.LEFT, padx=4)
-            
-            pause_text = "⏸" if not ticket.paused else "▶"
-            pause_btn = self.create_mac_button(
-                button_frame, pause_text,
-                'accent',
-                lambda i=i: self.toggle_ticket_pause(i)
-            )
-            pause_btn.pack(side=tk.LEFT, padx=4)
-            
-            self.ticket_labels.append((lbl, ticket, frame, complete_btn, pause_btn))
+        else:
+            frame.pack(fill=tk.X, pady=5, padx=8, before=self.ticket_labels[index][2])
+        
+        # Create a container for the fixed-width cells
+        label_container = tk.Frame(frame, bg=self.bg_color)
+        label_container.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        cells = self.build_cells(label_container, self.TICKET_COLUMNS)
+        
+        # Click, ctrl/cmd-click and shift-click select rows for bulk actions
+        for widget in (frame, label_container, *cells):
+            widget.bind('<Button-1>', lambda e, t=ticket: self.select_ticket(t))
+            widget.bind(f'<{self.toggle_modifier}-Button-1>', lambda e, t=ticket: self.select_ticket(t, toggle=True))
+            widget.bind('<Shift-Button-1>', lambda e, t=ticket: self.select_ticket(t, extend=True))
+        if ticket.id in self.selected:
+            frame.configure(highlightbackground=self.accent_color)
+        
+        # Style the buttons with modern appearance
+        button_frame = tk.Frame(frame, bg=self.bg_color)
+        button_frame.pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Buttons look the ticket up when clicked, so rows survive
+        # deletes above them without a rebuild
+        complete_btn = self.create_mac_button(
+            button_frame, "✔", 
+            'success' if not ticket.completed else 'accent',
+            lambda t=ticket: self.complete_ticket(self.tickets.index(t))
+        )
+        complete_btn.pack(side=tk.LEFT, padx=4)
+        
+        delete_btn = self.create_mac_button(
+            button_frame, "✕",
+            'danger',
+            lambda t=ticket: self.delete_ticket(self.tickets.index(t))
+        )
+        delete_btn.pack(side=tk.LEFT, padx=4)
+        
+        pause_text = "⏸" if not ticket.paused else "▶"
+        pause_btn = self.create_mac_button(
+            button_frame, pause_text,
+            'accent',
+            lambda t=ticket: self.toggle_ticket_pause(self.tickets.index(t))
+        )
+        pause_btn.pack(side=tk.LEFT, padx=4)
+        
+        # Attachments are only read when the row is expanded
+        details_btn = self.create_mac_button(button_frame, "▸", 'accent', None)
+        details_btn.configure(command=lambda: self.toggle_details(ticket, frame, details_btn), state=tk.NORMAL)
+        details_btn.pack(side=tk.LEFT, padx=4)
+        
+        self.ticket_labels.insert(index, (cells, ticket, frame, complete_btn, pause_btn))
+
+    # Thumbnails are made when a file is attached, from images Tk can read
+    # on its own, and only from files small enough to decode at once
+    THUMBNAIL_TYPES = ('image/png', 'image/gif')
+    THUMBNAIL_MAX_BYTES = 8 << 20
+    THUMBNAIL_PX = 64
+
+    def toggle_details(self, ticket, frame, button):
+        """Show or hide a row's attachments, reading them only the first time"""
+        try:
+            panel = self.expanded.pop(frame, None)
+            if panel is not None:
+                panel.destroy()
+                button.configure(text="▸")
+                return
+            panel = tk.Frame(frame, bg=self.bg_color)
+            # Below the cells and buttons, which were packed first
+            panel.pack(side=tk.BOTTOM, fill=tk.X, pady=(8, 0), before=frame.pack_slaves()[0])
+            self.expanded[frame] = panel
+            button.configure(text="▾")
+            self.fill_details(ticket, panel)
+        except Exception as e:
+            print(f"Error showing attachments: {e}")
+
+    def fill_details(self, ticket, panel):
+        for child in panel.winfo_children():
+            child.destroy()
+        if ticket.id not in self.attachment_meta:
+            self.attachment_meta[ticket.id] = self.storage.attachments(ticket.id)
+        writable = tk.DISABLED if self.storage.read_only else tk.NORMAL
+        label_style = {'bg': self.bg_color, 'fg': self.text_color, 'font': self.row_font, 'anchor': 'w'}
+        
+        for meta in self.attachment_meta[ticket.id]:
+            line = tk.Frame(panel, bg=self.bg_color)
+            line.pack(fill=tk.X, pady=2)
+            image = self.thumbnail(meta)
+            if image is not None:
+                tk.Label(line, image=image, bg=self.bg_color).pack(side=tk.LEFT, padx=(0, 8))
+            if meta['mime'] == 'text/plain' and meta['summary'] is not None:
+                text = meta['summary']
+            else:
+                text = f"{meta['name']}  ({self.size_text(meta['size'])})"
+            tk.Label(line, text=self.elide(text, 60), **label_style).pack(side=tk.LEFT)
+            ttk.Button(line, text="✕", width=3, state=writable,
+                       command=lambda m=meta: self.remove_attachment(ticket, panel, m)).pack(side=tk.RIGHT, padx=4)
+            ttk.Button(line, text="Open" if meta['mime'] == 'text/plain' else "Save As…",
+                       command=lambda m=meta: self.open_attachment(m)).pack(side=tk.RIGHT, padx=4)
+        
+        actions = tk.Frame(panel, bg=self.bg_color)
+        actions.pack(fill=tk.X, pady=(4, 0))
+        ttk.Button(actions, text="Attach File…", state=writable,
+                   command=lambda: self.attach_file(ticket, panel)).pack(side=tk.LEFT, padx=4)
+        ttk.Button(actions, text="Add Note…", state=writable,
+                   command=lambda: self.add_note(ticket, panel)).pack(side=tk.LEFT, padx=4)
+
+    def thumbnail(self, meta):
+        """The attachment's thumbnail as a PhotoImage, decoded once"""
+        if meta['thumbnail'] is None:
+            return None
+        if meta['id'] not in self.thumbnails:
+            try:
+                self.thumbnails[meta['id']] = tk.PhotoImage(data=meta['thumbnail'])
+            except tk.TclError:
+                self.thumbnails[meta['id']] = None
+        return self.thumbnails[meta['id']]
+
+    def make_thumbnail(self, path, mime, size):
+        """PNG data of a small copy of an image file, or None"""
+        if mime not in self.THUMBNAIL_TYPES or size > self.THUMBNAIL_MAX_BYTES:
+            return None
+        try:
+            image = tk.PhotoImage(file=path)
+            factor = max(1, math.ceil(max(image.width(), image.height()) / self.THUMBNAIL_PX))
+            small = image.subsample(factor)
+            return small.tk.call(small, 'data', '-format', 'png')
+        except tk.TclError:
+            return None
+
+    @staticmethod
+    def size_text(size):
+        for unit in ("bytes", "KB", "MB"):
+            if size < 1024 or unit == "MB":
+                return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+            size /= 1024
+
+    def attach_file(self, ticket, panel):
+        try:
+            path = filedialog.askopenfilename(title="Attach File")
+            if not path:
+                return
+            mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            with open(path, 'rb') as source:
+                size = os.fstat(source.fileno()).st_size
+                meta = {'name': os.path.basename(path), 'mime': mime, 'added_at': self.clock.now().isoformat(),
+                        'thumbnail': self.make_thumbnail(path, mime, size)}
+                self.storage.attach(ticket.id, meta, source, size)
+            self.attachment_meta.pop(ticket.id, None)
+            self.fill_details(ticket, panel)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error attaching file: {e}")
+
+    def add_note(self, ticket, panel):
+        try:
+            note = simpledialog.askstring("Add Note", "Note:", parent=self.root)
+            if not note or not note.strip():
+                return
+            data = note.strip().encode('utf-8')
+            meta = {'name': "Note", 'mime': 'text/plain', 'added_at': self.clock.now().isoformat(),
+                    'summary': note.strip().splitlines()[0][:200]}
+            self.storage.attach(ticket.id, meta, io.BytesIO(data), len(data))
+            self.attachment_meta.pop(ticket.id, None)
+            self.fill_details(ticket, panel)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error adding note: {e}")
+
+    def open_attachment(self, meta):
+        """Show a note, or stream a file out to where the user picks"""
+        try:
+            if meta['mime'] == 'text/plain':
+                text = io.BytesIO()
+                self.storage.read_attachment(meta['id'], text)
+                messagebox.showinfo(meta['name'], text.getvalue().decode('utf-8', errors='replace'))
+                return
+            path = filedialog.asksaveasfilename(title="Save Attachment", initialfile=meta['name'])
+            if not path:
+                return
+            with open(path, 'wb') as sink:
+                self.storage.read_attachment(meta['id'], sink)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error opening attachment: {e}")
+
+    def remove_attachment(self, ticket, panel, meta):
+        try:
+            if not messagebox.askyesno("Remove Attachment", f"Remove {meta['name']}?"):
+                return
+            self.storage.delete_attachment(meta['id'])
+            self.attachment_meta.pop(ticket.id, None)
+            self.thumbnails.pop(meta['id'], None)
+            self.fill_details(ticket, panel)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error removing attachment: {e}")
 
     def toggle_ticket_pause(self, index):
         try:
@@ -767,27 +3757,10 @@ class TicketApp:
                 return  # Prevent toggle if no tickets or invalid index
                 
             ticket = self.tickets[index]
-            now = datetime.now()
-            if not ticket.paused:
-                # Pausing
-                ticket.paused_at = now
-                ticket.frozen_remaining = ticket.due - now
-            else:
-                # Unpausing
-                if ticket.paused_at:
-                    pause_duration = now - ticket.paused_at
-                    ticket.due += pause_duration
-                    ticket.paused_at = None
-                    ticket.frozen_remaining = None
-            ticket.paused = not ticket.paused
+            fields, event = self.flip_pause_state(ticket, self.clock.now())
 
             # Update database
-            self.cursor.execute("UPDATE tickets SET paused = ?, paused_at = ?, frozen_remaining = ? WHERE title = ?",
-                (int(ticket.paused), 
-                 ticket.paused_at.isoformat() if ticket.paused_at else None,
-                 str(ticket.frozen_remaining.total_seconds()) if ticket.frozen_remaining else None,
-                 ticket.title))
-            self.conn.commit()
+            self.storage.update('ticket', ticket.id, fields, event)
 
             # Update only the pause button state with proper Mac colors
             if index < len(self.ticket_labels):
@@ -796,10 +3769,186 @@ class TicketApp:
                     pause_btn.configure(text="▶", bg=self.mac_button_colors['accent']['normal'])
                 else:
                     pause_btn.configure(text="⏸", bg=self.mac_button_colors['accent']['normal'])
+            self.move_ticket(ticket)
+            self.replan([ticket.id])
+            self.refresh_labels()
 
         except Exception as e:
             print(f"Error toggling ticket pause: {e}")
-            self.conn.rollback()
+
+    def flip_pause_state(self, ticket, now):
+        """Pause or resume a ticket in memory; returns its changed fields and journal event"""
+        if not ticket.paused:
+            # Pausing
+            ticket.paused_at = now
+            ticket.frozen_remaining = ticket.due - now
+        else:
+            # Unpausing
+            if ticket.paused_at:
+                pause_duration = now - ticket.paused_at
+                ticket.due += pause_duration
+                ticket.paused_at = None
+                ticket.frozen_remaining = None
+        ticket.paused = not ticket.paused
+
+        paused_at = ticket.paused_at.isoformat() if ticket.paused_at else None
+        frozen_remaining = str(ticket.frozen_remaining.total_seconds()) if ticket.frozen_remaining else None
+        fields = {'paused': int(ticket.paused), 'paused_at': paused_at,
+                  'frozen_remaining': frozen_remaining, 'due': ticket.due.isoformat()}
+        if ticket.paused:
+            event = ('ticket', ticket.id, 'paused', now,
+                     {'paused_at': paused_at, 'frozen_remaining': frozen_remaining})
+        else:
+            event = ('ticket', ticket.id, 'resumed', now, {'due': ticket.due.isoformat()})
+        return fields, event
+
+    def mark_completed(self, ticket, now):
+        """Complete a ticket in memory; returns its changed fields and journal event"""
+        ticket.completed = True
+        ticket.completed_time = now.strftime('%H:%M:%S')
+        ticket.completed_at = now
+        ticket.title += f" [Done @ {ticket.completed_time}]"
+        fields = {'completed': 1, 'completed_time': ticket.completed_time, 'completed_at': now.isoformat()}
+        event = ('ticket', ticket.id, 'completed', now,
+                 {'completed_time': ticket.completed_time, 'completed_at': now.isoformat()})
+        return fields, event
+
+    def select_ticket(self, ticket, toggle=False, extend=False):
+        """Click selects one row, ctrl/cmd-click toggles, shift-click extends"""
+        if extend and self.select_anchor in self.tickets:
+            # Everything between the anchor and this row
+            start, end = sorted((self.tickets.index(self.select_anchor), self.tickets.index(ticket)))
+            self.set_selection(t.id for t in self.tickets[start:end + 1])
+            return
+        if toggle:
+            self.set_selection(self.selected ^ {ticket.id})
+        else:
+            self.set_selection((ticket.id,))
+        self.select_anchor = ticket
+
+    def select_overdue(self):
+        self.select_where({'overdue': True})
+
+    def select_matching(self):
+        """Select tickets whose description contains the filter text"""
+        self.select_where({'search': self.select_var.get().strip()})
+
+    def select_where(self, spec):
+        """Select every ticket in the view that also matches `spec`, loaded or not"""
+        try:
+            now = self.clock.now()
+            if set(spec) & set(self.view.spec):
+                ids = set(self.storage.ticket_ids(self.view, now))
+                ids &= set(self.storage.ticket_ids(TicketView("", spec), now))
+            else:
+                ids = set(self.storage.ticket_ids(TicketView("", {**self.view.spec, **spec}), now))
+            self.set_selection(ids - self.report.skipped['ticket'])
+        except Exception as e:
+            print(f"Error selecting tickets: {e}")
+
+    def selected_tickets(self):
+        """The selected tickets, reading the ones the view hasn't loaded from storage"""
+        loaded = [t for t in self.tickets if t.id in self.selected]
+        missing = self.selected - {t.id for t in loaded}
+        if not missing:
+            return loaded
+        rows = self.storage.ticket_rows(sorted(missing))
+        return loaded + self.decode_rows('ticket', rows, self.ticket_from_row)
+
+    def set_selection(self, ids):
+        """Replace the selection, repainting only rows whose state changed"""
+        ids = set(ids)
+        changed = self.selected ^ ids
+        self.selected = ids
+        for _, ticket, frame, _, _ in self.ticket_labels:
+            if ticket.id in changed:
+                frame.configure(highlightbackground=self.accent_color if ticket.id in ids else self.border_color)
+        self.update_selection_label()
+
+    def update_selection_label(self):
+        self.selection_label.configure(text=f"{len(self.selected)} selected" if self.selected else "")
+
+    def bulk_pause(self, pause):
+        """Pause (or resume) every selected ticket in one transaction"""
+        try:
+            now = self.clock.now()
+            changes, events = [], []
+            for ticket in self.selected_tickets():
+                if ticket.paused != pause and not ticket.completed:
+                    fields, event = self.flip_pause_state(ticket, now)
+                    changes.append((ticket.id, fields))
+                    events.append(event)
+            if not changes:
+                return
+            
+            self.storage.update_many('ticket', changes, events)
+            changed = {ticket_id for ticket_id, _ in changes}
+            for ticket in [t for t in self.tickets if t.id in changed]:
+                self.move_ticket(ticket)
+            self.replan(changed)
+            self.refresh_labels()
+            
+        except Exception as e:
+            print(f"Error pausing tickets: {e}")
+
+    def bulk_complete(self):
+        """Complete every selected ticket in one transaction"""
+        try:
+            now = self.clock.now()
+            changes, events = [], []
+            for ticket in self.selected_tickets():
+                if not ticket.completed:
+                    fields, event = self.mark_completed(ticket, now)
+                    changes.append((ticket.id, fields))
+                    events.append(event)
+            if not changes:
+                return
+            
+            self.storage.update_many('ticket', changes, events)
+            changed = {ticket_id for ticket_id, _ in changes}
+            for ticket in [t for t in self.tickets if t.id in changed]:
+                self.move_ticket(ticket)
+            self.replan(changed)
+            self.refresh_labels()
+            self.check_recurrences(changed)
+            
+        except Exception as e:
+            print(f"Error completing tickets: {e}")
+
+    def bulk_delete(self):
+        """Delete every selected ticket in one transaction"""
+        try:
+            doomed = set(self.selected)
+            if not doomed:
+                return
+            if len(doomed) > 1 and not messagebox.askyesno("Confirm Delete", f"Delete {len(doomed)} tickets?"):
+                return
+            
+            waiting = {t for _, t in self.storage.dependents(doomed)} - doomed
+            self.storage.delete_many('ticket', sorted(doomed), self.clock.now())
+            
+            # Drop the rows from memory and screen in a single pass
+            kept = []
+            for entry in self.ticket_labels:
+                if entry[1].id in doomed:
+                    entry[2].destroy()
+                else:
+                    kept.append(entry)
+            self.ticket_labels = kept
+            for ticket in self.tickets:
+                if ticket.id in doomed:
+                    self.order.remove(ticket)
+                    self.attachment_meta.pop(ticket.id, None)
+            self.tickets = [t for t in self.tickets if t.id not in doomed]
+            self.selected = set()
+            self.total = self.storage.count(self.view, self.clock.now())
+            self.update_selection_label()
+            self.update_page_label()
+            self.replan(waiting)
+            self.refresh_labels()
+            
+        except Exception as e:
+            print(f"Error deleting tickets: {e}")
 
     def toggle_fridge_pause(self, index):
         try:
@@ -807,7 +3956,7 @@ class TicketApp:
                 return  # Prevent toggle if no items or invalid index
                 
             item = self.fridge_items[index]
-            now = datetime.now()
+            now = self.clock.now()
             if not item.paused:
                 # Pausing
                 item.paused_at = now
@@ -822,13 +3971,15 @@ class TicketApp:
             item.paused = not item.paused
 
             # Update database
-            self.cursor.execute("UPDATE fridge_items SET paused = ?, paused_at = ?, frozen_age = ? WHERE name = ? AND added_at = ?",
-                (int(item.paused),
-                 item.paused_at.isoformat() if item.paused_at else None,
-                 str(item.frozen_age.total_seconds()) if item.frozen_age else None,
-                 item.name,
-                 item.added_at.isoformat()))
-            self.conn.commit()
+            paused_at = item.paused_at.isoformat() if item.paused_at else None
+            frozen_age = str(item.frozen_age.total_seconds()) if item.frozen_age else None
+            fields = {'paused': int(item.paused), 'paused_at': paused_at,
+                      'frozen_age': frozen_age, 'added_at': item.added_at.isoformat()}
+            if item.paused:
+                event = ('fridge', item.id, 'paused', now, {'paused_at': paused_at, 'frozen_age': frozen_age})
+            else:
+                event = ('fridge', item.id, 'resumed', now, {'added_at': item.added_at.isoformat()})
+            self.storage.update('fridge', item.id, fields, event)
 
             # Update only the pause button state with proper Mac colors
             if index < len(self.fridge_labels):
@@ -837,10 +3988,10 @@ class TicketApp:
                     pause_btn.configure(text="▶", bg=self.mac_button_colors['accent']['normal'])
                 else:
                     pause_btn.configure(text="⏸", bg=self.mac_button_colors['accent']['normal'])
+            self.refresh_labels()
 
         except Exception as e:
             print(f"Error toggling fridge item pause: {e}")
-            self.conn.rollback()
 
     def complete_ticket(self, index):
         try:
@@ -849,21 +4000,19 @@ class TicketApp:
                 
             ticket = self.tickets[index]
             if not ticket.completed:
-                ticket.completed = True
-                ticket.completed_time = datetime.now().strftime('%H:%M:%S')
-                ticket.title += f" [Done @ {ticket.completed_time}]"
+                fields, event = self.mark_completed(ticket, self.clock.now())
                 
                 # Update database
-                self.cursor.execute("UPDATE tickets SET completed = ?, completed_time = ? WHERE title = ?",
-                    (1, ticket.completed_time, ticket.title.split(" [Done @")[0]))  # Use original title for update
-                self.conn.commit()
+                self.storage.update('ticket', ticket.id, fields, event)
                 
-                # Rebuild UI to ensure proper state display
-                self.build_ticket_ui()
+                # Refresh the row to show the new state and move it if the sort says so
+                self.move_ticket(ticket)
+                self.replan([ticket.id])
+                self.refresh_labels()
+                self.check_recurrences({ticket.id})
                 
         except Exception as e:
             print(f"Error completing ticket: {e}")
-            self.conn.rollback()
 
     def delete_ticket(self, index):
         try:
@@ -871,22 +4020,27 @@ class TicketApp:
                 return  # Prevent deletion if no tickets or invalid index
                 
             ticket = self.tickets[index]
+            waiting = [t for _, t in self.storage.dependents([ticket.id])]
             # Delete from database first
-            self.cursor.execute("DELETE FROM tickets WHERE title = ?", (ticket.title,))
-            self.conn.commit()
+            self.storage.delete('ticket', ticket.id, self.clock.now())
             
             # Only remove from memory if database delete was successful
+            self.order.remove(ticket)
             self.tickets.pop(index)
+            self.selected.discard(ticket.id)
+            self.attachment_meta.pop(ticket.id, None)  # SQLite may hand the id out again
             # Remove the frame and its widgets
             if index < len(self.ticket_labels):
                 self.ticket_labels[index][2].destroy()
                 self.ticket_labels.pop(index)
-            # Rebuild UI to ensure proper indices
-            self.build_ticket_ui()
+            self.total -= 1
+            self.update_selection_label()
+            self.update_page_label()
+            self.replan(waiting)
+            self.refresh_labels()
             
         except Exception as e:
             print(f"Error deleting ticket: {e}")
-            self.conn.rollback()
 
     def delete_fridge_item(self, index):
         try:
@@ -895,9 +4049,7 @@ class TicketApp:
                 
             item = self.fridge_items[index]
             # Delete from database first
-            self.cursor.execute("DELETE FROM fridge_items WHERE name = ? AND added_at = ?", 
-                (item.name, item.added_at.isoformat()))
-            self.conn.commit()
+            self.storage.delete('fridge', item.id, self.clock.now())
             
             # Only remove from memory if database delete was successful
             self.fridge_items.pop(index)
@@ -905,12 +4057,9 @@ class TicketApp:
             if index < len(self.fridge_labels):
                 self.fridge_labels[index][2].destroy()
                 self.fridge_labels.pop(index)
-            # Rebuild UI to ensure proper indices
-            self.build_fridge_ui()
             
         except Exception as e:
             print(f"Error deleting fridge item: {e}")
-            self.conn.rollback()
 
     def build_fridge_ui(self):
         # Clear existing UI
@@ -919,80 +4068,158 @@ class TicketApp:
         self.fridge_labels = []
         
         # Build UI for all items
-        for i, item in enumerate(self.fridge_items):
-            # Create a frame with modern styling
-            frame = tk.Frame(self.fridge_frame,
-                           bg=self.bg_color,
-                           highlightbackground=self.border_color,
-                           highlightthickness=1,
-                           padx=14, pady=10)
-            frame.pack(fill=tk.X, pady=5, padx=8)
-            
-            # Create a container for the label
-            label_container = tk.Frame(frame, bg=self.bg_color)
-            label_container.pack(side=tk.LEFT, expand=True, fill=tk.X)
-            
-            lbl = tk.Label(label_container,
-                         anchor='w',
-                         bg=self.bg_color,
-                         font=(self.font_family, 11),
-                         fg=self.text_color)
-            lbl.pack(side=tk.LEFT, expand=True, fill=tk.X)
-            
-            # Style the buttons with modern appearance
-            button_frame = tk.Frame(frame, bg=self.bg_color)
-            button_frame.pack(side=tk.RIGHT, padx=(10, 0))
-            
-            # Create Mac-style buttons
-            delete_btn = self.create_mac_button(
-                button_frame, "✕",
-                'danger',
-                lambda i=i: self.delete_fridge_item(i)
-            )
-            delete_btn.pack(side=tk.LEFT, padx=4)
-            
-            pause_text = "⏸" if not item.paused else "▶"
-            pause_btn = self.create_mac_button(
-                button_frame, pause_text,
-                'accent',
-                lambda i=i: self.toggle_fridge_pause(i)
-            )
-            pause_btn.pack(side=tk.LEFT, padx=4)
-            
-            self.fridge_labels.append((lbl, item, frame, pause_btn))
+        for item in self.fridge_items:
+            self.build_fridge_row(item)
+
+    def build_fridge_row(self, item):
+        """Append one fridge item row to the fridge frame"""
+        # Create a frame with modern styling
+        frame = tk.Frame(self.fridge_frame,
+                       bg=self.bg_color,
+                       highlightbackground=self.border_color,
+                       highlightthickness=1,
+                       padx=14, pady=10)
+        frame.pack(fill=tk.X, pady=5, padx=8)
+        
+        # Create a container for the fixed-width cells
+        label_container = tk.Frame(frame, bg=self.bg_color)
+        label_container.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        cells = self.build_cells(label_container, self.FRIDGE_COLUMNS)
+        
+        # Style the buttons with modern appearance
+        button_frame = tk.Frame(frame, bg=self.bg_color)
+        button_frame.pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Create Mac-style buttons
+        delete_btn = self.create_mac_button(
+            button_frame, "✕",
+            'danger',
+            lambda it=item: self.delete_fridge_item(self.fridge_items.index(it))
+        )
+        delete_btn.pack(side=tk.LEFT, padx=4)
+        
+        pause_text = "⏸" if not item.paused else "▶"
+        pause_btn = self.create_mac_button(
+            button_frame, pause_text,
+            'accent',
+            lambda it=item: self.toggle_fridge_pause(self.fridge_items.index(it))
+        )
+        pause_btn.pack(side=tk.LEFT, padx=4)
+        
+        self.fridge_labels.append((cells, item, frame, pause_btn))
 
     def update_ui(self):
         """Update the UI with current ticket and fridge item states"""
+        self.update_job = None
+        self.refresh_labels()
+
+    def schedule_update(self, delay):
+        """Run update_ui in `delay` seconds unless a tick is already due sooner"""
+        if delay is None or not self.visible:
+            return
+        due = time.monotonic() + delay
+        if self.update_job is not None:
+            if self.update_due <= due:
+                return
+            self.root.after_cancel(self.update_job)
+        self.update_due = due
+        self.update_job = self.root.after(max(int(delay * 1000), 1), self.update_ui)
+
+    def on_map(self, event):
+        if event.widget is self.root:
+            self.visible = True
+        self.schedule_update(0)  # A row or the window just came into view
+
+    def on_unmap(self, event):
+        if event.widget is self.root:
+            self.set_hidden()
+
+    def on_visibility(self, event):
+        if event.widget is not self.root:
+            return
+        if str(event.state) == 'VisibilityFullyObscured':
+            self.set_hidden()
+        else:
+            self.on_map(event)
+
+    def set_hidden(self):
+        """Stop ticking while the window can't be seen"""
+        self.visible = False
+        if self.update_job is not None:
+            self.root.after_cancel(self.update_job)
+            self.update_job = None
+
+    @staticmethod
+    def duration_text(seconds, shrinking):
+        """Format a span; returns the text and the seconds until it changes.
+
+        Spans of a day or more are shown to the minute, so they only need
+        redrawing once a minute.
+        """
+        whole = int(seconds)
+        sign = "-" if whole < 0 else ""
+        span = abs(seconds)
+        whole = abs(whole)
+        days = whole // 86400
+        hours = (whole % 86400) // 3600
+        minutes = (whole % 3600) // 60
+        if days > 0:
+            text, step = f"{sign}{days}d {hours:02d}:{minutes:02d}", 60
+        else:
+            text, step = f"{sign}{hours:02d}:{minutes:02d}:{whole % 60:02d}", 1
+        into = span % step
+        wait = (into or step) if shrinking else step - into
+        return text, max(wait, 0.05)
+
+    def refresh_labels(self):
+        """Redraw the rows whose text changed and schedule the next change.
+
+        Paused and completed rows are drawn once and then left alone, and
+        rows that are not mapped are skipped until they map again.
+        """
+        wake = None
         try:
-            now = datetime.now()
-            for lbl, ticket, frame, complete_btn, pause_btn in self.ticket_labels:
+            now = self.clock.now()  # One snapshot shared by every row this tick
+            for cells, ticket, frame, complete_btn, pause_btn in self.ticket_labels:
                 try:
-                    rem = ticket.remaining_time()
+                    state = (ticket.title, ticket.description, ticket.paused, ticket.completed,
+                             ticket.completed_time, ticket.due, ticket.frozen_remaining,
+                             ticket.effective_due, ticket.waiting)
+                    drawn = self.drawn.get(frame)
+                    if drawn and drawn[0] == state and (drawn[1] is None or now < drawn[1]):
+                        if drawn[1] is not None and (wake is None or drawn[1] < wake):
+                            wake = drawn[1]
+                        continue
+                    if not frame.winfo_ismapped():
+                        self.drawn.pop(frame, None)  # Drawn when it maps again
+                        continue
+
+                    rem = ticket.remaining_time(now)
                     if not isinstance(rem, timedelta):
-                        time_text = "Invalid time"
+                        time_text, wait = "Invalid time", None
                     else:
-                        total_seconds = int(rem.total_seconds())
-                        sign = "-" if total_seconds < 0 else ""
-                        total_seconds = abs(total_seconds)
-                        days = total_seconds // 86400
-                        hours = (total_seconds % 86400) // 3600
-                        minutes = (total_seconds % 3600) // 60
-                        seconds = total_seconds % 60
-                        
-                        # Format time with proper handling of zero values
-                        if days > 0:
-                            time_text = f"{sign}{days}d {hours:02d}:{minutes:02d}:{seconds:02d}"
-                        else:
-                            time_text = f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}"
+                        seconds = rem.total_seconds()
+                        time_text, wait = self.duration_text(seconds, seconds > 0)
+                    frozen = ticket.paused or ticket.completed or wait is None
+                    next_at = None if frozen else now + timedelta(seconds=wait)
+                    if next_at is not None and (wake is None or next_at < wake):
+                        wake = next_at
                     
-                    # Create single-line text format
+                    # One text per column, elided to fit
                     status = "[PAUSED] " if ticket.paused else ""
+                    if ticket.waiting and not ticket.completed:
+                        status += f"[WAITING {ticket.waiting}] "
                     completion = f"[Done @ {ticket.completed_time}]" if ticket.completed else ""
+                    texts = self.fit_cells((ticket.title, f"{status}{completion}".strip(), time_text,
+                                            ticket.description or ""), self.TICKET_COLUMNS)
+                    self.drawn[frame] = (state, next_at, texts)
                     
-                    text = f"{ticket.title} | {status}{time_text} | {ticket.description} {completion}"
-                    
-                    # Update label with new text
-                    lbl.config(text=text)
+                    # Update only the cells whose text changed
+                    for cell, text, old in zip(cells, texts, drawn[2] if drawn else (None,) * len(cells)):
+                        if text != old:
+                            cell.config(text=text)
+                    if drawn and drawn[0] == state:
+                        continue  # Only the time moved on
                     
                     # Update button colors based on state
                     if ticket.completed:
@@ -1008,32 +4235,40 @@ class TicketApp:
                     print(f"Error updating ticket {ticket.title}: {e}")
                     continue
 
-            for lbl, item, frame, pause_btn in self.fridge_labels:
+            for cells, item, frame, pause_btn in self.fridge_labels:
                 try:
-                    age = item.age()
+                    state = (item.name, item.paused, item.added_at, item.frozen_age)
+                    drawn = self.drawn.get(frame)
+                    if drawn and drawn[0] == state and (drawn[1] is None or now < drawn[1]):
+                        if drawn[1] is not None and (wake is None or drawn[1] < wake):
+                            wake = drawn[1]
+                        continue
+                    if not frame.winfo_ismapped():
+                        self.drawn.pop(frame, None)  # Drawn when it maps again
+                        continue
+
+                    age = item.age(now)
                     if not isinstance(age, timedelta):
-                        age_text = "Invalid time"
+                        age_text, wait = "Invalid time", None
                     else:
-                        total_seconds = int(age.total_seconds())
-                        days = total_seconds // 86400
-                        hours = (total_seconds % 86400) // 3600
-                        minutes = (total_seconds % 3600) // 60
-                        seconds = total_seconds % 60
-                        
-                        # Format time with proper handling of zero values
-                        if days > 0:
-                            age_text = f"{days}d {hours:02d}:{minutes:02d}:{seconds:02d}"
-                        else:
-                            age_text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+                        age_text, wait = self.duration_text(age.total_seconds(), False)
+                    next_at = None if item.paused or wait is None else now + timedelta(seconds=wait)
+                    if next_at is not None and (wake is None or next_at < wake):
+                        wake = next_at
                     
-                    # Create single-line text format
-                    status = "[PAUSED] " if item.paused else ""
+                    # One text per column, elided to fit
+                    status = "[PAUSED]" if item.paused else ""
                     added_time = item.added_at.strftime('%Y-%m-%d %H:%M:%S')
+                    texts = self.fit_cells((item.name, status, age_text, f"Added: {added_time}"),
+                                           self.FRIDGE_COLUMNS)
+                    self.drawn[frame] = (state, next_at, texts)
                     
-                    text = f"{item.name} | {status}{age_text} | Added: {added_time}"
-                    
-                    # Update label with new text
-                    lbl.config(text=text)
+                    # Update only the cells whose text changed
+                    for cell, text, old in zip(cells, texts, drawn[2] if drawn else (None,) * len(cells)):
+                        if text != old:
+                            cell.config(text=text)
+                    if drawn and drawn[0] == state:
+                        continue
                     
                     # Update pause button appearance
                     if item.paused:
@@ -1043,18 +4278,25 @@ class TicketApp:
                 except Exception as e:
                     print(f"Error updating fridge item {item.name}: {e}")
                     continue
-
-            # Schedule next update
-            self.root.after(1000, self.update_ui)
             
         except Exception as e:
             print(f"Error updating UI: {e}")
-            # Try to recover by scheduling next update
-            self.root.after(1000, self.update_ui)
-
+        # Sleep until the next row's text changes; frozen rows never wake the loop
+        if wake is not None:
+            self.schedule_update(max((wake - now).total_seconds(), 0))
 
 
 if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == 'sync':
+        # python ticket.py sync laptop.db desktop.db
+        received, sent = sync_databases(sys.argv[2], sys.argv[3], default_clock.now())
+        print(f"{sys.argv[2]}: {received} changes applied, {sys.argv[3]}: {sent} changes applied")
+        sys.exit(0)
     root = tk.Tk()
-    app = TicketApp(root)
-    root.mainloop()
\ No newline at end of file
+    # python ticket.py --memory starts a throwaway session that never touches disk
+    app = TicketApp(root, storage=MemoryStorage() if '--memory' in sys.argv[1:] else None)
+    if len(sys.argv) == 3 and sys.argv[1] == '--browse':
+        # python ticket.py --browse archive.db opens a file without writing to it
+        app.browse_database(sys.argv[2])
+    root.mainloop()
+    app.storage.close()  # Folds a long journal into a checkpoint